@@ -0,0 +1,3 @@
+"""
+Аналитика временных рядов из нескольких источников
+"""
@@ -0,0 +1,220 @@
+"""
+Выравнивание временных рядов из разных источников (T-Bank, Steam, Yahoo Finance)
+на общей временной оси с помощью бинарного поиска по отсортированным массивам
+"""
+
+import numpy as np
+import pandas as pd
+
+POLICIES = ("exact", "ffill", "bfill", "nearest")
+
+
+def to_seconds(values):
+    """
+    Приведение временных меток к Unix-времени в секундах (int64)
+
+    Принимает числа (секунды), datetime-подобные значения и строки дат.
+    """
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    dt = pd.to_datetime(values)
+    if dt.dt.tz is not None:
+        dt = dt.dt.tz_convert("UTC").dt.tz_localize(None)
+    return dt.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def step_seconds(step):
+    """
+    Шаг в секундах
+
+    Args:
+        step (int | str | pd.Timedelta): Секунды или строка pandas ("30min", "1h", "1D")
+
+    Returns:
+        int: Секунды
+    """
+    if isinstance(step, (int, np.integer)):
+        return int(step)
+    return int(pd.Timedelta(step).total_seconds())
+
+
+def make_grid(start, end, step):
+    """
+    Регулярная сетка [start, end] с шагом step
+
+    Args:
+        start (int): Начало, секунды
+        end (int): Конец, секунды (включается, если попадает на сетку)
+        step (int | str | pd.Timedelta): Шаг в секундах или строка pandas ("30min", "1D")
+
+    Returns:
+        np.ndarray: Временные метки сетки, int64
+    """
+    step = step_seconds(step)
+    first = -(-int(start) // step) * step
+    return np.arange(first, int(end) + 1, step, dtype=np.int64)
+
+
+def asof_indices(target, source, policy="ffill", tolerance=None):
+    """
+    Для каждой метки target - индекс подходящей точки source или -1
+
+    Args:
+        target (np.ndarray): Метки, к которым выравниваем (int64, любой порядок)
+        source (np.ndarray): Метки источника (int64, по возрастанию)
+        policy (str): "exact" - только точное совпадение,
+            "ffill" - последняя точка не позже метки,
+            "bfill" - первая точка не раньше метки,
+            "nearest" - ближайшая точка
+        tolerance (int, optional): Максимальное расстояние до точки, секунды
+
+    Returns:
+        np.ndarray: Индексы в source (int64), -1 где точки нет
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Неизвестная политика выравнивания: {policy}")
+
+    target = np.asarray(target, dtype=np.int64)
+    source = np.asarray(source, dtype=np.int64)
+    n = len(source)
+    if n == 0:
+        return np.full(len(target), -1, dtype=np.int64)
+
+    if policy == "exact":
+        idx = np.searchsorted(source, target, side="left")
+        clipped = np.minimum(idx, n - 1)
+        return np.where((idx < n) & (source[clipped] == target), clipped, -1)
+
+    if policy == "ffill":
+        idx = np.searchsorted(source, target, side="right") - 1
+    elif policy == "bfill":
+        idx = np.searchsorted(source, target, side="left")
+        idx[idx >= n] = -1
+    else:
+        right = np.searchsorted(source, target, side="left")
+        left = right - 1
+        right_ok = right < n
+        left_ok = left >= 0
+        right_dist = np.where(right_ok, source[np.minimum(right, n - 1)] - target, np.iinfo(np.int64).max)
+        left_dist = np.where(left_ok, target - source[np.maximum(left, 0)], np.iinfo(np.int64).max)
+        idx = np.where(left_dist <= right_dist, left, right)
+        idx[~(left_ok | right_ok)] = -1
+
+    if tolerance is not None:
+        found = idx >= 0
+        distance = np.abs(source[np.where(found, idx, 0)] - target)
+        idx = np.where(found & (distance <= tolerance), idx, -1)
+    return idx
+
+
+def _take(values, idx):
+    values = np.asarray(values)
+    if values.dtype.kind in "iub":
+        values = values.astype(np.float64)
+    if len(values) == 0:
+        return np.full(len(idx), np.nan if values.dtype.kind == "f" else None,
+                       dtype=np.float64 if values.dtype.kind == "f" else object)
+    result = values[np.where(idx >= 0, idx, 0)]
+    if result.dtype.kind == "f":
+        result[idx < 0] = np.nan
+    else:
+        result = result.astype(object)
+        result[idx < 0] = None
+    return result
+
+
+def _take_column(target, seconds, column, policy, tolerance):
+    """Значения колонки источника для меток target; пропуски в источнике не используются"""
+    valid = column.notna().to_numpy()
+    values = column.to_numpy()
+    if not valid.all():
+        seconds, values = seconds[valid], values[valid]
+    return _take(values, asof_indices(target, seconds, policy, tolerance))
+
+
+def _sorted_source(df, time_column):
+    seconds = to_seconds(df[time_column])
+    order = np.argsort(seconds, kind="stable")
+    return seconds[order], df.iloc[order]
+
+
+def asof_join(left, right, on="timestamp", columns=None, policy="ffill", tolerance=None, suffix="_right"):
+    """
+    Присоединение к каждой строке left значений из right по времени
+
+    В отличие от merge по точному равенству, строки right не обязаны совпадать
+    по времени со строками left.
+
+    Args:
+        left (pd.DataFrame): Основная таблица
+        right (pd.DataFrame): Присоединяемая таблица
+        on (str): Колонка времени в обеих таблицах
+        columns (list, optional): Колонки right; по умолчанию все, кроме on
+        policy (str): Политика выбора точки, см. asof_indices
+        tolerance (int, optional): Максимальное расстояние, секунды
+        suffix (str): Суффикс для колонок right, совпадающих с колонками left
+
+    Returns:
+        pd.DataFrame: Копия left с добавленными колонками
+    """
+    columns = [c for c in right.columns if c != on] if columns is None else list(columns)
+    right_ts, right_sorted = _sorted_source(right, on)
+
+    left_ts = to_seconds(left[on])
+    result = left.copy()
+    for column in columns:
+        name = column + suffix if column in result.columns else column
+        result[name] = _take_column(left_ts, right_ts, right_sorted[column], policy, tolerance)
+    return result
+
+
+def align_sources(sources, step=None, grid=None, start=None, end=None, policy="ffill", tolerance=None,
+                  limit=None):
+    """
+    Выравнивание нескольких источников на общую сетку
+
+    Args:
+        sources (dict): Имя -> (DataFrame, колонка времени, колонки значений)
+            или имя -> (DataFrame, колонка времени, {колонка: новое имя})
+        step (int | str, optional): Шаг регулярной сетки ("30min", "1D", секунды)
+        grid (array, optional): Готовая сетка (секунды); если не задана и нет step,
+            используется объединение меток всех источников
+        start, end (int, optional): Границы сетки; по умолчанию - общий диапазон источников
+        policy (str): Политика выбора точки, см. asof_indices
+        tolerance (int, optional): Максимальное расстояние до точки, секунды
+        limit (int, optional): Для ffill - максимум шагов сетки, на которые переносится значение
+
+    Returns:
+        pd.DataFrame: Колонки timestamp, datetime и значения всех источников
+    """
+    prepared = {}
+    for name, (df, time_column, value_columns) in sources.items():
+        if not isinstance(value_columns, dict):
+            value_columns = {column: column for column in value_columns}
+        seconds, sorted_df = _sorted_source(df, time_column)
+        prepared[name] = (seconds, sorted_df, value_columns)
+
+    all_seconds = [seconds for seconds, _, _ in prepared.values() if len(seconds)]
+    if grid is None and not all_seconds:
+        grid = np.empty(0, dtype=np.int64)
+    if grid is None:
+        lo = min(s[0] for s in all_seconds) if start is None else int(start)
+        hi = max(s[-1] for s in all_seconds) if end is None else int(end)
+        if step is not None:
+            grid = make_grid(lo, hi, step)
+        else:
+            grid = np.unique(np.concatenate(all_seconds))
+            grid = grid[(grid >= lo) & (grid <= hi)]
+    grid = np.asarray(grid, dtype=np.int64)
+
+    if limit is not None and policy == "ffill" and len(grid) > 1:
+        spacing = int(np.median(np.diff(grid)))
+        max_distance = limit * spacing
+        tolerance = max_distance if tolerance is None else min(tolerance, max_distance)
+
+    result = {"timestamp": grid, "datetime": grid.astype("datetime64[s]")}
+    for seconds, sorted_df, value_columns in prepared.values():
+        for column, alias in value_columns.items():
+            result[alias] = _take_column(grid, seconds, sorted_df[column], policy, tolerance)
+    return pd.DataFrame(result)
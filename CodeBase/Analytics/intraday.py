@@ -0,0 +1,173 @@
+"""
+Внутридневная статистика по свечам: в какое время суток достигаются дневные
+максимум и минимум, доходности и скользящая волатильность
+
+Все инструменты обрабатываются одним проходом по массивам numpy: дни и слоты
+времени суток вычисляются целочисленной арифметикой над Unix-временем,
+дневные экстремумы - через reduceat, частоты - через bincount.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .alignment import step_seconds
+
+DAY = 24 * 60 * 60
+
+
+def local_seconds(timestamps, tz=None):
+    """
+    Unix-время, сдвинутое в часовой пояс tz, чтобы сутки начинались в местную полночь
+
+    Args:
+        timestamps (array): Unix-время, секунды
+        tz (str, optional): Часовой пояс ("Europe/Moscow"); по умолчанию UTC
+
+    Returns:
+        np.ndarray: int64
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if tz is None:
+        return timestamps
+    local = pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(tz).tz_localize(None)
+    return local.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def _slot_labels(step, n_slots):
+    minutes = np.arange(n_slots) * step // 60
+    return pd.Index([f"{m // 60:02d}:{m % 60:02d}" for m in minutes], name="time")
+
+
+def extremum_time_shares(df, columns, time_column="timestamp", step="30min", tz=None):
+    """
+    Доля дней, в которые дневной максимум (минимум) пришёлся на данный слот времени суток
+
+    Повторяет расчёт из EDA: для каждого дня берутся все свечи, равные дневному
+    максимуму (минимуму), их количество по слотам делится на общее число свечей
+    в слоте. Пропуски (NaN) не участвуют ни в экстремумах, ни в знаменателе.
+
+    Args:
+        df (pd.DataFrame): Свечи с колонкой Unix-времени
+        columns (list): Колонки цен инструментов
+        time_column (str): Колонка времени, секунды
+        step (str | int): Длина слота ("30min", "1h" или секунды)
+        tz (str, optional): Часовой пояс для границ суток и времени слотов; по умолчанию UTC
+
+    Returns:
+        pd.DataFrame: Индекс - время начала слота "HH:MM", колонки - MultiIndex
+            (инструмент, max_count | min_count | total | max_share | min_share)
+    """
+    step = step_seconds(step)
+    n_slots = -(-DAY // step)
+    columns = list(columns)
+
+    seconds = local_seconds(df[time_column].to_numpy(), tz)
+    values = df[columns].to_numpy(dtype=np.float64)
+    order = np.argsort(seconds, kind="stable")
+    seconds, values = seconds[order], values[order]
+
+    days = seconds // DAY
+    slots = (seconds - days * DAY) // step
+
+    result = {}
+    if len(seconds):
+        day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        day_index = np.cumsum(np.r_[False, days[1:] != days[:-1]])
+        valid = ~np.isnan(values)
+        # fmax/fmin пропускают NaN; день без значений даёт NaN и ни с чем не совпадает
+        is_max = values == np.fmax.reduceat(values, day_starts, axis=0)[day_index]
+        is_min = values == np.fmin.reduceat(values, day_starts, axis=0)[day_index]
+    for j, column in enumerate(columns):
+        if not len(seconds):
+            counts = {name: np.zeros(n_slots, dtype=np.int64) for name in ("max_count", "min_count", "total")}
+        else:
+            counts = {
+                "max_count": np.bincount(slots[is_max[:, j]], minlength=n_slots),
+                "min_count": np.bincount(slots[is_min[:, j]], minlength=n_slots),
+                "total": np.bincount(slots[valid[:, j]], minlength=n_slots),
+            }
+        total = counts["total"].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            counts["max_share"] = counts["max_count"] / total
+            counts["min_share"] = counts["min_count"] / total
+        for name, array in counts.items():
+            result[(column, name)] = array
+
+    frame = pd.DataFrame(result, index=_slot_labels(step, n_slots))
+    frame.columns = pd.MultiIndex.from_tuples(frame.columns, names=["instrument", "statistic"])
+    return frame
+
+
+def returns(df, columns, time_column="timestamp", log=True):
+    """
+    Доходности между соседними свечами каждого инструмента
+
+    Пропуски не разрывают ряд: доходность считается от последнего известного значения.
+
+    Args:
+        df (pd.DataFrame): Свечи
+        columns (list): Колонки цен
+        time_column (str): Колонка Unix-времени
+        log (bool): Логарифмические доходности; False - простые
+
+    Returns:
+        pd.DataFrame: timestamp и доходности по колонкам (NaN, где цены нет)
+    """
+    ordered = df.sort_values(time_column, kind="stable")
+    values = ordered[list(columns)].to_numpy(dtype=np.float64)
+    previous = pd.DataFrame(values).ffill().shift(1).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = np.log(values / previous) if log else values / previous - 1
+    frame = pd.DataFrame(result, columns=list(columns))
+    frame.insert(0, time_column, ordered[time_column].to_numpy())
+    return frame
+
+
+def rolling_volatility(df, columns, window="1D", time_column="timestamp", log=True, min_periods=2):
+    """
+    Скользящее стандартное отклонение доходностей по временному окну
+
+    Args:
+        df (pd.DataFrame): Свечи
+        columns (list): Колонки цен
+        window (str | int): Окно: строка pandas ("1D", "7D") или число свечей
+        time_column (str): Колонка Unix-времени
+        log (bool): Логарифмические доходности
+        min_periods (int): Минимум доходностей в окне
+
+    Returns:
+        pd.DataFrame: timestamp и волатильность по колонкам
+    """
+    rets = returns(df, columns, time_column, log)
+    data = rets[list(columns)]
+    if isinstance(window, str):
+        data = data.set_axis(pd.to_datetime(rets[time_column].to_numpy(), unit="s"))
+    volatility = data.rolling(window, min_periods=min_periods).std()
+    frame = pd.DataFrame(volatility.to_numpy(), columns=list(columns))
+    frame.insert(0, time_column, rets[time_column].to_numpy())
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время суток дневных максимумов и минимумов по свечам")
+    parser.add_argument("csv_path", help="CSV со свечами (например cny_rub_dataset.csv)")
+    parser.add_argument("columns", nargs="+", help="Колонки цен (например price_rub gold_price)")
+    parser.add_argument("--step", default="30min", help="Длина слота времени суток")
+    parser.add_argument("--tz", default=None, help="Часовой пояс границ суток (по умолчанию UTC)")
+    parser.add_argument("--output", default=None, help="Сохранить таблицу в CSV")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.csv_path, usecols=["timestamp", *args.columns])
+    shares = extremum_time_shares(df, args.columns, step=args.step, tz=args.tz)
+    shares = shares[shares.xs("total", axis=1, level="statistic").sum(axis=1) > 0]
+    if args.output:
+        shares.to_csv(args.output)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(shares.xs("max_share", axis=1, level="statistic").add_suffix(" max")
+              .join(shares.xs("min_share", axis=1, level="statistic").add_suffix(" min")).round(3))
+
+
+if __name__ == "__main__":
+    main()
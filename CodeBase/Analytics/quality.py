@@ -0,0 +1,223 @@
+"""
+Проверка качества рядов при загрузке: порядок меток, дубликаты, разрывы
+относительно ожидаемого шага и выбросы
+
+Все проверки - операции над целыми массивами numpy; результат - индексы
+оставляемых строк и краткая сводка, которую загрузчик пишет в лог одной строкой.
+Для биржевых рядов разрывы считаются по времени торговых сессий: ночь,
+выходные и праздники пропуском не являются.
+"""
+
+import numpy as np
+import pandas as pd
+
+from Metrics.metrics import incr
+
+from .alignment import step_seconds, to_seconds
+
+# Торговые сессии: смещение местного времени от UTC в часах, начало и конец сессии
+# по местному времени, торгуются ли выходные. moex - основная сессия валютного рынка
+# и драгметаллов Мосбиржи (утренние и вечерние свечи в неё не входят и разрывов не дают),
+# weekdays - дневные котировки по будням
+SESSIONS = {
+    "moex": {"utc_offset": 3, "open": "10:00", "close": "19:00", "weekends": False},
+    "weekdays": {"utc_offset": 0, "open": "00:00", "close": "24:00", "weekends": False},
+}
+
+_EPOCH_DAY = np.datetime64(0, "D")
+
+
+def _clock(value):
+    hours, minutes = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+def session_time(seconds, session, holidays=()):
+    """
+    Время торговых сессий от начала Unix-времени до каждой метки
+
+    Разность значений для двух меток - сколько торгового времени прошло между
+    ними; на ночь, выходные и праздники она не растёт.
+
+    Args:
+        seconds (np.ndarray): Unix-время, секунды
+        session (dict | str): Сессия в формате SESSIONS или её имя
+        holidays (list): Дни без торгов (даты или строки "YYYY-MM-DD")
+
+    Returns:
+        np.ndarray: Секунды торгового времени (int64)
+    """
+    if isinstance(session, str):
+        session = SESSIONS[session]
+    opens, closes = _clock(session["open"]), _clock(session["close"])
+    length = closes - opens
+    weekmask = "1111111" if session.get("weekends") else "1111100"
+    holidays = np.asarray(holidays, dtype="datetime64[D]")
+
+    local = np.asarray(seconds, dtype=np.int64) + int(session.get("utc_offset", 0) * 3600)
+    days = local // 86400
+    dates = days.astype("datetime64[D]")
+    trading = np.is_busday(dates, weekmask=weekmask, holidays=holidays)
+    before = np.busday_count(_EPOCH_DAY, dates, weekmask=weekmask, holidays=holidays)
+    into_session = np.clip(local - days * 86400 - opens, 0, length)
+    return before.astype(np.int64) * length + np.where(trading, into_session, 0)
+
+
+def _format_seconds(seconds):
+    days, rest = divmod(int(seconds), 86400)
+    hours, rest = divmod(rest, 3600)
+    parts = [f"{value}{unit}" for value, unit in ((days, "d"), (hours, "h"), (rest // 60, "min")) if value]
+    return "".join(parts) or f"{int(seconds)}s"
+
+
+def spike_mask(values, threshold=10.0):
+    """
+    Выбросы-всплески: точка, скачок к которой и скачок от которой велики
+    и разного знака (цена отклонилась и вернулась)
+
+    Величина скачка - относительное изменение, нормированное робастно
+    (медиана и MAD), поэтому обычная волатильность и сдвиги уровня не отмечаются.
+
+    Args:
+        values (np.ndarray): Цены; NaN пропускаются
+        threshold (float): Порог робастного z-показателя
+
+    Returns:
+        np.ndarray: bool по точкам values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mask = np.zeros(len(values), dtype=bool)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < 3:
+        return mask
+
+    v = values[valid]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        changes = np.diff(v) / np.abs(v[:-1])
+    changes[~np.isfinite(changes)] = 0.0
+    deviation = changes - np.median(changes)
+    scale = np.median(np.abs(deviation)) / 0.6745
+    if scale == 0:
+        # Большинство соседних цен равны: масштаб по среднему отклонению
+        scale = np.mean(np.abs(deviation)) * 1.2533
+    if scale == 0:
+        return mask
+
+    z = deviation / scale
+    spikes = (np.abs(z[:-1]) > threshold) & (np.abs(z[1:]) > threshold) & (np.sign(z[:-1]) != np.sign(z[1:]))
+    mask[valid[1:-1][spikes]] = True
+    return mask
+
+
+def check_series(timestamps, values, cadence=None, name="series", gap_factor=1.5, outlier_threshold=10.0,
+                 session=None, holidays=()):
+    """
+    Проверка ряда и индексы строк, которые стоит оставить
+
+    Строки без метки или без единого значения отбрасываются, остальные
+    сортируются по времени; из строк с одинаковой меткой остаётся последняя.
+    Разрывы (шаг больше gap_factor * cadence) и выбросы только отмечаются в сводке.
+    С session шаг между метками измеряется временем торговых сессий, поэтому
+    ночь и выходные между свечами не считаются разрывом.
+
+    Args:
+        timestamps (array): Unix-время, секунды (NaN - некорректная метка)
+        values (array): Значения, (n,) или (n, k) для нескольких колонок
+        cadence (str | int, optional): Ожидаемый шаг ("30min", "1h", "1D" или секунды);
+            по умолчанию - медианный шаг ряда
+        name (str): Имя источника для сводки и счётчиков метрик quality.<name>.*
+        gap_factor (float): Во сколько раз шаг должен превысить cadence, чтобы считаться разрывом
+        outlier_threshold (float): Порог робастного z-показателя для spike_mask
+        session (str | dict, optional): Торговая сессия (имя из SESSIONS или словарь в том же
+            формате); без неё ряд считается непрерывным
+        holidays (list): Дни без торгов для session
+
+    Returns:
+        tuple: (индексы строк в исходном массиве в порядке времени, сводка dict)
+    """
+    timestamps = np.asarray(timestamps)
+    values = np.asarray(values, dtype=np.float64)
+    matrix = values[:, None] if values.ndim == 1 else values
+
+    finite = np.isfinite(timestamps.astype(np.float64, copy=False))
+    invalid = ~finite | np.isnan(matrix).all(axis=1)
+    index = np.flatnonzero(~invalid)
+    seconds = timestamps[index].astype(np.int64)
+
+    unsorted = int(np.count_nonzero(np.diff(seconds) < 0))
+    if unsorted:
+        order = np.argsort(seconds, kind="stable")
+        index, seconds = index[order], seconds[order]
+
+    last = np.ones(len(seconds), dtype=bool)
+    last[:-1] = seconds[1:] != seconds[:-1]
+    duplicates = int(len(seconds) - np.count_nonzero(last))
+    if duplicates:
+        index, seconds = index[last], seconds[last]
+
+    steps = np.diff(seconds if session is None else session_time(seconds, session, holidays))
+    if cadence is None:
+        step = int(np.median(steps)) if len(steps) else 0
+    else:
+        step = step_seconds(cadence)
+    gaps = steps > step * gap_factor if step else np.zeros(len(steps), dtype=bool)
+    missing = int((steps[gaps] // step - 1).sum()) if step else 0
+
+    outliers = np.zeros(len(index), dtype=bool)
+    for column in matrix[index].T:
+        outliers |= spike_mask(column, outlier_threshold)
+
+    report = {
+        'name': name,
+        'rows_in': len(timestamps),
+        'rows_out': len(index),
+        'invalid': int(invalid.sum()),
+        'unsorted': unsorted,
+        'duplicates': duplicates,
+        'cadence': step,
+        'session': session if session is None or isinstance(session, str) else "custom",
+        'gaps': int(gaps.sum()),
+        'missing_points': missing,
+        'max_gap': int(steps.max()) if len(steps) else 0,
+        'outliers': int(outliers.sum()),
+        'outlier_timestamps': seconds[outliers],
+    }
+    for key in ("invalid", "unsorted", "duplicates", "gaps", "outliers"):
+        if report[key]:
+            incr(f"quality.{name}.{key}", report[key])
+    return index, report
+
+
+def check_frame(df, columns, time_column="timestamp", **kwargs):
+    """
+    check_series для DataFrame
+
+    Args:
+        df (pd.DataFrame): Данные
+        columns (list): Колонки значений
+        time_column (str): Колонка времени (секунды или даты)
+        **kwargs: Аргументы check_series (cadence, name, ...)
+
+    Returns:
+        tuple: (очищенный DataFrame по возрастанию времени, сводка dict)
+    """
+    index, report = check_series(to_seconds(df[time_column]), df[list(columns)].to_numpy(dtype=np.float64),
+                                 **kwargs)
+    return df.iloc[index].reset_index(drop=True), report
+
+
+def quality_summary(report):
+    """Сводка проверки одной строкой для лога"""
+    parts = [
+        f"{report['name']}: {report['rows_in']} -> {report['rows_out']} строк",
+        f"некорректных {report['invalid']}, не по порядку {report['unsorted']}, дубликатов {report['duplicates']}",
+    ]
+    if report['cadence']:
+        within = f" в сессиях {report['session']}" if report['session'] else ""
+        parts.append(f"шаг {_format_seconds(report['cadence'])}{within}: разрывов {report['gaps']} "
+                     f"(пропущено ~{report['missing_points']}, макс. {_format_seconds(report['max_gap'])})")
+    parts.append(f"выбросов {report['outliers']}")
+    if report['outliers']:
+        shown = pd.to_datetime(report['outlier_timestamps'][:3], unit="s").strftime("%Y-%m-%d %H:%M")
+        parts[-1] += f" ({', '.join(shown)}{', ...' if report['outliers'] > 3 else ''})"
+    return "; ".join(parts)
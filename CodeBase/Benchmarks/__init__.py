@@ -0,0 +1,3 @@
+"""
+Бенчмарки этапов парсера Steam и загрузки свечей T-Bank на синтетических данных
+"""
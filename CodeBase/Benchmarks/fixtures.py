@@ -0,0 +1,80 @@
+"""
+Синтетические данные для бенчмарков: история Steam, HTML листинга и свечи T-Bank
+
+Размеры по умолчанию соответствуют реальным данным: ~1.7 тыс. точек истории
+одного предмета Steam и ~17 тыс. 30-минутных свечей CNY/RUB за год.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from TBank_API.fake_client import FakeAsyncClient
+
+STEAM_POINTS = 1_700
+CANDLES = 17_000
+CANDLE_STEP = timedelta(minutes=30)
+# figi CNY и uid золота из TBANK_API_script
+INSTRUMENTS = ["BBG0013HRTL0", "258e2b93-54e8-4f2d-ba3d-a507c47e3ae2"]
+# Имя CandleInterval.CANDLE_INTERVAL_30_MIN: фейковый клиент интервал не проверяет,
+# а ключ кэша строится по имени, поэтому tinkoff.invest для бенчмарков не нужен
+CANDLE_INTERVAL = "CANDLE_INTERVAL_30_MIN"
+ITEM_NAME = "Chroma 3 Case"
+
+
+def steam_price_data(n=STEAM_POINTS, end=None):
+    """
+    История цен в формате line1: [дата "Mar 05 2025 01: +0", цена, количество]
+
+    Точки почасовые и заканчиваются текущим часом; при больших n история
+    уходит дальше трёх лет назад и частично отсекается analyze_price_data.
+    """
+    end = (end or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    data = []
+    for i in range(n):
+        moment = end - timedelta(hours=n - 1 - i)
+        data.append([moment.strftime("%b %d %Y %H: +0"), round(0.2 + (i * 7919 % 997) / 1000, 3), str(100 + i % 50)])
+    return data
+
+
+def steam_listing_html(price_data, item_name=ITEM_NAME):
+    """HTML страницы листинга с историей цен во встроенном скрипте, как у Steam"""
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Steam Community :: Market :: Listings for {item_name}</title></head><body>"
+        "<div id=\"pricehistory\"></div>"
+        "<script type=\"text/javascript\">\n"
+        "\t\t$J(document).ready(function(){\n"
+        f"\t\t\tvar line1={json.dumps(price_data, separators=(',', ':'))};\n"
+        "\t\t\tg_timePriceHistoryEarliest = new Date();\n"
+        "\t\t});\n"
+        "</script></body></html>"
+    )
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class FakeSteamSession:
+    """Сессия requests, отдающая один и тот же HTML листинга на любой URL"""
+
+    def __init__(self, html, status_code=200):
+        self.html = html
+        self.status_code = status_code
+        self.requests = 0
+
+    def get(self, url, timeout=None):
+        self.requests += 1
+        return FakeResponse(self.html, self.status_code)
+
+
+def candle_range(n=CANDLES, end=datetime(2025, 3, 1, tzinfo=timezone.utc)):
+    """Интервал [from_, to), в котором фейковый клиент выдаёт n свечей на инструмент"""
+    return end - n * CANDLE_STEP, end
+
+
+def candle_client(page_latency=0.0):
+    """Фейковый клиент tinkoff.invest с 30-минутными свечами"""
+    return FakeAsyncClient(step=CANDLE_STEP, page_latency=page_latency)
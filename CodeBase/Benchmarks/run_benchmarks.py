@@ -0,0 +1,204 @@
+"""
+Бенчмарки этапов парсера Steam и загрузки свечей T-Bank на синтетических данных
+
+Для каждого этапа выводятся лучшее время из нескольких повторов, пропускная
+способность (точек или свечей в секунду) и пиковая память по tracemalloc.
+Сеть, браузер и токен не нужны: HTML Steam и клиент tinkoff.invest подменяются
+фейками из fixtures.py.
+
+Запуск из каталога CodeBase:
+    python -m Benchmarks.run_benchmarks [--scales 1 10 100] [--repeat 3] [--only steam] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from loguru import logger
+
+from Parser import selenium_parser_script as parser_script
+from Parser.price_plot import ChartRenderer
+from Parser.steam_http import parse_steam_market_data_http
+from Storage.dataset_store import DatasetStore
+from TBank_API import TBANK_API_script
+from TBank_API.candle_fetcher import fetch_candles_concurrently
+from TBank_API.incremental import append_increment
+
+from . import fixtures
+
+# Логи этапов не должны попадать в замеры
+logger.remove()
+
+
+def measure(name, func, setup=None, items=1, repeat=3):
+    """
+    Замер одного этапа
+
+    Args:
+        name (str): Название этапа
+        func (callable): Замеряемая функция, принимает результат setup
+        setup (callable, optional): Подготовка входа, не входит в замер
+        items (int): Количество обработанных элементов для расчёта пропускной способности
+        repeat (int): Число повторов, берётся лучшее время
+
+    Returns:
+        dict: name, items, seconds, items_per_second, peak_mib
+    """
+    setup = setup or (lambda: None)
+
+    # Этапы печатают сводки в stdout, в отчёт они не нужны
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = float("inf")
+        for _ in range(repeat):
+            arg = setup()
+            gc.collect()
+            started = time.perf_counter()
+            func(arg)
+            best = min(best, time.perf_counter() - started)
+
+        arg = setup()
+        gc.collect()
+        tracemalloc.start()
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "items": items,
+        "seconds": best,
+        "items_per_second": items / best if best else float("inf"),
+        "peak_mib": peak / 2 ** 20,
+    }
+
+
+def steam_benchmarks(scale, repeat, workdir):
+    """Этапы парсера Steam: HTML -> line1, анализ, экспорт в CSV и хранилище, график"""
+    n = fixtures.STEAM_POINTS * scale
+    price_data = fixtures.steam_price_data(n)
+    session = fixtures.FakeSteamSession(fixtures.steam_listing_html(price_data))
+    url = "https://steamcommunity.com/market/listings/730/Chroma%203%20Case"
+
+    stats = parser_script.analyze_price_data(price_data)
+    head = parser_script.analyze_price_data(price_data[:-24])
+    points = stats['total_points']
+
+    def fresh_dir():
+        path = tempfile.mkdtemp(dir=workdir)
+        parser_script.script_dir = path
+        parser_script.store = DatasetStore(os.path.join(path, "datasets"))
+        return path
+
+    def with_stored_head():
+        path = fresh_dir()
+        parser_script.export_to_csv(head, fixtures.ITEM_NAME)
+        return path
+
+    renderer = ChartRenderer()
+
+    return [
+        measure("steam.parse_html", lambda _: parse_steam_market_data_http(url, session=session),
+                items=n, repeat=repeat),
+        measure("steam.analyze_price_data", lambda _: parser_script.analyze_price_data(price_data),
+                items=n, repeat=repeat),
+        measure("steam.export_to_csv (новый файл)", lambda _: parser_script.export_to_csv(stats, fixtures.ITEM_NAME),
+                setup=fresh_dir, items=points, repeat=repeat),
+        measure("steam.export_to_csv (дозапись 24 точек)",
+                lambda _: parser_script.export_to_csv(stats, fixtures.ITEM_NAME),
+                setup=with_stored_head, items=points, repeat=repeat),
+        measure("steam.plot_price_data (Agg)",
+                lambda _: parser_script.plot_price_data(stats, fixtures.ITEM_NAME, show=False, renderer=renderer),
+                setup=fresh_dir, items=points, repeat=repeat),
+    ]
+
+
+async def _fetch(from_, to):
+    return await fetch_candles_concurrently(fixtures.candle_client(), fixtures.INSTRUMENTS, from_, to, interval=None)
+
+
+def _fetch_candles(from_, to):
+    return asyncio.run(TBANK_API_script.fetch_candles(fixtures.candle_client(), from_, use_cache=False, to=to,
+                                                      interval=fixtures.CANDLE_INTERVAL))
+
+
+def tbank_benchmarks(scale, repeat, workdir):
+    """Этапы загрузки свечей: фейковый клиент -> буферы, fetch_candles целиком, инкрементальное сохранение"""
+    n = fixtures.CANDLES * scale
+    from_, to = fixtures.candle_range(n)
+    candles = n * len(fixtures.INSTRUMENTS)
+
+    df = _fetch_candles(from_, to)
+    tail = max(1, n // 100)
+    existing, new = df.iloc[:-tail], df.iloc[-tail:]
+
+    def stored_dataset():
+        path = os.path.join(tempfile.mkdtemp(dir=workdir), "cny_rub_dataset.csv")
+        existing.to_csv(path, index=False)
+        return path
+
+    return [
+        measure("tbank.fetch_candles_concurrently", lambda _: asyncio.run(_fetch(from_, to)),
+                items=candles, repeat=repeat),
+        measure("tbank.fetch_candles (весь этап)", lambda _: _fetch_candles(from_, to),
+                items=candles, repeat=repeat),
+        measure("tbank.append_increment (1% новых строк)",
+                lambda path: append_increment(path, new),
+                setup=stored_dataset, items=len(df), repeat=repeat),
+    ]
+
+
+SUITES = {"steam": steam_benchmarks, "tbank": tbank_benchmarks}
+
+
+def print_results(scale, results):
+    print(f"\nМасштаб x{scale}")
+    print(f"{'Этап':<45} {'Элементов':>10} {'Время, с':>10} {'Элем./с':>12} {'Пик, МиБ':>9}")
+    for r in results:
+        print(f"{r['name']:<45} {r['items']:>10} {r['seconds']:>10.4f} {r['items_per_second']:>12.0f} {r['peak_mib']:>9.1f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Бенчмарки парсера Steam и загрузки свечей T-Bank")
+    arg_parser.add_argument("--scales", type=int, nargs="+", default=[1, 10],
+                            help="Множители размера данных относительно реальных (например 1 10 100)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Повторы каждого этапа")
+    arg_parser.add_argument("--only", choices=sorted(SUITES), nargs="+", default=sorted(SUITES),
+                            help="Какие наборы этапов запускать")
+    arg_parser.add_argument("--json", default=None, help="Сохранить результаты в JSON для сравнения запусков")
+    args = arg_parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gp2_bench_")
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [],
+    }
+    try:
+        for scale in args.scales:
+            results = []
+            for suite in args.only:
+                results.extend(SUITES[suite](scale, args.repeat, workdir))
+            print_results(scale, results)
+            report["results"].extend(dict(r, scale=scale) for r in results)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Замеры времени этапов и счётчики событий
+"""
@@ -0,0 +1,185 @@
+"""
+Замеры длительности этапов и счётчики событий для парсера Steam и загрузки T-Bank
+
+Таймеры (контекстный менеджер timer и декоратор timed) накапливают число вызовов,
+суммарное и максимальное время этапа; счётчики (incr) - повторы, ошибки,
+разобранные точки. Сводка за запуск сохраняется в JSON или в текстовом формате
+Prometheus.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_LABEL_ESCAPE = re.compile(r'(["\\])')
+
+
+class Metrics:
+    """
+    Набор таймеров и счётчиков одного запуска; потокобезопасен
+
+    Имена этапов и событий - строки вида "steam.page_load"; в формате Prometheus
+    они становятся значениями меток stage и event.
+    """
+
+    def __init__(self, namespace="gp2"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Сброс всех замеров и начало нового запуска"""
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+            self.started = datetime.now()
+            self._started = time.perf_counter()
+
+    def observe(self, name, seconds):
+        """Добавление одного замера длительности этапа name"""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def incr(self, name, value=1):
+        """Увеличение счётчика name на value"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, name):
+        """Замер блока with; время учитывается и при исключении"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name=None):
+        """
+        Декоратор замера вызовов функции; поддерживает async def
+
+        Args:
+            name (str, optional): Имя этапа; по умолчанию - имя функции
+        """
+        def decorator(func):
+            stage = name or func.__name__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """
+        Сводка запуска
+
+        Returns:
+            dict: started, elapsed_seconds, stages (name -> count, total/avg/max_seconds),
+                counters (name -> значение)
+        """
+        with self._lock:
+            timers = {name: list(values) for name, values in self._timers.items()}
+            counters = dict(self._counters)
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "elapsed_seconds": time.perf_counter() - self._started,
+            "stages": {
+                name: {
+                    "count": count,
+                    "total_seconds": total,
+                    "avg_seconds": total / count,
+                    "max_seconds": longest,
+                }
+                for name, (count, total, longest) in sorted(timers.items())
+            },
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def to_json(self):
+        return json.dumps(self.summary(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Сводка в текстовом формате Prometheus (для node_exporter textfile или Pushgateway)"""
+        summary = self.summary()
+        ns = self.namespace
+
+        def label(value):
+            return _LABEL_ESCAPE.sub(r"\\\1", value)
+
+        lines = [
+            f"# HELP {ns}_run_elapsed_seconds Длительность запуска",
+            f"# TYPE {ns}_run_elapsed_seconds gauge",
+            f"{ns}_run_elapsed_seconds {summary['elapsed_seconds']:.6f}",
+            f"# HELP {ns}_stage_seconds Время этапов",
+            f"# TYPE {ns}_stage_seconds summary",
+        ]
+        for name, stage in summary["stages"].items():
+            lines.append(f'{ns}_stage_seconds_sum{{stage="{label(name)}"}} {stage["total_seconds"]:.6f}')
+            lines.append(f'{ns}_stage_seconds_count{{stage="{label(name)}"}} {stage["count"]}')
+        lines += [
+            f"# HELP {ns}_stage_max_seconds Самый долгий вызов этапа",
+            f"# TYPE {ns}_stage_max_seconds gauge",
+        ]
+        for name, stage in summary["stages"].items():
+            lines.append(f'{ns}_stage_max_seconds{{stage="{label(name)}"}} {stage["max_seconds"]:.6f}')
+        lines += [
+            f"# HELP {ns}_events_total Счётчики событий",
+            f"# TYPE {ns}_events_total counter",
+        ]
+        for name, value in summary["counters"].items():
+            lines.append(f'{ns}_events_total{{event="{label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def save(self, path):
+        """
+        Сохранение сводки: .prom - формат Prometheus, иначе JSON
+
+        Returns:
+            str: path
+        """
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        logger.info(f"Метрики запуска сохранены в {path}")
+        return path
+
+    def report(self):
+        """Короткая текстовая таблица этапов и счётчиков для лога"""
+        summary = self.summary()
+        lines = [f"Запуск: {summary['elapsed_seconds']:.2f} с"]
+        for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append(f"  {name:<32} {stage['count']:>6} x {stage['avg_seconds']:>9.4f} с "
+                         f"= {stage['total_seconds']:>9.3f} с (макс. {stage['max_seconds']:.3f} с)")
+        for name, value in summary["counters"].items():
+            lines.append(f"  {name:<32} {value:>6}")
+        return "\n".join(lines)
+
+
+# Общий набор метрик процесса: модули парсера и T-Bank пишут в него
+metrics = Metrics()
+timer = metrics.timer
+timed = metrics.timed
+incr = metrics.incr
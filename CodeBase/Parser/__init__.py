@@ -0,0 +1,3 @@
+"""
+Парсер истории цен Steam Market: HTTP и Selenium, анализ, графики, экспорт
+"""
@@ -0,0 +1,338 @@
+"""
+Пакетный парсинг множества листингов Steam Market пулом потоков
+"""
+
+import argparse
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from Metrics.metrics import incr, metrics, timer
+from Storage.chunked_writer import CHUNK_ROWS
+
+from .driver_pool import DriverPool
+from .price_plot import chart_filename, render_charts
+from .price_series import PriceSeries
+from .rate_limiter import ERROR, OK, THROTTLED, AdaptiveRateLimiter, RetryScheduler
+from .selenium_parser_script import (analyze_price_data, parse_steam_market_data, response_cache, script_dir,
+                                     setup_logging, setup_selenium_driver, store)
+from .steam_history import append_history
+from .steam_http import cache_listing, cached_listing, fetch_listing_http
+from .tab_scraper import parse_listings_in_tabs
+
+# Движки, которым нужен браузер без картинок и CSS и без ожидания всей страницы
+FAST_ENGINES = ("fast", "tabs")
+
+
+def read_urls(path):
+    """Чтение URL из файла: по одному в строке, пустые строки и # комментарии пропускаются"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def listing_frame(result):
+    """
+    Анализ листинга и длинный формат (instrument, price_usd, timestamp)
+
+    Returns:
+        pd.DataFrame | None: None, если в листинге нет пригодных точек
+    """
+    stats = analyze_price_data(result['price_data'])
+    if not stats:
+        return None
+
+    series = stats['filtered_data']
+    return pd.DataFrame({
+        'instrument': result['item_name'],
+        'price_usd': np.round(series.prices, 2),
+        'timestamp': series.timestamps,
+    })
+
+
+def scrape_item(url, pool, limiter, engine="http", cache=None):
+    """
+    Одна попытка парсинга и анализа листинга; листинг из кэша не расходует токен
+    ограничителя, исход каждого запроса к Steam сообщается ограничителю
+
+    Returns:
+        tuple: (pd.DataFrame длинного формата (instrument, price_usd, timestamp) или None,
+            исход последнего запроса: OK, THROTTLED, TIMEOUT или ERROR)
+    """
+    outcome = OK
+    result = cached_listing(cache, url)
+    if not result and engine == "http":
+        limiter.wait()
+        result, outcome = fetch_listing_http(url)
+        limiter.report(outcome)
+        if outcome == THROTTLED:
+            # Браузер получил бы тот же 429; предмет вернётся в очередь после паузы
+            return None, outcome
+    if not result:
+        # Браузер из пула запускается только при первом откате на Selenium
+        limiter.wait()
+        with pool.lease() as driver:
+            result = parse_steam_market_data(url, driver=driver, fast=engine in FAST_ENGINES)
+        outcome = OK if result else ERROR
+        limiter.report(outcome)
+    if not result:
+        return None, outcome
+    cache_listing(cache, url, result)
+
+    frame = listing_frame(result)
+    return (frame, outcome) if frame is not None else (None, ERROR)
+
+
+def scrape_tabs(urls, pool, limiter, tabs, cache=None):
+    """
+    Одна попытка для нескольких листингов во вкладках одного браузера
+
+    Returns:
+        list: Пары (pd.DataFrame или None, исход) в порядке urls
+    """
+    results = {url: cached_listing(cache, url) for url in urls}
+    todo = [url for url, result in results.items() if not result]
+    if todo:
+        with pool.lease() as driver:
+            parsed = parse_listings_in_tabs(driver, todo, tabs=tabs, before_open=limiter.wait)
+        for url, result in zip(todo, parsed):
+            limiter.report(OK if result else ERROR)
+            cache_listing(cache, url, result)
+            results[url] = result
+
+    pairs = []
+    for url in urls:
+        frame = listing_frame(results[url]) if results[url] else None
+        pairs.append((frame, OK if frame is not None else ERROR))
+    return pairs
+
+
+def scrape_worker(scheduler, pool, limiter, engine, cache, sink, tabs=4):
+    """
+    Цикл потока: предметы берутся из общей очереди, неудачные возвращаются в неё с задержкой
+
+    Если поток всё же падает, очередь закрывается, чтобы остальные потоки
+    не ждали предметы, которые он уже не вернёт.
+    """
+    try:
+        while tasks := scheduler.get_many(tabs if engine == "tabs" else 1):
+            _process_tasks(tasks, scheduler, pool, limiter, engine, cache, sink, tabs)
+    except BaseException:
+        scheduler.close()
+        raise
+
+
+def _process_tasks(tasks, scheduler, pool, limiter, engine, cache, sink, tabs):
+    urls = [url for url, _ in tasks]
+    try:
+        if engine == "tabs":
+            pairs = scrape_tabs(urls, pool, limiter, tabs, cache)
+        else:
+            pairs = [scrape_item(urls[0], pool, limiter, engine, cache)]
+    except Exception as e:
+        logger.error(f"Ошибка при обработке {', '.join(urls)}: {str(e)}")
+        pairs = [(None, ERROR)] * len(urls)
+
+    for (url, attempt), (frame, outcome) in zip(tasks, pairs):
+        if frame is not None:
+            try:
+                sink.add(frame)
+            except Exception as e:
+                # Запись на диск не удалась: строки предмета убраны из буфера, предмет повторяется
+                logger.error(f"Ошибка записи результатов {url}: {str(e)}")
+                incr("steam.export_errors")
+                frame, outcome = None, ERROR
+        if frame is None:
+            if not scheduler.retry(url, attempt):
+                incr("steam.items_failed")
+                logger.error(f"Не удалось получить данные для {url} после {attempt + 1} попыток ({outcome})")
+            continue
+
+        scheduler.done(url)
+        incr("steam.items_scraped")
+        stats = scheduler.stats()
+        logger.info(f"Обработано {stats['completed'] + stats['failed']}/{stats['total']}: {url} "
+                    f"({stats['items_per_minute']:.1f} предметов/мин, "
+                    f"лимит {limiter.rate * 60:.1f} запросов/мин)")
+
+
+def chart_jobs(combined, directory):
+    """Задания render_charts для каждого предмета объединённого датасета"""
+    jobs = []
+    for item_name, frame in combined.groupby('instrument', sort=False):
+        series = PriceSeries(frame['timestamp'].to_numpy(), frame['price_usd'].to_numpy())
+        stats = series.summary()
+        stats['filtered_data'] = series
+        jobs.append((stats, item_name, chart_filename(directory, item_name)))
+    return jobs
+
+
+class HistorySink:
+    """
+    Потокобезопасная запись результатов по мере готовности: строки копятся
+    до flush_rows и дописываются в CSV и хранилище, графики рисуются по блокам,
+    так что память не растёт с числом предметов
+
+    Если запись не удалась, ничего не теряется: блок, не попавший в CSV, остаётся
+    в буфере, а строки для хранилища и графики - в очереди до следующей записи.
+    Повторная запись в CSV безопасна - append_history пропускает сохранённые точки.
+    """
+
+    def __init__(self, output, charts_dir=None, flush_rows=CHUNK_ROWS):
+        self.output = output
+        self.charts_dir = charts_dir
+        self.flush_rows = flush_rows
+        self.items = 0
+        self.rows = 0
+        self.written = 0
+        self.charts = 0
+        self._frames = []
+        self._buffered = 0
+        self._unstored = []
+        self._uncharted = []
+        self._lock = threading.Lock()
+
+    def add(self, frame):
+        """
+        Добавление строк предмета; при ошибке записи строки этого предмета
+        убираются из буфера, и исключение передаётся вызывающему
+        """
+        with self._lock:
+            self._frames.append(frame)
+            self._buffered += len(frame)
+            if self._buffered >= self.flush_rows:
+                try:
+                    self._flush()
+                except Exception:
+                    self._frames = [f for f in self._frames if f is not frame]
+                    self._buffered = sum(len(f) for f in self._frames)
+                    raise
+            self.items += 1
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._frames:
+            frames = self._frames
+            block = pd.concat(frames, ignore_index=True)
+            self._frames, self._buffered = [], 0
+            try:
+                with timer("steam.export"):
+                    written = append_history(self.output, block, 'price_usd', key_column='instrument')
+            except Exception:
+                self._frames, self._buffered = frames, len(block)
+                raise
+            self.rows += len(block)
+            self.written += len(written)
+            if len(written):
+                self._unstored.append(written)
+            if self.charts_dir:
+                self._uncharted.append(block)
+
+        if self._unstored:
+            with timer("steam.store_append"):
+                store.append("steam_market_prices", pd.concat(self._unstored, ignore_index=True))
+            self._unstored = []
+        if self._uncharted:
+            os.makedirs(self.charts_dir, exist_ok=True)
+            with timer("steam.plot"):
+                block = pd.concat(self._uncharted, ignore_index=True)
+                self.charts += len(render_charts(chart_jobs(block, self.charts_dir)))
+            self._uncharted = []
+
+
+def scrape_batch(urls, workers=4, retries=2, min_interval=2.0, output=None, engine="http", charts_dir=None,
+                 cache=None, max_rate=1.0, backoff=5.0, flush_rows=CHUNK_ROWS, tabs=4):
+    """
+    Параллельный парсинг списка листингов и запись единого датасета
+
+    Args:
+        urls (list): URL листингов
+        workers (int): Количество потоков и браузеров
+        retries (int): Число повторов для каждого предмета
+        min_interval (float): Начальный интервал между запросами, секунды; далее
+            подстраивается под ответы Steam
+        output (str): Путь к итоговому CSV; в существующий файл дописываются только новые точки
+        engine (str): "http" - HTML без браузера с откатом на Selenium, "selenium" - только браузер,
+            "fast" - браузер без картинок и CSS, ожидается только скрипт истории цен,
+            "tabs" - то же в нескольких вкладках каждого браузера
+        charts_dir (str, optional): Каталог для PNG графиков всех предметов
+        cache (ResponseCache, optional): Кэш листингов; повторный запуск после сбоя
+            не загружает уже полученные страницы
+        max_rate (float): Предельная скорость запросов, в секунду
+        backoff (float): Задержка перед первым повтором предмета, секунды; далее удваивается
+        flush_rows (int): Сколько строк копить в памяти до записи в CSV и хранилище
+        tabs (int): Вкладок на браузер для engine="tabs"
+
+    Returns:
+        dict: Число предметов и строк, записанных новых строк, скорость (items_per_minute)
+    """
+    output = output or os.path.join(script_dir, "steam_market_history.csv")
+    limiter = AdaptiveRateLimiter(rate=1 / min_interval, max_rate=max(max_rate, 1 / min_interval))
+    scheduler = RetryScheduler(urls, retries=retries, backoff=backoff)
+    sink = HistorySink(output, charts_dir, flush_rows)
+
+    logger.info(f"Пакетный парсинг {len(urls)} предметов в {workers} потоков")
+    pool = DriverPool(functools.partial(setup_selenium_driver, fast=engine in FAST_ENGINES), size=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(scrape_worker, scheduler, pool, limiter, engine, cache, sink, tabs)
+                       for _ in range(workers)]
+            for future in futures:
+                future.result()
+    finally:
+        pool.close()
+        sink.flush()
+
+    stats = scheduler.stats()
+    failed = scheduler.failed
+    logger.info(f"Скорость: {stats['items_per_minute']:.1f} предметов/мин, повторов: {stats['retries']}, "
+                f"итоговый лимит {limiter.rate * 60:.1f} запросов/мин")
+    logger.success(f"Единый датасет ({sink.rows} строк, {sink.items} предметов, новых строк: {sink.written}) "
+                   f"сохранён в {output}")
+    if charts_dir and sink.charts:
+        logger.success(f"Сохранено {sink.charts} графиков в {charts_dir}")
+    if failed:
+        logger.warning(f"Не удалось обработать {len(failed)} предметов: {failed}")
+    return {'items': sink.items, 'rows': sink.rows, 'written': sink.written, **stats}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный парсинг истории цен Steam Market")
+    parser.add_argument("urls_file", help="Файл со списком URL листингов, по одному в строке")
+    parser.add_argument("--workers", type=int, default=4, help="Количество параллельных браузеров")
+    parser.add_argument("--retries", type=int, default=2, help="Повторы для каждого предмета")
+    parser.add_argument("--min-interval", type=float, default=2.0,
+                        help="Начальный интервал между запросами, с; далее подстраивается под ответы Steam")
+    parser.add_argument("--max-rate", type=float, default=1.0, help="Предельная скорость, запросов в секунду")
+    parser.add_argument("--backoff", type=float, default=5.0, help="Задержка перед первым повтором предмета, с")
+    parser.add_argument("--output", default=None, help="Путь к итоговому CSV")
+    parser.add_argument("--engine", choices=["http", "selenium", "fast", "tabs"], default="http",
+                        help="http - загрузка HTML без браузера (с откатом на Selenium), selenium - только браузер, "
+                             "fast - браузер без картинок и CSS, tabs - то же в нескольких вкладках")
+    parser.add_argument("--tabs", type=int, default=4, help="Вкладок на браузер для --engine tabs")
+    parser.add_argument("--charts-dir", default=None, help="Каталог для графиков всех предметов (без окон)")
+    parser.add_argument("--no-cache", action="store_true", help="Не брать листинги из кэша")
+    parser.add_argument("--metrics", default=None,
+                        help="Сохранить время этапов и счётчики: .prom - формат Prometheus, иначе JSON")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    try:
+        scrape_batch(read_urls(args.urls_file), args.workers, args.retries, args.min_interval, args.output,
+                     args.engine, args.charts_dir, cache=None if args.no_cache else response_cache,
+                     max_rate=args.max_rate, backoff=args.backoff, tabs=args.tabs)
+    finally:
+        logger.info("Время этапов:\n" + metrics.report())
+        if args.metrics:
+            metrics.save(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
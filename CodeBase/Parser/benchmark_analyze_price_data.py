@@ -0,0 +1,160 @@
+"""
+Бенчмарк analyze_price_data: векторная реализация против исходного цикла по точкам
+
+Запуск из каталога CodeBase: python -m Parser.benchmark_analyze_price_data [количество точек]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+from .selenium_parser_script import analyze_price_data
+
+
+def analyze_price_data_loop(price_data):
+    """
+    Исходная реализация analyze_price_data с циклом по точкам (для сравнения)
+
+    Дополнена удалением повторяющихся меток, которое analyze_price_data делает
+    проверкой качества: из точек с одной меткой остаётся последняя.
+    """
+    if not price_data or len(price_data) < 2:
+        logger.error("Недостаточно данных для анализа")
+        return None
+    
+    logger.info(f"Анализ {len(price_data)} точек данных о ценах")
+    logger.info(f"Первые 5 точек данных: {price_data[:5]}")
+    
+    timestamps = []
+    prices = []
+    
+    for i, point in enumerate(price_data):
+        if len(point) < 2:
+            logger.warning(f"Пропуск точки данных {point}, недостаточно элементов")
+            continue
+            
+        ts, price = point[0], point[1]
+        
+        if isinstance(ts, str):
+            try:
+                clean_date_str = ts.replace(": +0", "").replace(": -0", "")
+                dt = datetime.strptime(clean_date_str, "%b %d %Y %H")
+                ts = dt.timestamp()
+                logger.debug(f"Успешно преобразована дата {ts} из строки {point[0]}")
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Невозможно преобразовать временную метку '{ts}' в дату: {str(e)}")
+                continue
+        
+        if isinstance(price, str):
+            try:
+                price = price.replace('$', '').replace('€', '').replace('£', '').replace(',', '.')
+                price = float(price)
+            except ValueError:
+                logger.warning(f"Невозможно преобразовать цену '{price}' в число, пропуск")
+                continue
+        
+        timestamps.append(ts)
+        prices.append(price)
+    
+    if not timestamps:
+        logger.error("Не удалось извлечь действительные временные метки из данных")
+        return None
+    
+    logger.info(f"Преобразование {len(timestamps)} временных меток в объекты datetime")
+    dates = []
+    for ts in timestamps:
+        try:
+            if ts > 10000000000:
+                ts = ts / 1000
+            dates.append(datetime.fromtimestamp(ts))
+        except Exception as e:
+            logger.warning(f"Ошибка преобразования временной метки {ts}: {str(e)}")
+    
+    if not dates:
+        logger.error("Не удалось преобразовать временные метки в даты")
+        return None
+    
+    data_points = list(zip(timestamps, prices, dates))
+    data_points.sort(key=lambda x: x[2])
+    data_points = [point for point, following in zip(data_points, data_points[1:] + [None])
+                   if following is None or following[2] != point[2]]
+    
+    three_years_ago = datetime.now() - timedelta(days=3*365)
+    logger.info(f"Фильтрация данных с {three_years_ago} по настоящее время")
+    
+    filtered_data = [point for point in data_points if point[2] >= three_years_ago]
+    
+    if not filtered_data:
+        logger.warning("Данные за последние 3 года не найдены")
+        filtered_data = data_points
+        logger.info("Используем все доступные данные вместо фильтрации за 3 года")
+    
+    logger.info(f"Отфильтровано {len(filtered_data)} точек данных")
+    
+    gaps = []
+    for i in range(1, len(filtered_data)):
+        current = filtered_data[i][2]
+        previous = filtered_data[i-1][2]
+        gap_minutes = (current - previous).total_seconds() / 60
+        gaps.append(gap_minutes)
+    
+    stats = {
+        'start_date': filtered_data[0][2],
+        'end_date': filtered_data[-1][2],
+        'total_points': len(filtered_data),
+        'avg_gap_minutes': sum(gaps) / len(gaps) if gaps else 0,
+        'min_gap_minutes': min(gaps) if gaps else 0,
+        'max_gap_minutes': max(gaps) if gaps else 0,
+        'filtered_data': filtered_data
+    }
+    
+    logger.success("Анализ данных завершен")
+    return stats
+
+
+
+def make_price_data(n, end=None):
+    """
+    Синтетическая история Steam: почасовые точки за последние ~3 года по кругу
+
+    При n больше числа часов за 3 года метки повторяются - так проверяется и
+    удаление дубликатов.
+    """
+    end = (end or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    hours = 3 * 365 * 24 - 48
+    data = []
+    for i in range(n):
+        moment = end - timedelta(hours=i % hours)
+        data.append([moment.strftime("%b %d %Y %H: +0"), round(0.2 + (i % 997) / 1000, 3), str(100 + i % 50)])
+    data.reverse()
+    return data
+
+
+def measure(func, price_data):
+    started = time.perf_counter()
+    stats = func(price_data)
+    return time.perf_counter() - started, stats
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    price_data = make_price_data(n)
+
+    vectorized_time, vectorized = measure(analyze_price_data, price_data)
+    loop_time, loop = measure(analyze_price_data_loop, price_data)
+
+    for key in ('start_date', 'end_date', 'total_points'):
+        assert vectorized[key] == loop[key], key
+    for key in ('avg_gap_minutes', 'min_gap_minutes', 'max_gap_minutes'):
+        assert abs(vectorized[key] - loop[key]) < 1e-6, key
+    assert vectorized['filtered_data'].prices.tolist() == [point[1] for point in loop['filtered_data']]
+
+    print(f"Точек: {n}")
+    print(f"Цикл по точкам:       {loop_time:.2f} с")
+    print(f"Векторная реализация: {vectorized_time:.2f} с ({loop_time / vectorized_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Бенчмарк: холодный запуск браузера на каждый предмет против пула WebDriver
+
+Требует установленный Chrome и доступ к steamcommunity.com.
+Запуск из каталога CodeBase: python -m Parser.benchmark_driver_pool [URL ...]
+"""
+
+import sys
+import time
+
+from .driver_pool import DriverPool
+from .selenium_parser_script import parse_steam_market_data, parse_steam_market_items, setup_selenium_driver
+
+DEFAULT_URLS = [
+    "https://steamcommunity.com/market/listings/730/Chroma%203%20Case",
+    "https://steamcommunity.com/market/listings/730/Chroma%202%20Case",
+    "https://steamcommunity.com/market/listings/730/Clutch%20Case",
+    "https://steamcommunity.com/market/listings/730/Fracture%20Case",
+]
+
+
+def main():
+    urls = sys.argv[1:] or DEFAULT_URLS
+
+    started = time.perf_counter()
+    for url in urls:
+        parse_steam_market_data(url)
+    cold = (time.perf_counter() - started) / len(urls)
+
+    started = time.perf_counter()
+    with DriverPool(setup_selenium_driver, size=1) as pool:
+        startup = time.perf_counter() - started
+        started = time.perf_counter()
+        parse_steam_market_items(urls, pool)
+        warm = (time.perf_counter() - started) / len(urls)
+
+    print(f"Предметов: {len(urls)}")
+    print(f"Холодный запуск: {cold:.2f} с на предмет")
+    print(f"Пул (после запуска за {startup:.2f} с): {warm:.2f} с на предмет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Пул Selenium WebDriver для повторного использования браузеров между предметами
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from loguru import logger
+
+
+class DriverPool:
+    """
+    Запускает size экземпляров браузера один раз и выдаёт их во временное
+    пользование через lease(). Потокобезопасен: несколько потоков могут
+    арендовать разные драйверы одновременно.
+    """
+
+    def __init__(self, driver_factory, size=2):
+        """
+        Args:
+            driver_factory (callable): Функция без аргументов, возвращающая WebDriver
+            size (int): Количество браузеров в пуле
+        """
+        self.driver_factory = driver_factory
+        self.size = size
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """Параллельный запуск всех браузеров пула"""
+        with self._start_lock:
+            if not self._started:
+                self._launch()
+        return self
+
+    def _launch(self):
+        logger.info(f"Запуск пула из {self.size} WebDriver")
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.driver_factory) for _ in range(self.size)]
+        drivers = [future.result() for future in futures if future.exception() is None]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            # Уже запущенные браузеры закрываются, иначе их процессы останутся висеть
+            for driver in drivers:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            logger.error(f"Не удалось запустить {len(errors)} из {self.size} WebDriver")
+            raise errors[0]
+        for driver in drivers:
+            self._drivers.append(driver)
+            self._idle.put(driver)
+        self._started = True
+        logger.success(f"Пул WebDriver готов: {self.size} экземпляров")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def _create(self):
+        driver = self.driver_factory()
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _replace(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        logger.warning("WebDriver пула не отвечает, запускаем замену")
+        return self._create()
+
+    @staticmethod
+    def _alive(driver):
+        """Отвечает ли браузер: парсер перехватывает ошибки сам, поэтому падение видно только по запросу"""
+        try:
+            driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        Аренда свободного драйвера; после выхода из блока драйвер возвращается в пул.
+        Драйвер, который после работы не отвечает, пересоздаётся. Если пересоздать
+        не удалось, в пул возвращается пустой слот: драйвер для него запускается
+        при следующей аренде, а ошибка запуска передаётся арендатору.
+        """
+        if not self._started:
+            self.start()
+        driver = self._idle.get(timeout=timeout)
+        if driver is None:
+            try:
+                driver = self._create()
+            except Exception:
+                self._idle.put(None)
+                raise
+        try:
+            yield driver
+        finally:
+            if not self._alive(driver):
+                try:
+                    driver = self._replace(driver)
+                except Exception as replace_error:
+                    logger.error(f"Не удалось пересоздать WebDriver: {str(replace_error)}")
+                    driver = None
+            self._idle.put(driver)
+
+    def close(self):
+        """Закрытие всех браузеров пула"""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.Queue()
+        self._started = False
+        logger.info("Пул WebDriver закрыт")
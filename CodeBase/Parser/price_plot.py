@@ -0,0 +1,158 @@
+"""
+Построение графиков истории цен без интерактивного окна: Agg, переиспользование
+фигуры, прореживание до ширины в пикселях и параллельная отрисовка
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from loguru import logger
+
+FIGSIZE = (15, 8)
+DPI = 300
+
+_renderer = None
+
+
+def chart_filename(directory, item_name):
+    """Путь к PNG графика предмета"""
+    return os.path.join(directory, f"{item_name.replace(' ', '_').replace('|', '').replace(':', '')}_price_history.png")
+
+
+def info_text(stats):
+    """Текст со статистикой периода для подписи графика"""
+    return (
+        f"Период данных: с {stats['start_date'].strftime('%Y-%m-%d')} по {stats['end_date'].strftime('%Y-%m-%d')}\n"
+        f"Всего точек данных: {stats['total_points']}\n"
+        f"Средний промежуток между точками: {stats['avg_gap_minutes']:.2f} минут\n"
+        f"Минимальный промежуток: {stats['min_gap_minutes']:.2f} минут\n"
+        f"Максимальный промежуток: {stats['max_gap_minutes']:.2f} минут"
+    )
+
+
+def decimate_minmax(x, y, width):
+    """
+    Прореживание ряда до ширины графика: в каждом из width интервалов по оси x
+    остаются первая, последняя, минимальная и максимальная точки, так что
+    линия на графике выглядит так же, как без прореживания
+
+    Args:
+        x (np.ndarray): Координаты по возрастанию
+        y (np.ndarray): Значения
+        width (int): Число интервалов (ширина графика в пикселях)
+
+    Returns:
+        np.ndarray: Индексы оставленных точек по возрастанию
+    """
+    n = len(x)
+    if n <= 4 * width:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    span = x[-1] - x[0] or 1.0
+    buckets = np.minimum(((x - x[0]) * (width / span)).astype(np.int64), width - 1)
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    order = np.lexsort((y, buckets))
+    first_in_bucket = np.searchsorted(buckets[order], buckets[starts], side="left")
+    last_in_bucket = np.searchsorted(buckets[order], buckets[starts], side="right") - 1
+
+    keep = np.concatenate([starts, ends, order[first_in_bucket], order[last_in_bucket]])
+    return np.unique(keep)
+
+
+def draw_price_chart(fig, stats, item_name, decimate=True):
+    """
+    Отрисовка графика цен и статистики на фигуре
+
+    Args:
+        fig (matplotlib.figure.Figure): Фигура; содержимое очищается
+        stats (dict): Статистика из analyze_price_data
+        item_name (str): Название предмета
+        decimate (bool): Прореживать ряд до ширины фигуры в пикселях
+    """
+    series = stats['filtered_data']
+    dates = series.dates
+    prices = series.prices
+    if decimate:
+        width = int(fig.get_figwidth() * fig.dpi)
+        idx = decimate_minmax(series.timestamps, prices, width)
+        dates, prices = dates[idx], prices[idx]
+
+    fig.clf()
+    ax = fig.add_subplot()
+    ax.plot(dates, prices, marker='.', linestyle='-', color='orange', linewidth=1)
+    ax.set_xlabel('Дата')
+    ax.set_ylabel('Цена')
+    ax.set_title(f'История цен для {item_name} (С {stats["start_date"].strftime("%Y-%m-%d")} по {stats["end_date"].strftime("%Y-%m-%d")})')
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+
+    fig.text(0.02, 0.02, info_text(stats), wrap=True, fontsize=10,
+             bbox=dict(facecolor='white', alpha=0.8))
+
+
+class ChartRenderer:
+    """
+    Отрисовка графиков в PNG без pyplot и интерактивного окна
+
+    Одна фигура переиспользуется для всех предметов, поэтому серия графиков
+    не создаёт новые фигуры и не требует plt.close.
+    """
+
+    def __init__(self, figsize=FIGSIZE, dpi=DPI, decimate=True):
+        # matplotlib загружается только при первом построении графика
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.decimate = decimate
+
+    def render(self, stats, item_name, filename):
+        """Отрисовка графика предмета и сохранение в filename"""
+        draw_price_chart(self.figure, stats, item_name, self.decimate)
+        self.figure.savefig(filename, dpi=self.figure.dpi, bbox_inches='tight')
+        return filename
+
+
+def _init_worker(figsize, dpi, decimate):
+    global _renderer
+    _renderer = ChartRenderer(figsize, dpi, decimate)
+
+
+def _render_job(job):
+    stats, item_name, filename = job
+    return _renderer.render(stats, item_name, filename)
+
+
+def render_charts(jobs, workers=None, figsize=FIGSIZE, dpi=DPI, decimate=True):
+    """
+    Параллельная отрисовка графиков многих предметов в пуле процессов
+
+    Args:
+        jobs (list): Кортежи (stats, item_name, filename)
+        workers (int, optional): Количество процессов; по умолчанию - число ядер
+        figsize (tuple): Размер фигуры, дюймы
+        dpi (int): Разрешение PNG
+        decimate (bool): Прореживать ряды до ширины фигуры в пикселях
+
+    Returns:
+        list: Пути сохранённых графиков
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    logger.info(f"Отрисовка {len(jobs)} графиков в {workers} процессов")
+
+    if workers == 1:
+        _init_worker(figsize, dpi, decimate)
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(figsize, dpi, decimate)) as executor:
+        return list(executor.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
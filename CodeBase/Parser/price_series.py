@@ -0,0 +1,104 @@
+"""
+Компактный временной ряд цен на непрерывных массивах numpy
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from dateutil import tz
+
+
+def local_timezone():
+    """Локальный часовой пояс в виде, который pandas обрабатывает векторно"""
+    return tz.gettz() or tz.tzlocal()
+
+
+def _to_seconds(moment):
+    if isinstance(moment, pd.Timestamp):
+        moment = moment.to_pydatetime()
+    if isinstance(moment, datetime):
+        return int(moment.timestamp())
+    return int(moment)
+
+
+class PriceSeries:
+    """
+    Ряд цен: timestamps (int64, Unix-время в секундах, по возрастанию)
+    и prices (float64) - 16 байт на точку.
+
+    Срезы и выборка по времени возвращают представления тех же массивов без копирования.
+    Локальные даты (dates) вычисляются при первом обращении и кэшируются.
+    """
+
+    __slots__ = ("timestamps", "prices", "_dates")
+
+    def __init__(self, timestamps, prices, dates=None):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        if len(self.timestamps) != len(self.prices):
+            raise ValueError("Длины массивов timestamps и prices не совпадают")
+        self._dates = dates
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            dates = self._dates[index] if self._dates is not None else None
+            return PriceSeries(self.timestamps[index], self.prices[index], dates)
+        return int(self.timestamps[index]), float(self.prices[index]), self.dates[index].to_pydatetime()
+
+    def __repr__(self):
+        return f"PriceSeries({len(self)} точек)"
+
+    @property
+    def dates(self):
+        """Наивные локальные даты (pd.DatetimeIndex), как у datetime.fromtimestamp"""
+        if self._dates is None:
+            self._dates = (pd.to_datetime(self.timestamps, unit="s", utc=True)
+                           .tz_convert(local_timezone())
+                           .tz_localize(None))
+        return self._dates
+
+    @property
+    def nbytes(self):
+        """Память под массивы цен и временных меток"""
+        return self.timestamps.nbytes + self.prices.nbytes
+
+    def between(self, start=None, end=None):
+        """
+        Точки в интервале [start, end) без копирования данных
+
+        Args:
+            start (datetime | int, optional): Начало; наивные datetime считаются локальным временем
+            end (datetime | int, optional): Конец (не включается)
+
+        Returns:
+            PriceSeries: Представление части ряда
+        """
+        lo = 0 if start is None else np.searchsorted(self.timestamps, _to_seconds(start), side="left")
+        hi = len(self) if end is None else np.searchsorted(self.timestamps, _to_seconds(end), side="left")
+        return self[lo:hi]
+
+    def summary(self):
+        """
+        Период ряда и промежутки между соседними точками (по локальным датам)
+
+        Returns:
+            dict: start_date, end_date, total_points, avg/min/max_gap_minutes
+        """
+        dates = self.dates
+        gaps = np.diff(dates.values).astype("timedelta64[ns]").astype(np.int64) / 6e10
+        return {
+            'start_date': dates[0].to_pydatetime(),
+            'end_date': dates[-1].to_pydatetime(),
+            'total_points': len(self),
+            'avg_gap_minutes': float(gaps.mean()) if len(gaps) else 0,
+            'min_gap_minutes': float(gaps.min()) if len(gaps) else 0,
+            'max_gap_minutes': float(gaps.max()) if len(gaps) else 0,
+        }
+
+    def to_frame(self):
+        """DataFrame с колонками timestamp и price"""
+        return pd.DataFrame({"timestamp": self.timestamps, "price": self.prices})
@@ -0,0 +1,260 @@
+"""
+Общий для всех потоков ограничитель частоты запросов к Steam и очередь
+повторов с экспоненциальной задержкой
+
+Steam отвечает 429 на частые запросы к рынку, причём допустимая частота
+заранее неизвестна и меняется. AdaptiveRateLimiter - корзина токенов, скорость
+пополнения которой растёт понемногу после серии успешных ответов и падает вдвое
+после 429 (AIMD, как у управления перегрузкой TCP); после 429 все потоки
+дополнительно ждут паузу, удваивающуюся при повторных 429 подряд.
+"""
+
+import heapq
+import random
+import threading
+import time
+
+from loguru import logger
+
+from Metrics.metrics import incr, metrics
+
+# Исходы запроса, которые поток сообщает ограничителю
+OK = "ok"
+THROTTLED = "throttled"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+class AdaptiveRateLimiter:
+    """Корзина токенов, подстраивающая скорость под ответы Steam"""
+
+    def __init__(self, rate=0.5, min_rate=1 / 60, max_rate=2.0, burst=1, increase=0.05, success_window=10,
+                 cooldown=60.0, max_cooldown=600.0):
+        """
+        Args:
+            rate (float): Начальная скорость, запросов в секунду
+            min_rate (float): Нижняя граница скорости
+            max_rate (float): Верхняя граница скорости
+            burst (int): Ёмкость корзины - сколько запросов можно сделать подряд без ожидания
+            increase (float): Прибавка к скорости после success_window успешных ответов подряд
+            success_window (int): Число успешных ответов для увеличения скорости
+            cooldown (float): Пауза всех потоков после первого 429, секунды
+            max_cooldown (float): Предел паузы при повторных 429 подряд, секунды
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.success_window = success_window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._rate = min(max(rate, min_rate), max_rate)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._successes = 0
+        self._throttle_streak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        """Текущая скорость, запросов в секунду"""
+        with self._lock:
+            return self._rate
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait(self):
+        """Ожидание токена перед запросом"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                else:
+                    delay = (1 - self._tokens) / self._rate
+            time.sleep(delay)
+            waited += delay
+        if waited:
+            metrics.observe("steam.rate_limit_wait", waited)
+
+    def _set_rate(self, rate, now):
+        self._refill(now)
+        self._rate = min(max(rate, self.min_rate), self.max_rate)
+
+    def report(self, outcome):
+        """
+        Учёт исхода запроса
+
+        Args:
+            outcome (str): OK, THROTTLED (HTTP 429), TIMEOUT (таймаут или 5xx) или ERROR
+        """
+        with self._lock:
+            now = time.monotonic()
+            if outcome == OK:
+                self._throttle_streak = 0
+                self._successes += 1
+                if self._successes >= self.success_window:
+                    self._successes = 0
+                    self._set_rate(self._rate + self.increase, now)
+            elif outcome == THROTTLED:
+                self._successes = 0
+                self._throttle_streak += 1
+                self._set_rate(self._rate / 2, now)
+                pause = min(self.cooldown * 2 ** (self._throttle_streak - 1), self.max_cooldown)
+                self._paused_until = max(self._paused_until, now + pause)
+                self._tokens = 0.0
+            elif outcome == TIMEOUT:
+                self._successes = 0
+                self._set_rate(self._rate * 0.75, now)
+            rate = self._rate
+
+        incr(f"steam.requests_{outcome}")
+        if outcome == THROTTLED:
+            logger.warning(f"Steam ответил 429: пауза {pause:.0f} с, скорость {rate * 60:.1f} запросов/мин")
+        elif outcome == TIMEOUT:
+            logger.warning(f"Таймаут Steam: скорость снижена до {rate * 60:.1f} запросов/мин")
+
+
+class RetryScheduler:
+    """
+    Потокобезопасная очередь предметов: неудачные возвращаются в неё
+    с экспоненциальной задержкой, не занимая поток на время ожидания
+    """
+
+    def __init__(self, items, retries=2, backoff=5.0, max_backoff=300.0, jitter=0.1):
+        """
+        Args:
+            items (list): Предметы (URL)
+            retries (int): Число повторов для каждого предмета
+            backoff (float): Задержка перед первым повтором, секунды; далее удваивается
+            max_backoff (float): Предел задержки, секунды
+            jitter (float): Случайный разброс задержки, доля от неё
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.completed = 0
+        self.failed = []
+        self.retried = 0
+        self._queue = [(0.0, i, item, 0) for i, item in enumerate(items)]
+        self._sequence = len(self._queue)
+        self._pending = len(self._queue)
+        self._total = len(self._queue)
+        self._started = time.monotonic()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def get(self):
+        """
+        Следующий готовый к обработке предмет; ждёт, пока истечёт задержка повтора
+
+        Returns:
+            tuple | None: (предмет, номер попытки) или None, когда все предметы обработаны
+                или очередь закрыта
+        """
+        with self._condition:
+            while True:
+                if not self._pending or self._closed:
+                    return None
+                if self._queue:
+                    ready_at, _, item, attempt = self._queue[0]
+                    delay = ready_at - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        return item, attempt
+                    self._condition.wait(delay)
+                else:
+                    # Остальные предметы в работе у других потоков и ещё могут вернуться в очередь
+                    self._condition.wait()
+
+    def get_many(self, n):
+        """
+        До n готовых предметов: ждёт первый, остальные берёт, только если их
+        задержка уже истекла
+
+        Returns:
+            list: Пары (предмет, номер попытки); пустой, когда все предметы обработаны
+        """
+        first = self.get()
+        if first is None:
+            return []
+        tasks = [first]
+        with self._condition:
+            now = time.monotonic()
+            while len(tasks) < n and self._queue and self._queue[0][0] <= now:
+                _, _, item, attempt = heapq.heappop(self._queue)
+                tasks.append((item, attempt))
+        return tasks
+
+    def close(self):
+        """
+        Остановка очереди: ожидающие и последующие get() возвращают None
+
+        Вызывается, когда поток завершился с ошибкой, не вернув свои предметы:
+        иначе остальные потоки ждали бы их вечно.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def done(self, item):
+        """Предмет успешно обработан"""
+        with self._condition:
+            self.completed += 1
+            self._pending -= 1
+            self._condition.notify_all()
+
+    def retry(self, item, attempt):
+        """
+        Возврат предмета в очередь после неудачной попытки
+
+        Args:
+            item: Предмет
+            attempt (int): Номер неудавшейся попытки, с 0
+
+        Returns:
+            bool: True - повтор запланирован, False - попытки исчерпаны
+        """
+        with self._condition:
+            if attempt >= self.retries:
+                self.failed.append(item)
+                self._pending -= 1
+                self._condition.notify_all()
+                return False
+            delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+            heapq.heappush(self._queue, (time.monotonic() + delay, self._sequence, item, attempt + 1))
+            self._sequence += 1
+            self.retried += 1
+            self._condition.notify_all()
+        incr("steam.retries")
+        logger.warning(f"Повтор {attempt + 1}/{self.retries} для {item} через {delay:.0f} с")
+        return True
+
+    def items_per_minute(self):
+        """Успешно обработанных предметов в минуту с момента создания очереди"""
+        elapsed = time.monotonic() - self._started
+        return self.completed * 60 / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        """
+        Returns:
+            dict: total, completed, failed, retries, items_per_minute
+        """
+        with self._condition:
+            return {
+                'total': self._total,
+                'completed': self.completed,
+                'failed': len(self.failed),
+                'retries': self.retried,
+                'items_per_minute': self.items_per_minute(),
+            }
@@ -0,0 +1,97 @@
+"""
+Пересчёт статистики по уже сохранённой истории цен без сети и браузера
+
+Запуск из каталога CodeBase: python gp2.py analyze <CSV ...> [--days 1095] [--charts-dir charts]
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .price_plot import chart_filename, info_text, render_charts
+from .price_series import PriceSeries
+from .steam_history import read_history
+
+DETAILED_SUFFIX = "_price_data.csv"
+
+
+def load_series(path):
+    """
+    Ряды цен из CSV экспорта: подробного (timestamp, date, price)
+    или единого (instrument, price_usd, timestamp)
+
+    Args:
+        path (str): Путь к CSV
+
+    Returns:
+        dict: Название предмета -> PriceSeries по возрастанию времени
+    """
+    df = read_history(path)
+    if df is None:
+        raise FileNotFoundError(path)
+
+    price_column = "price_usd" if "price_usd" in df.columns else "price"
+    df = df.dropna(subset=["timestamp", price_column])
+    if "instrument" in df.columns:
+        groups = df.groupby("instrument", sort=False)
+    else:
+        name = os.path.basename(path)
+        if name.endswith(DETAILED_SUFFIX):
+            name = name[:-len(DETAILED_SUFFIX)]
+        groups = [(name.replace("_", " "), df)]
+
+    result = {}
+    for name, frame in groups:
+        frame = frame.sort_values("timestamp", kind="stable")
+        result[name] = PriceSeries(frame["timestamp"].to_numpy(dtype=np.int64),
+                                   frame[price_column].to_numpy(dtype=np.float64))
+    return result
+
+
+def analyze_stored(paths, days=None):
+    """
+    Статистика analyze_price_data для сохранённых рядов
+
+    Args:
+        paths (list): CSV экспорта
+        days (int, optional): Оставить только последние days дней
+
+    Returns:
+        dict: Название предмета -> stats (как у analyze_price_data)
+    """
+    results = {}
+    since = datetime.now() - timedelta(days=days) if days else None
+    for path in paths:
+        for name, series in load_series(path).items():
+            if since is not None:
+                series = series.between(since)
+            if not len(series):
+                continue
+            stats = series.summary()
+            stats['filtered_data'] = series
+            results[name] = stats
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Статистика по сохранённой истории цен Steam")
+    parser.add_argument("paths", nargs="+", help="CSV экспорта (подробный или steam_market_prices.csv)")
+    parser.add_argument("--days", type=int, default=None, help="Учитывать только последние N дней")
+    parser.add_argument("--charts-dir", default=None, help="Каталог для PNG графиков (без окон)")
+    args = parser.parse_args(argv)
+
+    results = analyze_stored(args.paths, args.days)
+    for name, stats in results.items():
+        print(f"{name}\n{info_text(stats)}\n")
+
+    if args.charts_dir and results:
+        os.makedirs(args.charts_dir, exist_ok=True)
+        jobs = [(stats, name, chart_filename(args.charts_dir, name)) for name, stats in results.items()]
+        paths = render_charts(jobs)
+        print(f"Сохранено {len(paths)} графиков в {args.charts_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,86 @@
 """
 Steam Market Parser - Улучшенная версия с использованием Selenium
+
+Импорт модуля не настраивает логи и не загружает selenium и matplotlib:
+они подключаются при первом запуске браузера или построении окна графика.
 """
 
-import time
-import re
-import json
 import os
 import locale
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import numpy as np
 from loguru import logger
 import pandas as pd
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from Analytics.quality import check_series, quality_summary
+from Metrics.metrics import incr, metrics, timed, timer
+from Storage.dataset_store import DatasetStore
+from Storage.response_cache import ResponseCache
 
-try:
-    locale.setlocale(locale.LC_TIME, 'en_US.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_TIME, 'C')
-    except:
-        print("Предупреждение: Не удалось установить английскую локаль, парсинг дат может работать некорректно")
+from .price_plot import DPI, FIGSIZE, ChartRenderer, chart_filename, draw_price_chart, info_text
+from .price_series import PriceSeries, local_timezone
+from .steam_history import append_history
+from .tab_scraper import FAST_PREFS, parse_listings_in_tabs
+from .steam_http import (cache_listing, cached_listing, extract_line1, item_name_from_url,
+                         parse_steam_market_data_http)
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 log_file = os.path.join(script_dir, "steam_parser.log")
+store = DatasetStore(os.path.join(script_dir, "datasets"))
+# Страницы листингов, полученные за последние 15 минут, повторно не загружаются
+response_cache = ResponseCache(os.path.join(script_dir, "cache"), ttl=15 * 60)
+
+
+def setup_logging():
+    """
+    Настройка логов парсера: файл steam_parser.log и предупреждения в консоль,
+    английская локаль для названий месяцев в датах Steam
+    """
+    try:
+        locale.setlocale(locale.LC_TIME, 'en_US.UTF-8')
+    except:
+        try:
+            locale.setlocale(locale.LC_TIME, 'C')
+        except:
+            print("Предупреждение: Не удалось установить английскую локаль, парсинг дат может работать некорректно")
+
+    logger.remove()
+    logger.add(log_file, rotation="10 MB", level="INFO", 
+               format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}")
+    logger.add(lambda msg: print(f"LOG: {msg}"), level="INFO", 
+              filter=lambda record: record["level"].name in ["WARNING", "ERROR", "CRITICAL"])
 
-logger.remove()
-logger.add(log_file, rotation="10 MB", level="INFO", 
-           format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}")
-logger.add(lambda msg: print(f"LOG: {msg}"), level="INFO", 
-          filter=lambda record: record["level"].name in ["WARNING", "ERROR", "CRITICAL"])
+
+@functools.lru_cache(maxsize=None)
+def chromedriver_path():
+    """
+    Путь к chromedriver, скачанному webdriver_manager; вычисляется один раз за процесс
+
+    Returns:
+        str: Путь к исполняемому файлу драйвера
+    """
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
 
 
-def setup_selenium_driver():
+@timed("steam.driver_startup")
+def setup_selenium_driver(fast=False):
     """
     Настройка и возвращение Selenium WebDriver
     
+    Args:
+        fast (bool): Режим для parse_listings_in_tabs: driver.get не ждёт загрузки
+            страницы, изображения и CSS не загружаются
+    
     Returns:
         webdriver: Настроенный экземпляр драйвера Chrome
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     logger.info("Настройка Selenium Chrome WebDriver")
     
     chrome_options = Options()
@@ -54,11 +90,14 @@ def setup_selenium_driver():
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument(f"user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    if fast:
+        chrome_options.page_load_strategy = "none"
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", FAST_PREFS)
     
     try:
         try:
-            from webdriver_manager.chrome import ChromeDriverManager
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
             logger.info("WebDriver успешно инициализирован с помощью webdriver_manager")
         except:
             driver = webdriver.Chrome(options=chrome_options)
@@ -74,35 +113,52 @@ def setup_selenium_driver():
         raise
 
 
-def parse_steam_market_data(url):
+@timed("steam.parse_selenium")
+def parse_steam_market_data(url, driver=None, fast=False):
     """
     Парсинг данных истории цен с рынка Steam с использованием Selenium
     
     Args:
         url (str): URL листинга на рынке Steam
+        driver (webdriver, optional): Уже запущенный драйвер (например, из DriverPool).
+            Если не передан, создаётся новый и закрывается после парсинга
+        fast (bool): Ждать только скрипт с line1, без таблицы предложений и скриншота;
+            драйвер лучше создавать setup_selenium_driver(fast=True)
         
     Returns:
         dict: Словарь, содержащий название предмета и данные о ценах
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     logger.info(f"Начало парсинга данных с: {url}")
     
-    try:
-        driver = setup_selenium_driver()
-    except Exception as e:
-        logger.critical(f"Не удалось настроить Selenium WebDriver: {str(e)}")
-        return None
+    owns_driver = driver is None
+    if owns_driver:
+        try:
+            driver = setup_selenium_driver(fast=fast)
+        except Exception as e:
+            logger.critical(f"Не удалось настроить Selenium WebDriver: {str(e)}")
+            return None
     
     try:
-        logger.info("Загрузка страницы Steam Market")
-        driver.get(url)
+        if fast:
+            with timer("steam.page_load"):
+                return parse_listings_in_tabs(driver, [url], tabs=1)[0]
         
-        logger.info("Ожидание загрузки содержимого страницы")
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.ID, "market_commodity_forsale_table"))
-        )
+        with timer("steam.page_load"):
+            logger.info("Загрузка страницы Steam Market")
+            driver.get(url)
+            
+            logger.info("Ожидание загрузки содержимого страницы")
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.ID, "market_commodity_forsale_table"))
+            )
         
         screenshot_path = os.path.join(script_dir, "steam_page_screenshot.png")
-        driver.save_screenshot(screenshot_path)
+        with timer("steam.screenshot"):
+            driver.save_screenshot(screenshot_path)
         logger.info(f"Сохранен скриншот страницы: {screenshot_path}")
         
         item_name = "Chroma 3 Case"  
@@ -122,7 +178,7 @@ def parse_steam_market_data(url):
                 logger.warning(f"Не удалось получить название предмета через xpath: {str(e2)}")
                 
                 try:
-                    item_name = url.split('/')[-1].replace('%20', ' ').replace('%3A', ':')
+                    item_name = item_name_from_url(url)
                     logger.info(f"Извлечено название предмета из URL: {item_name}")
                 except:
                     logger.warning("Не удалось извлечь название предмета из URL, используем значение по умолчанию")
@@ -131,52 +187,47 @@ def parse_steam_market_data(url):
             item_name = "Chroma 3 Case"
             logger.warning(f"Название предмета пустое, используем значение по умолчанию: {item_name}")
         
-        logger.info("Извлечение данных истории цен через JavaScript")
+        with timer("steam.extract_line1"):
+            logger.info("Извлечение данных истории цен через JavaScript")
         
-        try:
-            price_data = driver.execute_script("return line1;")
-            if price_data and len(price_data) > 0:
-                logger.info(f"Успешно получены данные истории цен через переменную line1 ({len(price_data)} точек)")
-            else:
-                logger.warning("Не удалось получить данные через переменную line1, пробуем альтернативный метод")
+            try:
+                price_data = driver.execute_script("return line1;")
+                if price_data and len(price_data) > 0:
+                    logger.info(f"Успешно получены данные истории цен через переменную line1 ({len(price_data)} точек)")
+                else:
+                    logger.warning("Не удалось получить данные через переменную line1, пробуем альтернативный метод")
+                    price_data = None
+            except Exception as e:
+                logger.warning(f"Ошибка при доступе к переменной line1: {str(e)}")
                 price_data = None
-        except Exception as e:
-            logger.warning(f"Ошибка при доступе к переменной line1: {str(e)}")
-            price_data = None
         
-        if not price_data:
-            logger.info("Поиск данных истории цен в скрипте")
-            try:
-                script_elements = driver.find_elements(By.TAG_NAME, "script")
+            if not price_data:
+                logger.info("Поиск данных истории цен в скрипте")
+                try:
+                    script_elements = driver.find_elements(By.TAG_NAME, "script")
                 
-                for script in script_elements:
-                    try:
-                        script_content = script.get_attribute("innerHTML")
-                        if "var line1=" in script_content:
-                            logger.info("Найден скрипт с данными истории цен")
+                    for script in script_elements:
+                        try:
+                            script_content = script.get_attribute("innerHTML")
+                            if "var line1=" in script_content:
+                                logger.info("Найден скрипт с данными истории цен")
                             
-                            match = re.search(r"var line1=(\[.*?\]);", script_content, re.DOTALL)
-                            if match:
-                                price_data_str = match.group(1)
-                                
-                                try:
-                                    price_data = json.loads(price_data_str)
+                                price_data = extract_line1(script_content)
+                                if price_data:
                                     logger.info(f"Успешно извлечены данные истории цен ({len(price_data)} точек)")
                                     break
-                                except json.JSONDecodeError:
-                                    price_data = eval(price_data_str)
-                                    logger.info(f"Успешно извлечены данные истории цен с использованием eval ({len(price_data)} точек)")
-                                    break
-                    except Exception as script_error:
-                        logger.debug(f"Ошибка обработки скрипта: {str(script_error)}")
-                        continue
-            except Exception as e:
-                logger.error(f"Ошибка при поиске данных в скриптах: {str(e)}")
+                        except Exception as script_error:
+                            logger.debug(f"Ошибка обработки скрипта: {str(script_error)}")
+                            continue
+                except Exception as e:
+                    logger.error(f"Ошибка при поиске данных в скриптах: {str(e)}")
         
         if not price_data:
             logger.error("Не удалось извлечь данные истории цен")
+            incr("steam.parse_failures")
             return None
-            
+        
+        incr("steam.points_parsed", len(price_data))
         logger.info(f"Пример данных (первые 3 точки): {price_data[:3]}")
         logger.info(f"Итоговое название предмета для анализа: {item_name}")
         
@@ -187,16 +238,190 @@ def parse_steam_market_data(url):
         
     except Exception as e:
         logger.error(f"Ошибка при парсинге данных с помощью Selenium: {str(e)}")
+        incr("steam.parse_failures")
         return None
         
     finally:
-        try:
-            logger.info("Закрытие Selenium WebDriver")
-            driver.quit()
-        except:
-            pass
+        if owns_driver:
+            try:
+                logger.info("Закрытие Selenium WebDriver")
+                driver.quit()
+            except:
+                pass
+
+
+def fetch_price_history(url, engine="http", driver=None, cache=None):
+    """
+    Получение истории цен выбранным движком
+    
+    Args:
+        url (str): URL листинга на рынке Steam
+        engine (str): "http" - загрузка HTML без браузера с откатом на Selenium при неудаче,
+            "selenium" - только через браузер, "fast" - браузер без ожидания всей страницы
+        driver (webdriver, optional): Драйвер для Selenium
+        cache (ResponseCache, optional): Кэш результатов по URL
+        
+    Returns:
+        dict: Словарь, содержащий название предмета и данные о ценах
+    """
+    if engine not in ("http", "selenium", "fast"):
+        raise ValueError(f"Неизвестный движок парсинга: {engine}")
+    result = cached_listing(cache, url)
+    if result:
+        return result
+    
+    if engine == "http":
+        result = parse_steam_market_data_http(url)
+        if not result:
+            logger.warning("HTTP-движок не получил данные, переключаемся на Selenium")
+    if not result:
+        result = parse_steam_market_data(url, driver=driver, fast=engine == "fast")
+    cache_listing(cache, url, result)
+    return result
+
+
+def parse_steam_market_items(urls, pool, tabs=None):
+    """
+    Парсинг нескольких листингов с использованием браузеров из пула
+    
+    Args:
+        urls (list): URL листингов на рынке Steam
+        pool (DriverPool): Пул запущенных драйверов (для tabs - из setup_selenium_driver(fast=True))
+        tabs (int, optional): Вкладок на браузер; листинги делятся между браузерами пула
+            и загружаются parse_listings_in_tabs. По умолчанию - по одному листингу
+            через parse_steam_market_data
+        
+    Returns:
+        list: Результаты парсинга в порядке urls (None для неудачных)
+    """
+    if not tabs:
+        results = []
+        for url in urls:
+            with pool.lease() as driver:
+                results.append(parse_steam_market_data(url, driver=driver))
+        return results
+    
+    def parse_group(group):
+        with pool.lease() as driver:
+            return parse_listings_in_tabs(driver, group, tabs=tabs)
+    
+    groups = [urls[i::pool.size] for i in range(pool.size)]
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        parsed = list(executor.map(parse_group, groups))
+    results = {}
+    for group, group_results in zip(groups, parsed):
+        results.update(zip(group, group_results))
+    return [results[url] for url in urls]
+
+
+MONTHS = {name: i for i, name in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1)}
+
+
+def _parse_steam_dates(strings):
+    """
+    Разбор строк дат Steam ("Mar 05 2025 01: +0") в наивные datetime64[ns]
+    
+    Строки фиксированного формата разбираются арифметикой над кодами символов,
+    остальные - через pd.to_datetime. Нераспознанные даты возвращаются как NaT.
+    """
+    result = np.full(len(strings), np.datetime64("NaT"), dtype="datetime64[ns]")
+    arr = np.asarray(strings, dtype=str)
+    width = arr.dtype.itemsize // 4
+    
+    fast = np.zeros(len(arr), dtype=bool)
+    if width >= 18:
+        chars = arr.view(np.uint32).reshape(len(arr), width)
+        digits = chars[:, [4, 5, 7, 8, 9, 10, 12, 13]] - ord("0")
+        fast = ((digits <= 9).all(axis=1)
+                & (chars[:, 3] == ord(" ")) & (chars[:, 6] == ord(" ")) & (chars[:, 11] == ord(" "))
+                & (chars[:, 14] == ord(":")) & (chars[:, 15] == ord(" ")) & (chars[:, 17] == ord("0"))
+                & ((chars[:, 16] == ord("+")) | (chars[:, 16] == ord("-"))))
+        if width > 18:
+            fast &= chars[:, 18] == 0
+        
+        month_keys = (chars[:, 0].astype(np.int64) << 42) | (chars[:, 1].astype(np.int64) << 21) | chars[:, 2]
+        months = np.zeros(len(arr), dtype=np.int64)
+        for name, number in MONTHS.items():
+            key = (ord(name[0]) << 42) | (ord(name[1]) << 21) | ord(name[2])
+            months[month_keys == key] = number
+        fast &= months > 0
+        
+        if fast.any():
+            d = digits[fast].astype(np.int64)
+            day = d[:, 0] * 10 + d[:, 1]
+            year = d[:, 2] * 1000 + d[:, 3] * 100 + d[:, 4] * 10 + d[:, 5]
+            hour = d[:, 6] * 10 + d[:, 7]
+            month_start = (year - 1970) * 12 + months[fast] - 1
+            day_start = month_start.astype("datetime64[M]").astype("datetime64[D]")
+            values = day_start + (day - 1).astype("timedelta64[D]") + hour.astype("timedelta64[h]")
+            valid = (day >= 1) & (hour <= 23) & ((values.astype("datetime64[M]") == day_start.astype("datetime64[M]")))
+            parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+            parsed[valid] = values[valid]
+            result[fast] = parsed
+    
+    if not fast.all():
+        slow = pd.Series(arr[~fast], dtype=object)
+        clean = slow.str.replace(": +0", "", regex=False).str.replace(": -0", "", regex=False)
+        result[~fast] = pd.to_datetime(clean, format="%b %d %Y %H", errors="coerce").to_numpy(dtype="datetime64[ns]")
+    return result
+
+
+def parse_price_points(price_data):
+    """
+    Векторный разбор точек Steam [дата, цена, ...] в массивы
+    
+    Строки дат вида "Mar 05 2025 01: +0" трактуются как локальное время,
+    как и в datetime.strptime(...).timestamp(). Точки с нераспознанной датой
+    или ценой отбрасываются.
+    
+    Args:
+        price_data (list): Список точек [timestamp, price]
+        
+    Returns:
+        tuple: (timestamps, prices, skipped) - массивы float64 и число отброшенных точек
+    """
+    points = [point for point in price_data if len(point) >= 2]
+    short_points = len(price_data) - len(points)
+    if not points:
+        return np.empty(0), np.empty(0), short_points
+    
+    ts_list = [point[0] for point in points]
+    price_list = [point[1] for point in points]
+    
+    timestamps = np.full(len(points), np.nan)
+    if pd.api.types.infer_dtype(ts_list, skipna=False) == "string":
+        ts_is_str = np.ones(len(points), dtype=bool)
+    else:
+        ts_is_str = np.fromiter((isinstance(ts, str) for ts in ts_list), dtype=bool, count=len(points))
+    if ts_is_str.any():
+        strings = ts_list if ts_is_str.all() else [ts for ts, is_str in zip(ts_list, ts_is_str) if is_str]
+        naive = pd.DatetimeIndex(_parse_steam_dates(strings))
+        local = naive.tz_localize(local_timezone(), ambiguous=np.ones(len(naive), dtype=bool),
+                                  nonexistent="shift_forward")
+        seconds = local.asi8 / 1e9
+        seconds[local.isna()] = np.nan
+        timestamps[ts_is_str] = seconds
+    if not ts_is_str.all():
+        raw_ts = pd.Series(ts_list, dtype=object)[~ts_is_str]
+        timestamps[~ts_is_str] = pd.to_numeric(raw_ts, errors="coerce").to_numpy(dtype=float)
+    
+    if pd.api.types.infer_dtype(price_list, skipna=False) in ("floating", "integer", "mixed-integer-float"):
+        prices = np.asarray(price_list, dtype=float)
+    else:
+        raw_prices = pd.Series(price_list, dtype=object)
+        price_is_str = np.fromiter((isinstance(price, str) for price in price_list), dtype=bool, count=len(points))
+        if price_is_str.any():
+            raw_prices[price_is_str] = (raw_prices[price_is_str]
+                                        .str.replace(r"[$€£]", "", regex=True)
+                                        .str.replace(",", ".", regex=False))
+        prices = pd.to_numeric(raw_prices, errors="coerce").to_numpy(dtype=float)
+    
+    valid = ~(np.isnan(timestamps) | np.isnan(prices))
+    return timestamps[valid], prices[valid], short_points + int((~valid).sum())
 
 
+@timed("steam.analyze")
 def analyze_price_data(price_data):
     """
     Анализ данных о ценах: расчет временных промежутков, фильтрация за последние 3 года,
@@ -213,100 +438,51 @@ def analyze_price_data(price_data):
         return None
     
     logger.info(f"Анализ {len(price_data)} точек данных о ценах")
-    logger.info(f"Первые 5 точек данных: {price_data[:5]}")
     
-    timestamps = []
-    prices = []
-    
-    for i, point in enumerate(price_data):
-        if len(point) < 2:
-            logger.warning(f"Пропуск точки данных {point}, недостаточно элементов")
-            continue
-            
-        ts, price = point[0], point[1]
-        
-        if isinstance(ts, str):
-            try:
-                clean_date_str = ts.replace(": +0", "").replace(": -0", "")
-                dt = datetime.strptime(clean_date_str, "%b %d %Y %H")
-                ts = dt.timestamp()
-                logger.debug(f"Успешно преобразована дата {ts} из строки {point[0]}")
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Невозможно преобразовать временную метку '{ts}' в дату: {str(e)}")
-                continue
-        
-        if isinstance(price, str):
-            try:
-                price = price.replace('$', '').replace('€', '').replace('£', '').replace(',', '.')
-                price = float(price)
-            except ValueError:
-                logger.warning(f"Невозможно преобразовать цену '{price}' в число, пропуск")
-                continue
-        
-        timestamps.append(ts)
-        prices.append(price)
+    timestamps, prices, skipped = parse_price_points(price_data)
+    if skipped:
+        incr("steam.points_skipped", skipped)
+        logger.warning(f"Пропущено {skipped} точек данных с некорректной датой или ценой")
     
-    if not timestamps:
+    if not len(timestamps):
         logger.error("Не удалось извлечь действительные временные метки из данных")
         return None
     
-    logger.info(f"Преобразование {len(timestamps)} временных меток в объекты datetime")
-    dates = []
-    for ts in timestamps:
-        try:
-            if ts > 10000000000:
-                ts = ts / 1000
-            dates.append(datetime.fromtimestamp(ts))
-        except Exception as e:
-            logger.warning(f"Ошибка преобразования временной метки {ts}: {str(e)}")
-    
-    if not dates:
-        logger.error("Не удалось преобразовать временные метки в даты")
-        return None
-    
-    data_points = list(zip(timestamps, prices, dates))
-    data_points.sort(key=lambda x: x[2])
+    seconds = np.where(timestamps > 10000000000, timestamps / 1000, timestamps).astype(np.int64)
+    # Старая история Steam дневная, последние недели - почасовые точки
+    index, report = check_series(seconds, prices, cadence="1D", name="steam")
+    logger.info(quality_summary(report))
+    series = PriceSeries(seconds[index], prices[index])
     
     three_years_ago = datetime.now() - timedelta(days=3*365)
     logger.info(f"Фильтрация данных с {three_years_ago} по настоящее время")
     
-    filtered_data = [point for point in data_points if point[2] >= three_years_ago]
-    
-    if not filtered_data:
+    recent = series.between(three_years_ago)
+    if len(recent):
+        series = recent
+    else:
         logger.warning("Данные за последние 3 года не найдены")
-        filtered_data = data_points
         logger.info("Используем все доступные данные вместо фильтрации за 3 года")
     
-    logger.info(f"Отфильтровано {len(filtered_data)} точек данных")
-    
-    gaps = []
-    for i in range(1, len(filtered_data)):
-        current = filtered_data[i][2]
-        previous = filtered_data[i-1][2]
-        gap_minutes = (current - previous).total_seconds() / 60
-        gaps.append(gap_minutes)
-    
-    stats = {
-        'start_date': filtered_data[0][2],
-        'end_date': filtered_data[-1][2],
-        'total_points': len(filtered_data),
-        'avg_gap_minutes': sum(gaps) / len(gaps) if gaps else 0,
-        'min_gap_minutes': min(gaps) if gaps else 0,
-        'max_gap_minutes': max(gaps) if gaps else 0,
-        'filtered_data': filtered_data
-    }
+    logger.info(f"Отфильтровано {len(series)} точек данных")
+    
+    stats = series.summary()
+    stats['filtered_data'] = series
     
     logger.success("Анализ данных завершен")
     return stats
 
 
-def plot_price_data(stats, item_name):
+@timed("steam.plot")
+def plot_price_data(stats, item_name, show=True, renderer=None):
     """
     Построение графика данных о ценах и отображение статистики
     
     Args:
         stats (dict): Статистика из analyze_price_data
         item_name (str): Название предмета
+        show (bool): Показать окно графика; False - только сохранить PNG (пакетный режим)
+        renderer (ChartRenderer, optional): Переиспользуемая фигура для пакетного режима
     """
     if not stats:
         logger.error("Нет статистики для построения графика")
@@ -314,89 +490,99 @@ def plot_price_data(stats, item_name):
     
     logger.info("Построение графика данных о ценах")
     
-    filtered_data = stats['filtered_data']
-    dates = [point[2] for point in filtered_data]
-    prices = [point[1] for point in filtered_data]
-    
-    plt.figure(figsize=(15, 8))
-    plt.plot(dates, prices, marker='.', linestyle='-', color='orange', linewidth=1)
-    plt.xlabel('Дата')
-    plt.ylabel('Цена')
-    plt.title(f'История цен для {item_name} (С {stats["start_date"].strftime("%Y-%m-%d")} по {stats["end_date"].strftime("%Y-%m-%d")})')
-    plt.grid(True, alpha=0.3)
-    
-    plt.gcf().autofmt_xdate()
-    
-    info_text = (
-        f"Период данных: с {stats['start_date'].strftime('%Y-%m-%d')} по {stats['end_date'].strftime('%Y-%m-%d')}\n"
-        f"Всего точек данных: {stats['total_points']}\n"
-        f"Средний промежуток между точками: {stats['avg_gap_minutes']:.2f} минут\n"
-        f"Минимальный промежуток: {stats['min_gap_minutes']:.2f} минут\n"
-        f"Максимальный промежуток: {stats['max_gap_minutes']:.2f} минут"
-    )
-    
-    plt.figtext(0.02, 0.02, info_text, wrap=True, fontsize=10, 
-                bbox=dict(facecolor='white', alpha=0.8))
-    
-    filename = os.path.join(script_dir, f"{item_name.replace(' ', '_').replace('|', '').replace(':', '')}_price_history.png")
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
-    logger.info(f"График сохранен как {filename}")
-    
-    plt.show()
+    filename = chart_filename(script_dir, item_name)
+    if show:
+        import matplotlib.pyplot as plt
+        
+        fig = plt.figure(figsize=FIGSIZE)
+        draw_price_chart(fig, stats, item_name, decimate=False)
+        fig.savefig(filename, dpi=DPI, bbox_inches='tight')
+        logger.info(f"График сохранен как {filename}")
+        plt.show()
+    else:
+        (renderer or ChartRenderer()).render(stats, item_name, filename)
+        logger.info(f"График сохранен как {filename}")
     
-    logger.info("\n" + info_text)
-    print("\n" + info_text)
+    text = info_text(stats)
+    logger.info("\n" + text)
+    print("\n" + text)
+
+
+def with_dates(chunk):
+    """Блок подробного экспорта с колонкой локальной даты между timestamp и price"""
+    timestamps = chunk['timestamp'].to_numpy()
+    dates = (pd.to_datetime(timestamps, unit="s", utc=True)
+             .tz_convert(local_timezone())
+             .tz_localize(None))
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'price': chunk['price'].to_numpy()
+    })
 
 
+@timed("steam.export")
 def export_to_csv(stats, item_name):
-    """Экспорт отфильтрованных данных в CSV-файл"""
+    """Экспорт отфильтрованных данных в CSV-файл: дописываются только новые точки"""
     if not stats:
         logger.error("Нет данных для экспорта")
         return
     
     logger.info("Экспорт данных в CSV")
     
-    filtered_data = stats['filtered_data']
+    series = stats['filtered_data']
     
+    # Колонка строковых дат вычисляется поблочно при записи и только для новых точек
     df_detailed = pd.DataFrame({
-        'timestamp': [point[0] for point in filtered_data],
-        'date': [point[2].strftime('%Y-%m-%d %H:%M:%S') for point in filtered_data],
-        'price': [point[1] for point in filtered_data]
+        'timestamp': series.timestamps,
+        'price': series.prices
     })
     
     detailed_filename = os.path.join(script_dir, f"{item_name.replace(' ', '_').replace('|', '').replace(':', '')}_price_data.csv")
-    df_detailed.to_csv(detailed_filename, index=False)
+    detailed_written = append_history(detailed_filename, df_detailed, 'price', transform=with_dates)
     logger.success(f"Подробные данные экспортированы в {detailed_filename}")
     
-    short_name = item_name
-    if len(item_name) > 15:
-        short_name = item_name.split()[0]
-    
-    
-    if not short_name or short_name.strip() == "":
-        short_name = "Chroma Case"  # Дефолтное значение
-    
-    logger.info(f"Используем короткое имя инструмента: '{short_name}'")
-    
-    simple_data = []
-    for point in filtered_data:
-        simple_data.append({
-            'instrument': short_name,
-            'price_usd': round(point[1], 2),
-            'timestamp': int(point[0])
-        })
-    
-    df_simple = pd.DataFrame(simple_data)
+    # Полное название - ключ инструмента и в CSV, и в колоночном хранилище (как в batch_scraper):
+    # первое слово названия у разных предметов совпадает ("AK-47 | ...")
+    df_simple = pd.DataFrame({
+        'instrument': item_name,
+        'price_usd': np.round(series.prices, 2),
+        'timestamp': series.timestamps
+    })
     
     simple_filename = os.path.join(script_dir, "steam_market_prices.csv")
-    df_simple.to_csv(simple_filename, index=False)
+    simple_written = append_history(simple_filename, df_simple, 'price_usd', key_column='instrument')
     logger.success(f"Единый датафрейм экспортирован в {simple_filename}")
     
-    print(f"Данные экспортированы в:\n- {detailed_filename} (подробные)\n- {simple_filename} (единый датафрейм с {len(simple_data)} записями)")
+    if len(detailed_written):
+        since = detailed_written['timestamp'].iloc[0]
+        store.append("steam_market_prices", df_simple[df_simple['timestamp'] >= since])
+        logger.info(f"Данные добавлены в колоночное хранилище: {store.root}")
+    
+    print(f"Данные экспортированы в:\n- {detailed_filename} (подробные, новых точек: {len(detailed_written)})\n"
+          f"- {simple_filename} (единый датафрейм, новых записей: {len(simple_written)})")
+
+
+def main(engine="http", show=True, metrics_path=None, use_cache=True):
+    """
+    Основная функция для запуска парсера
+    
+    Args:
+        engine (str): Движок получения данных: "http", "selenium" или "fast"
+        show (bool): Показать окно графика
+        metrics_path (str, optional): Файл для сводки времени этапов (.json или .prom)
+        use_cache (bool): Брать недавно загруженную страницу листинга из кэша
+    """
+    setup_logging()
+    try:
+        _run(engine, show, response_cache if use_cache else None)
+    finally:
+        logger.info("Время этапов:\n" + metrics.report())
+        if metrics_path:
+            metrics.save(metrics_path)
 
 
-def main():
-    """Основная функция для запуска парсера"""
+def _run(engine, show, cache):
     logger.info(f"Запуск парсера рынка Steam с использованием Selenium. Логи сохраняются в: {log_file}")
     print(f"Парсер рынка Steam (Selenium-версия)")
     print(f"Логи сохраняются в: {log_file}")
@@ -413,9 +599,9 @@ def main():
     else:
         logger.info(f"Пользователь предоставил URL: {url}")
     
-    print("Начало парсинга данных с помощью Selenium...")
+    print(f"Начало парсинга данных (движок: {engine})...")
     
-    result = parse_steam_market_data(url)
+    result = fetch_price_history(url, engine=engine, cache=cache)
     
     if not result:
         logger.error("Не удалось получить данные. Выход.")
@@ -434,7 +620,7 @@ def main():
     
     print(f"Анализ успешно завершен, найдено {stats['total_points']} точек данных.")
     
-    plot_price_data(stats, result['item_name'])
+    plot_price_data(stats, result['item_name'], show=show)
     
     export_to_csv(stats, result['item_name'])
     
@@ -442,5 +628,23 @@ def main():
     print("Выполнение парсера успешно завершено!")
 
 
+def cli(argv=None):
+    """Разбор аргументов командной строки и запуск main"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Парсер истории цен Steam Market")
+    arg_parser.add_argument("--engine", choices=["http", "selenium", "fast"], default="http",
+                            help="http - загрузка HTML без браузера (с откатом на Selenium), selenium - только браузер, "
+                                 "fast - браузер без картинок и CSS, ожидается только скрипт истории цен")
+    arg_parser.add_argument("--no-show", action="store_true",
+                            help="Не открывать окно графика, только сохранить PNG")
+    arg_parser.add_argument("--metrics", default=None,
+                            help="Сохранить время этапов и счётчики: .prom - формат Prometheus, иначе JSON")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Загрузить страницу заново, даже если она есть в кэше")
+    args = arg_parser.parse_args(argv)
+    main(engine=args.engine, show=not args.no_show, metrics_path=args.metrics, use_cache=not args.no_cache)
+
+
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,155 @@
+"""
+Инкрементальное сохранение истории цен Steam: в CSV дописываются только точки
+после последней сохранённой временной метки
+
+Если изменилась цена последней сохранённой точки (час ещё не закрыт), в конец
+файла дописывается исправленная строка с той же меткой; при чтении из строк
+с одинаковыми инструментом и меткой берётся последняя.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from Storage.chunked_writer import CHUNK_ROWS, csv_columns, frame_chunks, read_csv_chunks, row_offset, write_chunks
+
+
+def read_history(path):
+    """
+    Чтение сохранённой истории, None если файла ещё нет
+
+    Исправленные точки, дописанные в конец файла, заменяют сохранённые ранее
+    с той же меткой (и тем же instrument, если колонка есть).
+    """
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path, float_precision="round_trip")
+    keys = ["instrument", "timestamp"] if "instrument" in df.columns else ["timestamp"]
+    return df.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+
+
+def new_points(stored_ts, stored_value, timestamps, values):
+    """
+    Начало новых точек в свежей выгрузке относительно последней сохранённой
+
+    Steam отдаёт старую историю с дневным шагом, а последний месяц - почасово,
+    и со временем прореживает часовые точки до дневных. Поэтому сохранённые точки
+    не сравниваются с новыми целиком: бинарным поиском находится последняя
+    сохранённая метка, и всё, что раньше неё, считается уже сохранённым (более
+    подробным, чем в свежей выгрузке). Точка с той же меткой - текущий,
+    ещё не закрытый интервал, её цена могла измениться.
+
+    Args:
+        stored_ts (int): Последняя сохранённая метка, секунды
+        stored_value (float): Сохранённая цена в этой метке
+        timestamps (np.ndarray): Метки свежей выгрузки по возрастанию
+        values (np.ndarray): Цены свежей выгрузки
+
+    Returns:
+        tuple: (индекс первой новой точки, нужно ли заменить последнюю сохранённую)
+    """
+    start = int(np.searchsorted(timestamps, stored_ts, side="left"))
+    if start < len(timestamps) and timestamps[start] == stored_ts:
+        if np.isclose(values[start], stored_value):
+            return start + 1, False
+        return start, True
+    return start, False
+
+
+def last_points(path, value_column, key_column=None, chunk_rows=CHUNK_ROWS):
+    """
+    Последняя сохранённая точка каждого инструмента; файл читается блоками
+
+    Returns:
+        dict: Инструмент (None без key_column) -> (номер строки, timestamp, цена)
+    """
+    usecols = ["timestamp", value_column] + ([key_column] if key_column else [])
+    last = {}
+    offset = 0
+    for chunk in read_csv_chunks(path, chunk_rows, usecols=usecols):
+        if key_column is None:
+            tails = {None: len(chunk) - 1} if len(chunk) else {}
+        else:
+            positions = pd.Series(np.arange(len(chunk)))
+            tails = positions.groupby(chunk[key_column].to_numpy(), sort=False).last().to_dict()
+        timestamps = chunk["timestamp"].to_numpy()
+        values = chunk[value_column].to_numpy()
+        for key, i in tails.items():
+            last[key] = (offset + int(i), int(timestamps[i]), values[i])
+        offset += len(chunk)
+    return last
+
+
+def append_history(path, new, value_column, key_column=None, transform=None, chunk_rows=CHUNK_ROWS):
+    """
+    Дозапись новых точек истории в CSV
+
+    Для каждого инструмента (key_column) дописываются только точки позже последней
+    сохранённой. Если изменилась цена последней сохранённой точки и такие точки
+    стоят в самом конце файла, файл обрезается с первой из них; иначе исправленная
+    точка дописывается в конец как новая строка (read_history берёт последнюю).
+    Сохранённые строки не перечитываются и не перезаписываются.
+
+    Args:
+        path (str): Путь к CSV
+        new (pd.DataFrame): Свежая выгрузка с колонкой timestamp
+        value_column (str): Колонка цены
+        key_column (str, optional): Колонка инструмента, если в файле несколько предметов
+        transform (callable, optional): Добавление вычисляемых колонок (например, даты)
+            к каждому записываемому блоку; исходная выгрузка их не содержит
+        chunk_rows (int): Строк в блоке чтения и записи
+
+    Returns:
+        pd.DataFrame: Записанные строки (новые и заменённые) без вычисляемых колонок
+    """
+    columns = list(transform(new.iloc[:0]).columns) if transform else list(new.columns)
+    stored_columns = csv_columns(path)
+    if stored_columns != columns:
+        if stored_columns is not None:
+            logger.warning(f"Колонки {path} не совпадают с новыми данными, файл перезаписан")
+        write_chunks(path, frame_chunks(new, chunk_rows), columns, chunk_rows, transform=transform)
+        logger.info(f"Записано {len(new)} строк в {path}")
+        return new
+
+    last_rows = last_points(path, value_column, key_column, chunk_rows)
+    groups = [(None, new)] if key_column is None else new.groupby(key_column, sort=False)
+
+    pieces = []
+    replaced = []
+    for key, group in groups:
+        group = group.sort_values("timestamp", kind="stable")
+        last = last_rows.get(key)
+        if last is None:
+            pieces.append(group)
+            continue
+        row, stored_ts, stored_value = last
+        start, replace = new_points(
+            stored_ts, stored_value,
+            group["timestamp"].to_numpy(dtype=np.int64), group[value_column].to_numpy(dtype=np.float64),
+        )
+        if replace:
+            replaced.append(row)
+        pieces.append(group.iloc[start:])
+
+    written = pd.concat(pieces, ignore_index=True) if pieces else new.iloc[:0]
+
+    # Последняя строка файла - последняя точка какого-то инструмента
+    total = max(row for row, _, _ in last_rows.values()) + 1 if last_rows else 0
+    replaced.sort()
+    if replaced and replaced == list(range(total - len(replaced), total)):
+        cut = replaced[0]
+        with open(path, "r+b") as f:
+            f.truncate(row_offset(path, cut))
+        rows = write_chunks(path, frame_chunks(written, chunk_rows), columns, chunk_rows, append=True,
+                            transform=transform)
+        logger.info(f"{path}: обновлено {len(replaced)} последних точек, дописано {rows} строк с позиции {cut}")
+    elif len(written):
+        write_chunks(path, frame_chunks(written, chunk_rows), columns, chunk_rows, append=True,
+                     transform=transform)
+        corrected = f" (исправлено {len(replaced)} последних точек)" if replaced else ""
+        logger.info(f"Дописано {len(written)} новых точек в {path}{corrected}")
+    else:
+        logger.info(f"Новых точек для {path} нет")
+    return written
@@ -0,0 +1,172 @@
+"""
+Получение истории цен Steam Market без браузера: HTML листинга по HTTP
+и извлечение массива line1 из встроенного скрипта
+"""
+
+import ast
+import html
+import json
+import re
+import threading
+from urllib.parse import unquote
+
+from loguru import logger
+
+from Metrics.metrics import incr, timer
+from Storage.response_cache import cache_key
+
+from .rate_limiter import ERROR, OK, THROTTLED, TIMEOUT
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+LINE1_PATTERN = re.compile(r"var line1=(\[.*?\]);", re.DOTALL)
+TITLE_PATTERN = re.compile(r"<title>[^<]*?Listings for ([^<]+)</title>", re.IGNORECASE)
+
+_local = threading.local()
+
+
+def extract_line1(content):
+    """
+    Извлечение массива истории цен из текста скрипта или HTML страницы
+
+    Args:
+        content (str): Текст, содержащий "var line1=[...];"
+
+    Returns:
+        list | None: Точки [дата, цена, количество] или None
+    """
+    if not content or "var line1=" not in content:
+        return None
+
+    match = LINE1_PATTERN.search(content)
+    if not match:
+        return None
+
+    price_data_str = match.group(1)
+    try:
+        return json.loads(price_data_str)
+    except json.JSONDecodeError:
+        try:
+            price_data = ast.literal_eval(price_data_str)
+            logger.info("Данные истории цен разобраны через literal_eval")
+            return price_data
+        except (ValueError, SyntaxError) as e:
+            logger.warning(f"Не удалось разобрать массив line1: {str(e)}")
+            return None
+
+
+def item_name_from_url(url):
+    """Название предмета из последнего сегмента URL листинга"""
+    return unquote(url.rstrip('/').split('/')[-1])
+
+
+def cached_listing(cache, url):
+    """
+    Результат парсинга листинга из кэша
+
+    Args:
+        cache (ResponseCache | None): Кэш ответов
+        url (str): URL листинга
+
+    Returns:
+        dict | None: Словарь с item_name и price_data или None, если записи нет
+    """
+    if cache is None:
+        return None
+    data = cache.get(cache_key("steam.listing", url))
+    if data is None:
+        return None
+    logger.info(f"История цен {url} получена из кэша")
+    return json.loads(data)
+
+
+def cache_listing(cache, url, result):
+    """Сохранение результата парсинга листинга в кэш (неудачные результаты не кэшируются)"""
+    if cache is not None and result:
+        cache.put(cache_key("steam.listing", url), json.dumps(result, ensure_ascii=False).encode("utf-8"))
+
+
+def get_session():
+    """HTTP-сессия с пулом соединений, своя для каждого потока"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+def fetch_listing_http(url, session=None, timeout=15):
+    """
+    Загрузка и разбор HTML листинга с указанием причины неудачи
+
+    Args:
+        url (str): URL листинга на рынке Steam
+        session (requests.Session, optional): Сессия; по умолчанию сессия текущего потока
+        timeout (float): Таймаут запроса, секунды
+
+    Returns:
+        tuple: (словарь с item_name и price_data или None, исход запроса:
+            OK, THROTTLED - HTTP 429, TIMEOUT - таймаут или 5xx, ERROR - прочие ошибки)
+    """
+    from requests import RequestException, Timeout
+
+    session = session or get_session()
+    logger.info(f"Загрузка HTML листинга: {url}")
+
+    try:
+        with timer("steam.http_fetch"):
+            response = session.get(url, timeout=timeout)
+    except Timeout as e:
+        incr("steam.http_timeouts")
+        logger.warning(f"Таймаут HTTP-запроса к {url}: {str(e)}")
+        return None, TIMEOUT
+    except RequestException as e:
+        incr("steam.http_errors")
+        logger.warning(f"Ошибка HTTP-запроса к {url}: {str(e)}")
+        return None, ERROR
+
+    if response.status_code != 200:
+        incr(f"steam.http_status_{response.status_code}")
+        logger.warning(f"HTTP {response.status_code} для {url}")
+        if response.status_code == 429:
+            return None, THROTTLED
+        return None, TIMEOUT if response.status_code >= 500 else ERROR
+
+    with timer("steam.extract_line1"):
+        price_data = extract_line1(response.text)
+    if not price_data:
+        incr("steam.parse_failures")
+        logger.warning(f"В HTML листинга не найдена переменная line1: {url}")
+        return None, ERROR
+    incr("steam.points_parsed", len(price_data))
+
+    title = TITLE_PATTERN.search(response.text)
+    item_name = html.unescape(title.group(1)).strip() if title else item_name_from_url(url)
+
+    logger.info(f"Получено {len(price_data)} точек истории цен для {item_name} по HTTP")
+    return {
+        'item_name': item_name,
+        'price_data': price_data
+    }, OK
+
+
+def parse_steam_market_data_http(url, session=None, timeout=15):
+    """
+    Парсинг данных истории цен из HTML листинга без запуска браузера
+
+    Args:
+        url (str): URL листинга на рынке Steam
+        session (requests.Session, optional): Сессия; по умолчанию сессия текущего потока
+        timeout (float): Таймаут запроса, секунды
+
+    Returns:
+        dict: Словарь с item_name и price_data, None при неудаче
+    """
+    return fetch_listing_http(url, session, timeout)[0]
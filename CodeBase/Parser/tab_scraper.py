@@ -0,0 +1,134 @@
+"""
+Быстрое извлечение истории цен в браузере: несколько вкладок одного WebDriver
+загружают листинги одновременно
+
+Страница считается готовой, как только в ней определена переменная line1 -
+таблица предложений, картинки и стили не ждутся. Драйвер для этого режима
+создаётся setup_selenium_driver(fast=True): стратегия загрузки "none"
+(driver.get не блокируется) и отключённые изображения и CSS.
+"""
+
+import time
+
+from loguru import logger
+
+from Metrics.metrics import incr, metrics
+
+from .steam_http import item_name_from_url
+
+# Настройки профиля Chrome: 2 - запретить загрузку
+FAST_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+}
+
+# Заголовок страницы и line1, если встроенный скрипт истории цен уже выполнен
+LINE1_SCRIPT = ("return (typeof line1 !== 'undefined' && line1 && line1.length) "
+                "? [document.title, line1] : null;")
+
+TITLE_PREFIX = "Listings for "
+
+
+def item_name_from_title(title, url):
+    """Название предмета из заголовка "Steam Community Market :: Listings for ..." или из URL"""
+    if title and TITLE_PREFIX in title:
+        name = title.split(TITLE_PREFIX, 1)[1].strip()
+        if name:
+            return name
+    return item_name_from_url(url)
+
+
+def read_line1(driver):
+    """
+    Результат LINE1_SCRIPT в текущей вкладке
+
+    Returns:
+        tuple | None: (заголовок, точки line1) или None, пока скрипт не выполнен
+    """
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+        return driver.execute_script(LINE1_SCRIPT)
+    except WebDriverException:
+        # Вкладка в процессе навигации
+        return None
+
+
+def parse_listings_in_tabs(driver, urls, tabs=4, timeout=20.0, poll=0.05, before_open=None):
+    """
+    Загрузка листингов в tabs вкладках одного браузера
+
+    Каждая вкладка открывает следующий URL, как только из неё прочитан line1,
+    поэтому одновременно загружаются до tabs страниц.
+
+    Args:
+        driver (webdriver): Драйвер из setup_selenium_driver(fast=True)
+        urls (list): URL листингов
+        tabs (int): Число одновременно открытых вкладок
+        timeout (float): Сколько ждать line1 в одной вкладке, секунды
+        poll (float): Пауза между опросами вкладок, секунды
+        before_open (callable, optional): Вызывается перед каждым переходом
+            (например, AdaptiveRateLimiter.wait)
+
+    Returns:
+        list: Словари с item_name и price_data в порядке urls (None для неудачных)
+    """
+    results = {}
+    pending = iter(urls)
+    active = {}
+    base = driver.current_window_handle
+    handles = [base]
+    for _ in range(min(tabs, len(urls)) - 1):
+        driver.switch_to.new_window("tab")
+        handles.append(driver.current_window_handle)
+
+    def open_next(handle):
+        url = next(pending, None)
+        if url is None:
+            return
+        if before_open is not None:
+            before_open()
+        driver.switch_to.window(handle)
+        driver.get(url)
+        active[handle] = (url, time.monotonic())
+
+    try:
+        for handle in handles:
+            open_next(handle)
+
+        while active:
+            finished = False
+            for handle, (url, started) in list(active.items()):
+                driver.switch_to.window(handle)
+                found = read_line1(driver)
+                elapsed = time.monotonic() - started
+                if found:
+                    title, price_data = found
+                    # Остальная страница не нужна
+                    driver.execute_script("window.stop();")
+                    results[url] = {'item_name': item_name_from_title(title, url), 'price_data': price_data}
+                    metrics.observe("steam.tab_page_load", elapsed)
+                    incr("steam.points_parsed", len(price_data))
+                    logger.info(f"{url}: {len(price_data)} точек за {elapsed:.2f} с")
+                elif elapsed > timeout:
+                    results[url] = None
+                    incr("steam.parse_failures")
+                    logger.warning(f"{url}: line1 не появилась за {timeout:.0f} с")
+                else:
+                    continue
+                finished = True
+                del active[handle]
+                open_next(handle)
+            if not finished:
+                time.sleep(poll)
+    finally:
+        for handle in handles[1:]:
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(base)
+
+    return [results.get(url) for url in urls]
@@ -0,0 +1,3 @@
+"""
+Колоночное хранилище собранных датасетов
+"""
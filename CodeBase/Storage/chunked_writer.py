@@ -0,0 +1,201 @@
+"""
+Потоковая запись больших выгрузок в CSV и Parquet блоками фиксированного размера
+
+Строки приходят из генератора (словари, кортежи или DataFrame любого размера)
+и копятся в буфере не больше chunk_rows строк, поэтому пиковая память не зависит
+от числа инструментов и длины истории.
+"""
+
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 50_000
+
+
+def read_csv_chunks(path, chunk_rows=CHUNK_ROWS, **kwargs):
+    """
+    Чтение CSV блоками; для отсутствующего файла - пустой генератор
+
+    Args:
+        path (str): Путь к CSV
+        chunk_rows (int): Строк в блоке
+        **kwargs: Аргументы pd.read_csv (usecols, skiprows, ...)
+
+    Yields:
+        pd.DataFrame: Очередной блок
+    """
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return
+    with pd.read_csv(path, chunksize=chunk_rows, float_precision="round_trip", **kwargs) as reader:
+        yield from reader
+
+
+def csv_columns(path):
+    """Заголовок CSV или None, если файла нет"""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return None
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def row_offset(path, row, block_size=2 ** 20):
+    """Смещение в байтах начала строки данных row (после заголовка); файл читается блоками"""
+    seen = 0
+    position = 0
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+            if seen + len(newlines) > row:
+                return position + int(newlines[row - seen]) + 1
+            seen += len(newlines)
+            position += len(block)
+    raise ValueError(f"В {path} нет строки {row}")
+
+
+def frame_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Блоки DataFrame по chunk_rows строк (срезы без копирования)"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+class ChunkedWriter:
+    """
+    Запись блоками в CSV или Parquet (по расширению пути)
+
+    Новый файл пишется во временный и заменяет прежний только при успешном
+    закрытии, поэтому прерванная перезапись не портит сохранённый датасет.
+    """
+
+    def __init__(self, path, columns=None, chunk_rows=CHUNK_ROWS, append=False, transform=None):
+        """
+        Args:
+            path (str): Путь к .csv или .parquet
+            columns (list, optional): Порядок колонок; по умолчанию - колонки первого блока
+            chunk_rows (int): Строк в буфере до записи на диск
+            append (bool): Дописывать в существующий CSV без заголовка
+            transform (callable, optional): Преобразование каждого блока перед записью
+                (например, добавление вычисляемых колонок)
+        """
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.chunk_rows = chunk_rows
+        self.transform = transform
+        self.parquet = path.endswith(".parquet")
+        if append and self.parquet:
+            raise ValueError("Дозапись поддерживается только для CSV")
+        self.append = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.rows = 0
+        self._target = path if self.append else path + ".tmp"
+        self._buffer = []
+        self._buffered = 0
+        self._parquet_writer = None
+        self._started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, data):
+        """
+        Добавление строк
+
+        Args:
+            data (pd.DataFrame | list): Блок строк или список словарей/кортежей в порядке columns
+        """
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame.from_records(list(data), columns=self.columns)
+        if data.empty:
+            return
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def write_all(self, source):
+        """Запись всех блоков или строк генератора; строки группируются по chunk_rows"""
+        records = []
+        for item in source:
+            if isinstance(item, pd.DataFrame):
+                self.write(item)
+                continue
+            records.append(item)
+            if len(records) >= self.chunk_rows:
+                self.write(records)
+                records = []
+        if records:
+            self.write(records)
+        return self
+
+    def flush(self):
+        """Запись буфера на диск"""
+        if not self._buffer:
+            return
+        chunk = self._buffer[0] if len(self._buffer) == 1 else pd.concat(self._buffer, ignore_index=True)
+        self._buffer, self._buffered = [], 0
+        if self.transform is not None:
+            chunk = self.transform(chunk)
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        chunk = chunk[self.columns]
+
+        if self.parquet:
+            self._write_parquet(chunk)
+        else:
+            header = not self._started and not self.append
+            chunk.to_csv(self._target, mode="w" if header else "a", header=header, index=False)
+        self._started = True
+        self.rows += len(chunk)
+
+    def _write_parquet(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self._target, table.schema, compression="zstd")
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    def close(self):
+        """Запись остатка буфера и замена прежнего файла"""
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if not self._started and not self.append:
+            # Пустая выгрузка: файл только с заголовком, если колонки известны
+            empty = pd.DataFrame(columns=self.columns or [])
+            if self.parquet:
+                empty.to_parquet(self._target, index=False)
+            else:
+                empty.to_csv(self._target, index=False)
+            self._started = True
+        if self._target != self.path:
+            os.replace(self._target, self.path)
+        logger.info(f"{self.path}: записано {self.rows} строк")
+
+    def abort(self):
+        """Отмена записи: временный файл удаляется, прежний остаётся"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._target != self.path and os.path.exists(self._target):
+            os.remove(self._target)
+
+
+def write_chunks(path, source, columns=None, chunk_rows=CHUNK_ROWS, append=False, transform=None):
+    """
+    Запись генератора строк или блоков в файл
+
+    Returns:
+        int: Число записанных строк
+    """
+    with ChunkedWriter(path, columns, chunk_rows, append, transform) as writer:
+        writer.write_all(source)
+    return writer.rows
@@ -0,0 +1,247 @@
+"""
+Колоночное хранилище датасетов: Parquet с разбиением по инструменту и месяцу
+
+Структура на диске:
+    <root>/<dataset>/_meta.json
+    <root>/<dataset>/instrument=<...>/month=<YYYY-MM>/part-*.parquet
+"""
+
+import argparse
+import functools
+import json
+import logging
+import numbers
+import os
+import shutil
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from .chunked_writer import CHUNK_ROWS, read_csv_chunks
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _partitioning():
+    # pyarrow загружается при первом обращении к хранилищу, а не при импорте модуля
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(
+        pa.schema([("instrument", pa.string()), ("month", pa.string())]),
+        flavor="hive",
+    )
+
+
+def _month(timestamps):
+    seconds = np.asarray(timestamps, dtype=np.int64).astype("datetime64[s]")
+    return seconds.astype("datetime64[M]").astype(str)
+
+
+def _month_of(moment):
+    if moment is None:
+        return None
+    if isinstance(moment, numbers.Number):
+        moment = pd.to_datetime(moment, unit="s")
+    return pd.Timestamp(moment).strftime("%Y-%m")
+
+
+def _seconds(moment):
+    if isinstance(moment, numbers.Number):
+        return int(moment)
+    moment = pd.Timestamp(moment)
+    if moment.tzinfo is None:
+        moment = moment.tz_localize("UTC")
+    return int(moment.timestamp())
+
+
+class DatasetStore:
+    """
+    Хранилище нескольких датасетов в одном каталоге
+
+    Каждый датасет - таблица с колонкой timestamp (Unix-время, секунды) и колонкой
+    инструмента. Данные хранятся в Parquet (zstd) с разбиением по инструменту и месяцу,
+    поэтому чтение одного инструмента за квартал открывает только нужные файлы.
+    """
+
+    def __init__(self, root, compression="zstd"):
+        self.root = root
+        self.compression = compression
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _meta_path(self, name):
+        return os.path.join(self._path(name), "_meta.json")
+
+    def exists(self, name):
+        return os.path.exists(self._meta_path(name))
+
+    def instrument_column(self, name):
+        with open(self._meta_path(name), encoding="utf-8") as f:
+            return json.load(f)["instrument_column"]
+
+    def _dataset(self, name):
+        import pyarrow.dataset as ds
+
+        return ds.dataset(self._path(name), format="parquet", partitioning=_partitioning(),
+                          exclude_invalid_files=True)
+
+    def _prepare(self, df, instrument_column):
+        table = df.copy()
+        table["timestamp"] = table["timestamp"].astype("int64")
+        table["datetime"] = pd.to_datetime(table["timestamp"], unit="s")
+        table["instrument"] = table[instrument_column].astype(str)
+        table["month"] = _month(table["timestamp"])
+        if instrument_column != "instrument":
+            table = table.drop(columns=[instrument_column])
+        return table
+
+    def _write(self, name, table):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        ds.write_dataset(
+            pa.Table.from_pandas(table, preserve_index=False),
+            self._path(name),
+            format="parquet",
+            partitioning=_partitioning(),
+            existing_data_behavior="delete_matching",
+            file_options=ds.ParquetFileFormat().make_write_options(compression=self.compression),
+            basename_template="part-{i}.parquet",
+        )
+
+    def write(self, name, df, instrument_column="instrument"):
+        """
+        Полная запись датасета, существующие данные удаляются
+
+        Args:
+            name (str): Имя датасета
+            df (pd.DataFrame): Данные с колонками timestamp и instrument_column
+            instrument_column (str): Колонка, по которой разбиваются данные
+        """
+        shutil.rmtree(self._path(name), ignore_errors=True)
+        os.makedirs(self._path(name))
+        with open(self._meta_path(name), "w", encoding="utf-8") as f:
+            json.dump({"instrument_column": instrument_column}, f)
+        self._write(name, self._prepare(df, instrument_column))
+        logger.info(f"Датасет {name}: записано {len(df)} строк")
+
+    def append(self, name, df, instrument_column="instrument"):
+        """
+        Добавление строк: переписываются только затронутые разделы (инструмент, месяц),
+        строки с совпадающими (инструмент, timestamp) заменяются новыми
+        """
+        if not self.exists(name):
+            return self.write(name, df, instrument_column)
+        if df.empty:
+            return
+
+        import pyarrow.compute as pc
+
+        instrument_column = self.instrument_column(name)
+        new = self._prepare(df, instrument_column)
+
+        touched = new[["instrument", "month"]].drop_duplicates()
+        key_filter = None
+        for instrument, month in touched.itertuples(index=False):
+            condition = (pc.field("instrument") == instrument) & (pc.field("month") == month)
+            key_filter = condition if key_filter is None else key_filter | condition
+
+        old = self._dataset(name).to_table(filter=key_filter).to_pandas()
+        if len(old):
+            combined = pd.concat([old, new], ignore_index=True)
+            combined = combined.drop_duplicates(subset=["instrument", "timestamp"], keep="last")
+        else:
+            combined = new
+        combined = combined.sort_values(["instrument", "timestamp"], kind="stable")
+
+        self._write(name, combined)
+        logger.info(f"Датасет {name}: добавлено {len(df)} строк в {len(touched)} разделов")
+
+    def read(self, name, instrument=None, start=None, end=None, columns=None):
+        """
+        Чтение с фильтрацией по инструменту и времени; фильтры применяются
+        к разделам и статистике Parquet, не читая лишние файлы
+
+        Args:
+            name (str): Имя датасета
+            instrument (str | list, optional): Инструмент или список инструментов
+            start (datetime | int, optional): Начало интервала (включительно), UTC
+            end (datetime | int, optional): Конец интервала (не включается), UTC
+            columns (list, optional): Нужные колонки
+
+        Returns:
+            pd.DataFrame: Строки, отсортированные по инструменту и времени,
+                с исходным именем колонки инструмента
+        """
+        import pyarrow.compute as pc
+
+        condition = None
+
+        def add(expr):
+            nonlocal condition
+            condition = expr if condition is None else condition & expr
+
+        if instrument is not None:
+            instruments = [instrument] if isinstance(instrument, str) else list(instrument)
+            add(pc.field("instrument").isin(instruments))
+        if start is not None:
+            add(pc.field("month") >= _month_of(start))
+            add(pc.field("timestamp") >= _seconds(start))
+        if end is not None:
+            add(pc.field("month") <= _month_of(end))
+            add(pc.field("timestamp") < _seconds(end))
+
+        instrument_column = self.instrument_column(name)
+        if columns is not None:
+            columns = ["instrument" if c == instrument_column else c for c in columns]
+
+        table = self._dataset(name).to_table(filter=condition, columns=columns)
+        df = table.to_pandas()
+        if "month" in df.columns and (columns is None or "month" not in columns):
+            df = df.drop(columns=["month"])
+        sort_keys = [c for c in ("instrument", "timestamp") if c in df.columns]
+        if sort_keys:
+            df = df.sort_values(sort_keys, kind="stable").reset_index(drop=True)
+        return df.rename(columns={"instrument": instrument_column})
+
+    def instruments(self, name):
+        """Список инструментов датасета (по именам разделов)"""
+        path = self._path(name)
+        return sorted(unquote(entry[len("instrument="):]) for entry in os.listdir(path) if entry.startswith("instrument="))
+
+
+def import_csv(store, csv_path, name, instrument_column, chunk_rows=CHUNK_ROWS):
+    """
+    Перенос существующего CSV в хранилище блоками по chunk_rows строк
+
+    Returns:
+        int: Число перенесённых строк
+    """
+    rows = 0
+    for chunk in read_csv_chunks(csv_path, chunk_rows):
+        if rows:
+            store.append(name, chunk, instrument_column)
+        else:
+            store.write(name, chunk, instrument_column)
+        rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Импорт CSV в колоночное хранилище")
+    parser.add_argument("csv_path", help="Путь к CSV с колонкой timestamp")
+    parser.add_argument("name", help="Имя датасета в хранилище")
+    parser.add_argument("--root", default="datasets", help="Каталог хранилища")
+    parser.add_argument("--instrument-column", default="instrument", help="Колонка инструмента")
+    args = parser.parse_args(argv)
+
+    rows = import_csv(DatasetStore(args.root), args.csv_path, args.name, args.instrument_column)
+    print(f"Импортировано {rows} строк в {os.path.join(args.root, args.name)}")
+
+
+if __name__ == "__main__":
+    main()
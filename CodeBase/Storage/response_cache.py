@@ -0,0 +1,192 @@
+"""
+Дисковый кэш ответов Steam и T-Bank API с адресацией по содержимому ключа
+
+Структура на диске:
+    <root>/<первые 2 символа sha256>/<sha256 ключа>.bin
+
+Каждый файл - 8 байт времени истечения (float64, Unix-время; inf - бессрочно)
+и сами данные. Время изменения файла обновляется при каждом чтении и служит
+меткой последнего обращения для вытеснения по LRU при превышении max_bytes.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from Metrics.metrics import incr
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<d")
+_DEFAULT_TTL = object()
+
+
+def cache_key(*parts):
+    """sha256 от частей ключа (URL, инструмент, интервал, границы окна)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Кэш байтовых ответов с TTL и ограничением общего размера
+
+    Потокобезопасен внутри процесса; запись атомарна (временный файл + os.replace),
+    поэтому прерванный запуск не оставляет повреждённых записей.
+    """
+
+    def __init__(self, root, max_bytes=512 * 2 ** 20, ttl=15 * 60):
+        """
+        Args:
+            root (str): Каталог кэша
+            max_bytes (int): Предельный размер кэша; самые давно читанные записи удаляются
+            ttl (float): Срок жизни записи по умолчанию, секунды; None - бессрочно
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".bin")
+
+    def _entries(self):
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".bin"):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def size(self):
+        """Текущий размер кэша в байтах"""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            return self._size
+
+    def get(self, key):
+        """
+        Данные по ключу или None, если записи нет или она истекла
+
+        Args:
+            key (str): Ключ из cache_key
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                expires_at, = _HEADER.unpack(header)
+                if expires_at < time.time():
+                    data = None
+                else:
+                    data = f.read()
+        except (FileNotFoundError, struct.error):
+            incr("cache.misses")
+            return None
+
+        if data is None:
+            self.delete(key)
+            incr("cache.misses")
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        incr("cache.hits")
+        return data
+
+    def put(self, key, data, ttl=_DEFAULT_TTL):
+        """
+        Сохранение данных
+
+        Args:
+            key (str): Ключ из cache_key
+            data (bytes): Данные
+            ttl (float, optional): Срок жизни, секунды; None - бессрочно;
+                по умолчанию - ttl кэша
+        """
+        ttl = self.ttl if ttl is _DEFAULT_TTL else ttl
+        expires_at = math.inf if ttl is None else time.time() + ttl
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(expires_at))
+            f.write(data)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        new_size = _HEADER.size + len(data)
+        with self._lock:
+            if self._size is not None:
+                self._size += new_size - old_size
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def delete(self, key):
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def evict(self, target=None):
+        """
+        Удаление истёкших записей и самых давно читанных, пока размер больше target
+
+        Args:
+            target (int, optional): Целевой размер; по умолчанию 90% max_bytes
+        """
+        target = int(self.max_bytes * 0.9) if target is None else target
+        now = time.time()
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for path, size, _ in entries:
+                expired = False
+                try:
+                    with open(path, "rb") as f:
+                        expired = _HEADER.unpack(f.read(_HEADER.size))[0] < now
+                except (OSError, struct.error):
+                    expired = True
+                if not expired and total <= target:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+                removed += 1
+            self._size = total
+        if removed:
+            incr("cache.evictions", removed)
+            logger.info(f"Кэш {self.root}: удалено {removed} записей, размер {total / 2 ** 20:.1f} МиБ")
+
+    def clear(self):
+        """Удаление всех записей"""
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
@@ -1,174 +1,308 @@
 # req pip install tinkoff-investments
-from tinkoff.invest import Client
-from API_KEYS import API_KEY
+"""
+Загрузка свечей CNY/RUB и золота из T-Bank API, инкрементальное сохранение
+и опрос последних цен
 
-TOKEN = API_KEY
+Импорт модуля не обращается к сети и не настраивает логи; tinkoff.invest
+и nest_asyncio загружаются при запуске. Запуск из каталога CodeBase:
+    python -m TBank_API.TBANK_API_script [--full] [--monitor] [--lookup CNYRUB_TOM]
+"""
 
-def get_figi(ticker):
-    with Client(TOKEN) as client:
-        instruments = client.instruments
-        for method in ["currencies"]:
-            for item in getattr(instruments, method)().instruments:
-                if item.ticker == ticker:
-                    return item.figi
-    return None
-
-if __name__ == "__main__":
-    ticker = "CNYRUB_TOM"
-    figi = get_figi(ticker)
-
-    if figi:
-        print(f"FIGI для {ticker}: {figi}")
-    else:
-        print("FIGI не найден")
-        
-        
+import argparse
 import asyncio
+import functools
+import itertools
 import logging
+import os
 import pandas as pd
 from datetime import datetime, timezone
-import nest_asyncio
 
-from tinkoff.invest import CandleInterval
-from tinkoff.invest.retrying.aio.client import AsyncRetryingClient
-from tinkoff.invest.retrying.settings import RetryClientSettings
-from tinkoff.invest.utils import now
+from Analytics.alignment import align_sources
+from Analytics.quality import check_frame, quality_summary
+from Metrics.metrics import metrics, timed, timer
+from Storage.chunked_writer import csv_columns, frame_chunks, read_csv_chunks, write_chunks
+from Storage.dataset_store import DatasetStore, import_csv
+from Storage.response_cache import ResponseCache
 
-nest_asyncio.apply()
+from .candle_fetcher import fetch_candles_concurrently
+from .incremental import append_increment, scan_marks, start_dates
+from .instrument_registry import InstrumentRegistry
+from .price_poller import LastPricePoller
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-file_handler = logging.FileHandler("logfile1.log")
-formatter = logging.Formatter("%(asctime)s %(levelname)s:%(message)s")
-file_handler.setFormatter(formatter)
-
-logger.addHandler(file_handler)
-
-
-retry_settings = RetryClientSettings(use_retry=True, max_retry_attempt=2)
 
 start_date = datetime(2022, 3, 3, tzinfo=timezone.utc)
 
-df = pd.DataFrame(columns=["currency", "price_rub", "timestamp"])
-
-async def fetch_candles(client):
-    global df
-    async for candle in client.get_all_candles(
-        figi='BBG0013HRTL0',
-        from_=start_date,
-        to=now(),
-        interval=CandleInterval.CANDLE_INTERVAL_30_MIN,
-    ):
-        df = pd.concat([df, pd.DataFrame([{
-            "currency": "CNY",
-            "price_rub": candle.close.units + candle.close.nano / 1e9,
-            "timestamp": int(candle.time.timestamp())
-        }])], ignore_index=True)
-
+figi_cny = 'BBG0013HRTL0'
+uid_gold = '258e2b93-54e8-4f2d-ba3d-a507c47e3ae2'
+uid_cny = '4587ab1d-a9c9-4910-a0d6-86c7b9c42510'
+
+dataset_path = "cny_rub_dataset.csv"
+log_path = "logfile1.log"
+# False - полная перезагрузка истории с start_date
+incremental = True
+# Колоночное хранилище (Parquet по инструменту и месяцу) рядом с CSV
+store = DatasetStore("datasets")
+store_name = "cny_rub"
+# Кэш закрытых окон свечей: при полной перезагрузке и повторе после сбоя они не скачиваются заново
+cache = ResponseCache("cache", max_bytes=1024 * 2 ** 20)
+# True - после загрузки истории непрерывно опрашивать последние цены
+monitor = False
+# Сводка времени этапов и счётчиков запуска (.prom - формат Prometheus, иначе JSON)
+metrics_path = "run_metrics.json"
+# Копия датасета с последними ценами (в Colab - "/content/cny_rub_dataset.csv")
+snapshot_path = None
+
+
+def get_token():
+    """Токен T-Bank API: переменная окружения TINKOFF_TOKEN или API_KEY из API_KEYS.py"""
+    token = os.environ.get("TINKOFF_TOKEN")
+    if token:
+        return token
+    from .API_KEYS import API_KEY
+    return API_KEY
+
+
+@functools.lru_cache(maxsize=None)
+def get_registry():
+    return InstrumentRegistry(get_token())
 
-async def main():
-    async with AsyncRetryingClient(TOKEN, settings=retry_settings) as client:
-        await fetch_candles(client)
-
-    df.to_csv("cny_rub_dataset.csv", index=False)
-
-if __name__ == "__main__":
-    asyncio.run(main())
 
+def get_figi(ticker):
+    return get_registry().figi(ticker)
 
 
 def get_uid(ticker):
-    with Client(TOKEN) as client:
-        instruments = client.instruments
-        for method in ["currencies"]:
-            for item in getattr(instruments, method)().instruments:
-                if item.ticker == ticker:
-                    return item.uid
-    return None
+    return get_registry().uid(ticker)
+
+
+def setup_logging():
+    """Запись лога в logfile1.log"""
+    logger.setLevel(logging.INFO)
+
+    file_handler = logging.FileHandler(log_path)
+    formatter = logging.Formatter("%(asctime)s %(levelname)s:%(message)s")
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+
+
+def retrying_client():
+    from tinkoff.invest.retrying.aio.client import AsyncRetryingClient
+    from tinkoff.invest.retrying.settings import RetryClientSettings
+
+    retry_settings = RetryClientSettings(use_retry=True, max_retry_attempt=2)
+    return AsyncRetryingClient(get_token(), settings=retry_settings)
+
+
+def run_async(coro):
+    """asyncio.run; в Jupyter, где цикл событий уже запущен, - через nest_asyncio"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    import nest_asyncio
+    nest_asyncio.apply()
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@timed("tbank.fetch_candles")
+async def fetch_candles(client, from_=start_date, use_cache=True, to=None, interval=None):
+    """
+    30-минутные свечи CNY и золота, объединённые по времени и проверенные check_frame
+
+    Args:
+        client: Асинхронный клиент tinkoff.invest (или FakeAsyncClient)
+        from_ (datetime | dict): Начало загрузки, общее или по инструментам
+        use_cache (bool): Брать закрытые окна из кэша
+        to (datetime, optional): Конец загрузки; по умолчанию - текущий момент
+        interval (CandleInterval, optional): По умолчанию CANDLE_INTERVAL_30_MIN
+
+    Returns:
+        pd.DataFrame: currency, price_rub, timestamp, gold_price
+    """
+    if interval is None:
+        from tinkoff.invest import CandleInterval
+        interval = CandleInterval.CANDLE_INTERVAL_30_MIN
+
+    buffers = await fetch_candles_concurrently(
+        client,
+        [figi_cny, uid_gold],
+        from_=from_,
+        to=to or datetime.now(timezone.utc),
+        interval=interval,
+        cache=cache if use_cache else None,
+    )
+
+    df_cny = buffers[figi_cny].to_frame("price_rub", currency="CNY")
+    logger.info(f"Загружено {len(df_cny)} свечей CNY")
+
+    df_gold = buffers[uid_gold].to_frame("gold_price")
+    logger.info(f"Загружено {len(df_gold)} свечей золота")
+
+    # Объединение меток обоих инструментов, чтобы не терять свечи золота без пары CNY
+    with timer("tbank.align"):
+        df = align_sources(
+            {"cny": (df_cny, "timestamp", ["price_rub"]), "gold": (df_gold, "timestamp", ["gold_price"])},
+            policy="exact",
+        )
+    df, report = check_frame(df, ["price_rub", "gold_price"], cadence="30min", session="moex", name="tbank")
+    logger.info(quality_summary(report))
+    df.insert(0, "currency", "CNY")
+    return df[["currency", "price_rub", "timestamp", "gold_price"]]
 
-if __name__ == "__main__":
-    ticker = "GLDRUB_TOM"
-    uid = get_uid(ticker)
 
-    if uid:
-        logger.info(f"UID для {ticker}: {uid}")
-        print(f"UID для {ticker}: {uid}")
-    else:
-        logger.warning(f"UID для {ticker} не найден")
-        print("UID не найден")
-        
-        
-uid_gold='258e2b93-54e8-4f2d-ba3d-a507c47e3ae2'
-def fetch_gold_prices(uid_gold):
-    global df
+async def sync_candles(full=None, use_cache=True):
+    """
+    Загрузка новых свечей в dataset_path и колоночное хранилище
 
-    df_gold = pd.DataFrame()
+    Сохранённый датасет читается блоками, целиком в память не загружается;
+    в файл дописываются только обновлённые и новые свечи.
 
-    with Client(TOKEN) as client:
-        for candle in client.get_all_candles(
-            instrument_id=uid,
-            from_=start_date,
-            to=now(),
-            interval=CandleInterval.CANDLE_INTERVAL_30_MIN,
-        ):
-            df_gold = pd.concat([df_gold, pd.DataFrame([{
-                "timestamp": int(candle.time.timestamp()),
-                "gold_price": candle.close.units + candle.close.nano / 1e9
-            }])], ignore_index=True)
+    Returns:
+        pd.DataFrame: Загруженные или обновлённые строки
+    """
+    full = not incremental if full is None else full
+    with timer("tbank.read_dataset"):
+        marks = None if full else scan_marks(dataset_path, {figi_cny: "price_rub", uid_gold: "gold_price"})
 
-    df = df.merge(df_gold, on="timestamp", how="left")
+    if marks is None:
+        async with retrying_client() as client:
+            df = await fetch_candles(client, use_cache=use_cache)
+        with timer("tbank.export"):
+            write_chunks(dataset_path, frame_chunks(df))
+            store.write(store_name, df, instrument_column="currency")
+        return df
 
-    logger.info("Добавлены исторические данные о ценах на золото")
+    logger.info(f"Последние сохранённые свечи: {marks}")
 
-fetch_gold_prices(uid_gold)
+    # Запоздавшие свечи золота дополняют уже сохранённые строки при объединении по timestamp
+    async with retrying_client() as client:
+        df_new = await fetch_candles(client, from_=start_dates(marks, start_date), use_cache=use_cache)
 
+    with timer("tbank.export"):
+        updated = append_increment(dataset_path, df_new)
 
+        if not store.exists(store_name):
+            import_csv(store, dataset_path, store_name, instrument_column="currency")
+        elif len(updated):
+            store.append(store_name, updated)
+    return updated
 
-def get_uid(ticker):
-    with Client(TOKEN) as client:
-        instruments = client.instruments
-        for method in ["currencies"]:
-            for item in getattr(instruments, method)().instruments:
-                if item.ticker == ticker:
-                    return item.uid
-    return None
 
-if __name__ == "__main__":
-    ticker = "CNYRUB_TOM"
-    uid = get_uid(ticker)
-
-    if uid:
-        logger.info(f"UID для {ticker}: {uid}")
-        print(f"UID для {ticker}: {uid}")
-    else:
-        logger.warning(f"UID для {ticker} не найден")
-        print("UID не найден")
-        
-        
-uid_cny='4587ab1d-a9c9-4910-a0d6-86c7b9c42510'
 def fetch_last_prices(figi, uid):
-    global df
-    with Client(TOKEN) as client:
-        last_prices_response = client.market_data.get_last_prices(
-            instrument_id=[uid_cny, uid_gold]
-        )
-        last_prices = {lp.instrument_uid: lp.price.units + lp.price.nano / 1e9 for lp in last_prices_response.last_prices}
-        timestamp = int(last_prices_response.last_prices[0].time.timestamp())
+    """
+    Последние цены CNY и золота в формате датасета
+
+    Returns:
+        pd.DataFrame: currency, price_rub, timestamp, gold_price; одна строка,
+            если время последних цен совпадает, иначе строка на каждую метку
+    """
+    from tinkoff.invest import Client
+
+    with Client(get_token()) as client:
+        with LastPricePoller(client, [uid_cny, uid_gold], log_path=None) as poller:
+            ticks = poller.poll_once()
+
+    # У каждого инструмента своё время последней сделки: строка на каждую метку
+    ticks = pd.DataFrame(ticks, columns=["instrument_uid", "price", "timestamp"])
+    columns = {uid_cny: "price_rub", uid_gold: "gold_price"}
+    df_new = align_sources(
+        {column: (ticks[ticks["instrument_uid"] == instrument], "timestamp", {"price": column})
+         for instrument, column in columns.items()},
+        policy="exact",
+    )
+    df_new.insert(0, "currency", "CNY")
+
+    last = ticks.drop_duplicates("instrument_uid", keep="last").set_index("instrument_uid")["price"]
+    logger.info(f"Добавлено строк: {len(df_new)}, CNY = {last.get(uid_cny)} RUB, Gold = {last.get(uid_gold)} RUB")
+    return df_new[["currency", "price_rub", "timestamp", "gold_price"]]
+
+
+def write_snapshot(path, last_prices):
+    """Копия датасета со строкой последних цен в конце; датасет копируется блоками"""
+    columns = csv_columns(dataset_path) or list(last_prices.columns)
+    write_chunks(path, itertools.chain(read_csv_chunks(dataset_path), [last_prices]), columns,
+                 transform=lambda chunk: chunk.reindex(columns=columns))
+
+
+def monitor_last_prices(interval=5.0, max_polls=None):
+    """Непрерывный опрос последних цен CNY и золота с записью в last_prices_log.csv"""
+    from tinkoff.invest import Client
+
+    with Client(get_token()) as client:
+        with LastPricePoller(client, [uid_cny, uid_gold]) as poller:
+            poller.run(interval=interval, max_polls=max_polls)
+    return poller
+
+
+def main(full=None, monitor_prices=None, snapshot=None, metrics_file=None, use_cache=True):
+    """
+    Загрузка истории свечей, добавление последних цен и, по желанию, непрерывный опрос
+
+    Незаданные аргументы берутся из настроек модуля (incremental, monitor,
+    snapshot_path, metrics_path).
+
+    Args:
+        full (bool, optional): Полная перезагрузка истории с start_date вместо инкремента
+        monitor_prices (bool, optional): После загрузки непрерывно опрашивать последние цены
+        snapshot (str, optional): Куда сохранить датасет вместе со строкой последних цен
+        metrics_file (str, optional): Файл для сводки времени этапов (.json или .prom)
+        use_cache (bool): Брать закрытые окна свечей из кэша
+    """
+    monitor_prices = monitor if monitor_prices is None else monitor_prices
+    snapshot = snapshot or snapshot_path
+    metrics_file = metrics_file or metrics_path
+    try:
+        run_async(sync_candles(full, use_cache))
+        last_prices = fetch_last_prices(uid_cny, uid_gold)
+        if monitor_prices:
+            monitor_last_prices()
+        if snapshot:
+            write_snapshot(snapshot, last_prices)
+    finally:
+        logger.info("Время этапов:\n" + metrics.report())
+        if metrics_file:
+            metrics.save(metrics_file)
+
+
+def lookup(tickers):
+    """Печать FIGI и UID инструментов по тикерам"""
+    for ticker in tickers:
+        item = get_registry().get(ticker)
+        if item:
+            logger.info(f"{ticker}: FIGI {item['figi']}, UID {item['uid']}")
+            print(f"FIGI для {ticker}: {item['figi']}")
+            print(f"UID для {ticker}: {item['uid']}")
+        else:
+            logger.warning(f"Инструмент {ticker} не найден")
+            print(f"{ticker}: FIGI и UID не найдены")
+
+
+def cli(argv=None):
+    """Разбор аргументов командной строки и запуск main или поиска тикеров"""
+    arg_parser = argparse.ArgumentParser(description="Загрузка свечей CNY/RUB и золота из T-Bank API")
+    arg_parser.add_argument("--full", action="store_true", default=not incremental,
+                            help="Полная перезагрузка истории вместо дозагрузки новых свечей")
+    arg_parser.add_argument("--monitor", action="store_true", default=monitor,
+                            help="После загрузки непрерывно опрашивать последние цены")
+    arg_parser.add_argument("--snapshot", default=snapshot_path,
+                            help="Сохранить датасет вместе со строкой последних цен в этот файл")
+    arg_parser.add_argument("--metrics", default=metrics_path,
+                            help="Сохранить время этапов и счётчики: .prom - формат Prometheus, иначе JSON")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Скачать все окна свечей заново, не используя кэш")
+    arg_parser.add_argument("--lookup", nargs="+", metavar="TICKER",
+                            help="Только вывести FIGI и UID тикеров (например CNYRUB_TOM GLDRUB_TOM)")
+    args = arg_parser.parse_args(argv)
+
+    setup_logging()
+    if args.lookup:
+        lookup(args.lookup)
+        return
+    main(full=args.full, monitor_prices=args.monitor, snapshot=args.snapshot, metrics_file=args.metrics,
+         use_cache=not args.no_cache)
 
-        df_new = pd.DataFrame([{
-            "currency": "CNY",
-            "timestamp": timestamp,
-            "price_rub": last_prices.get(uid_cny, None),
-            "gold_price": last_prices.get(uid_gold, None)
-        }])
 
-        df = pd.concat([df, df_new], ignore_index=True)
-
-        logger.info(f"Добавлена новая строка: CNY = {last_prices.get(uid_cny, None)} RUB, Gold = {last_prices.get(uid_gold, None)} RUB")
-
-fetch_last_prices(uid_cny, uid_gold)
-
-
-
-df.to_csv("/content/cny_rub_dataset.csv", index=False)
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,3 @@
+"""
+Загрузка свечей и последних цен из T-Bank API
+"""
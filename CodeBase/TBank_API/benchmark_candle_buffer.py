@@ -0,0 +1,63 @@
+"""
+Бенчмарк загрузки свечей: pd.concat на каждую свечу против CandleBuffer
+
+Запуск из каталога CodeBase: python -m TBank_API.benchmark_candle_buffer
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from .candle_buffer import CandleBuffer
+from .fake_client import make_candle
+
+
+def make_candles(n, start=datetime(2022, 3, 3, tzinfo=timezone.utc)):
+    """Синтетические 30-минутные свечи в формате tinkoff.invest"""
+    step = timedelta(minutes=30)
+    return [
+        make_candle(start + i * step, 18 + i % 3, (i * 7919) % 1_000_000_000)
+        for i in range(n)
+    ]
+
+
+def ingest_concat(candles):
+    df = pd.DataFrame(columns=["currency", "price_rub", "timestamp"])
+    for candle in candles:
+        df = pd.concat([df, pd.DataFrame([{
+            "currency": "CNY",
+            "price_rub": candle.close.units + candle.close.nano / 1e9,
+            "timestamp": int(candle.time.timestamp())
+        }])], ignore_index=True)
+    return df
+
+
+def ingest_buffer(candles):
+    buffer = CandleBuffer()
+    for candle in candles:
+        buffer.append_candle(candle)
+    return buffer.to_frame("price_rub", currency="CNY")
+
+
+def measure(func, candles):
+    started = time.perf_counter()
+    df = func(candles)
+    elapsed = time.perf_counter() - started
+    assert len(df) == len(candles)
+    return elapsed
+
+
+def main():
+    print(f"{'метод':<10}{'свечей':>10}{'сек':>10}{'мкс/свеча':>12}")
+    for n in (1_000, 2_000, 4_000, 8_000):
+        elapsed = measure(ingest_concat, make_candles(n))
+        print(f"{'concat':<10}{n:>10}{elapsed:>10.3f}{elapsed / n * 1e6:>12.2f}")
+    for n in (25_000, 50_000, 100_000, 200_000, 400_000):
+        elapsed = measure(ingest_buffer, make_candles(n))
+        print(f"{'buffer':<10}{n:>10}{elapsed:>10.3f}{elapsed / n * 1e6:>12.2f}")
+    print("Для линейной загрузки время на свечу не должно расти вместе с n")
+
+
+if __name__ == "__main__":
+    main()
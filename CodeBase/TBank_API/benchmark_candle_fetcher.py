@@ -0,0 +1,52 @@
+"""
+Бенчмарк параллельной загрузки свечей на фейковом клиенте
+
+Запуск из каталога CodeBase: python -m TBank_API.benchmark_candle_fetcher
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from .candle_buffer import CandleBuffer
+from .candle_fetcher import fetch_candles_concurrently
+from .fake_client import FakeAsyncClient
+
+INSTRUMENTS = ["BBG0013HRTL0", "258e2b93-54e8-4f2d-ba3d-a507c47e3ae2"]
+FROM = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TO = datetime(2024, 7, 1, tzinfo=timezone.utc)
+
+
+async def fetch_sequentially(client):
+    results = {}
+    for instrument_id in INSTRUMENTS:
+        buffer = CandleBuffer()
+        async for candle in client.get_all_candles(instrument_id=instrument_id, from_=FROM, to=TO):
+            buffer.append_candle(candle)
+        results[instrument_id] = buffer
+    return results
+
+
+async def main():
+    client = FakeAsyncClient(page_latency=0.005)
+    started = time.perf_counter()
+    sequential = await fetch_sequentially(client)
+    sequential_time = time.perf_counter() - started
+
+    client = FakeAsyncClient(page_latency=0.005)
+    started = time.perf_counter()
+    concurrent = await fetch_candles_concurrently(client, INSTRUMENTS, FROM, TO, interval=None)
+    concurrent_time = time.perf_counter() - started
+
+    for instrument_id in INSTRUMENTS:
+        assert (sequential[instrument_id].timestamps() == concurrent[instrument_id].timestamps()).all()
+        assert (sequential[instrument_id].prices() == concurrent[instrument_id].prices()).all()
+
+    total = sum(len(buffer) for buffer in concurrent.values())
+    print(f"Инструментов: {len(INSTRUMENTS)}, свечей: {total}")
+    print(f"Последовательно: {sequential_time:.3f} с")
+    print(f"Параллельно:     {concurrent_time:.3f} с ({sequential_time / concurrent_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Параллельная загрузка свечей нескольких инструментов через один асинхронный клиент
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from Metrics.metrics import incr, timer
+from Storage.response_cache import cache_key
+
+from .candle_buffer import CandleBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def _epoch(moment):
+    return datetime(1970, 1, 1, tzinfo=timezone.utc if moment.tzinfo else None)
+
+
+def is_boundary(moment, window):
+    """Совпадает ли moment с границей окон, отсчитанных от начала Unix-времени"""
+    return (moment - _epoch(moment)) % window == timedelta(0)
+
+
+def split_windows(from_, to, window, align=False):
+    """
+    Разбиение интервала [from_, to) на последовательные окна
+
+    Args:
+        from_ (datetime): Начало интервала
+        to (datetime): Конец интервала
+        window (timedelta): Длина одного окна
+        align (bool): Ставить границы окон на кратные window от начала Unix-времени,
+            чтобы одни и те же окна получались при разных from_ (для кэша)
+
+    Returns:
+        list: Список пар (начало, конец)
+    """
+    windows = []
+    start = from_
+    while start < to:
+        end = start + window
+        if align:
+            end -= (end - _epoch(end)) % window
+        end = min(end, to)
+        windows.append((start, end))
+        start = end
+    return windows
+
+
+async def _fetch_window(client, semaphore, instrument_id, from_, to, interval, cache=None):
+    key = None
+    if cache is not None:
+        key = cache_key("tbank.candles", instrument_id, getattr(interval, "name", interval),
+                        from_.isoformat(), to.isoformat())
+        data = cache.get(key)
+        if data is not None:
+            buffer = CandleBuffer.from_bytes(data)
+            logger.info(f"{instrument_id}: {from_:%Y-%m-%d} - {to:%Y-%m-%d}, {len(buffer)} свечей из кэша")
+            return buffer
+
+    buffer = CandleBuffer()
+    async with semaphore:
+        with timer("tbank.fetch_window"):
+            async for candle in client.get_all_candles(
+                instrument_id=instrument_id,
+                from_=from_,
+                to=to,
+                interval=interval,
+            ):
+                # Соседние окна могут вернуть свечу на общей границе
+                if candle.time < to:
+                    buffer.append_candle(candle)
+    incr("tbank.candles", len(buffer))
+    logger.info(f"{instrument_id}: {from_:%Y-%m-%d} - {to:%Y-%m-%d}, {len(buffer)} свечей")
+    if key is not None:
+        # Закрытое окно больше не меняется, поэтому хранится бессрочно
+        cache.put(key, buffer.to_bytes(), ttl=None)
+    return buffer
+
+
+async def fetch_candles_concurrently(client, instrument_ids, from_, to, interval,
+                                     max_concurrency=8, window=timedelta(days=30), cache=None,
+                                     settle=timedelta(days=1)):
+    """
+    Загрузка свечей для списка инструментов с разбиением периода на окна,
+    которые скачиваются параллельно
+
+    Args:
+        client: AsyncServices из AsyncClient/AsyncRetryingClient или совместимый фейк
+        instrument_ids (list): FIGI или UID инструментов
+        from_ (datetime | dict): Начало периода, общее или instrument_id -> datetime
+        to (datetime): Конец периода
+        interval (CandleInterval): Интервал свечей
+        max_concurrency (int): Максимум одновременных запросов get_all_candles
+        window (timedelta): Длина окна, на которые делится период
+        cache (ResponseCache, optional): Кэш закрытых окон; с ним границы окон
+            выравниваются, и полное окно, закончившееся раньше settle назад, загружается один раз
+        settle (timedelta): Через сколько после конца окна его свечи считаются окончательными
+
+    Returns:
+        dict: instrument_id -> CandleBuffer со свечами в хронологическом порядке
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    starts = from_ if isinstance(from_, dict) else dict.fromkeys(instrument_ids, from_)
+
+    jobs = [
+        (instrument_id, start, end)
+        for instrument_id in instrument_ids
+        for start, end in split_windows(starts[instrument_id], to, window, align=cache is not None)
+    ]
+    closed_before = datetime.now(to.tzinfo) - settle
+
+    def window_cache(start, end):
+        # Последнее окно обрывается на to и ещё может пополниться. Первое окно дозагрузки
+        # начинается сразу после сохранённой свечи: такой ключ больше не повторится
+        if cache is None or end > closed_before:
+            return None
+        return cache if is_boundary(start, window) and is_boundary(end, window) else None
+
+    parts = await asyncio.gather(*(
+        _fetch_window(client, semaphore, instrument_id, start, end, interval, window_cache(start, end))
+        for instrument_id, start, end in jobs
+    ))
+
+    results = {instrument_id: CandleBuffer() for instrument_id in instrument_ids}
+    for (instrument_id, _, _), part in zip(jobs, parts):
+        results[instrument_id].extend(part)
+    for instrument_id, buffer in results.items():
+        logger.info(f"{instrument_id}: всего загружено {len(buffer)} свечей")
+    return results
@@ -0,0 +1,59 @@
+"""
+Локальный фейковый клиент, имитирующий потоки свечей tinkoff.invest
+
+Используется для проверки загрузчиков и бенчмарков без токена и сети.
+"""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+
+def make_candle(time, units, nano):
+    """Объект со структурой HistoricCandle: close.units, close.nano, time"""
+    return SimpleNamespace(
+        close=SimpleNamespace(units=units, nano=nano),
+        time=time,
+    )
+
+
+class FakeAsyncClient:
+    """
+    Имитация AsyncServices с методом get_all_candles
+
+    Свечи генерируются детерминированно на сетке step; каждые page_size свечей
+    клиент "ждёт ответ сервера" page_latency секунд, как при постраничной
+    загрузке в настоящем API.
+    """
+
+    def __init__(self, step=timedelta(minutes=30), page_size=48, page_latency=0.0):
+        self.step = step
+        self.page_size = page_size
+        self.page_latency = page_latency
+        self.requests = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def _align(self, moment):
+        step = self.step.total_seconds()
+        ts = moment.timestamp()
+        aligned = -(-ts // step) * step
+        return moment + timedelta(seconds=aligned - ts)
+
+    async def get_all_candles(self, *, figi="", instrument_id="", from_, to, interval=None):
+        instrument_id = instrument_id or figi
+        seed = sum(map(ord, instrument_id))
+        moment = self._align(from_)
+        count = 0
+        while moment < to:
+            if count % self.page_size == 0:
+                self.requests += 1
+                await asyncio.sleep(self.page_latency)
+            i = int(moment.timestamp() // self.step.total_seconds())
+            yield make_candle(moment, 10 + seed % 90, (i * 7919 + seed) % 1_000_000_000)
+            moment += self.step
+            count += 1
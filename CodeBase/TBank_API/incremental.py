@@ -0,0 +1,179 @@
+"""
+Инкрементальное обновление датасета свечей по последней сохранённой временной метке
+"""
+
+import itertools
+import logging
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from Storage.chunked_writer import CHUNK_ROWS, csv_columns, frame_chunks, read_csv_chunks, row_offset, write_chunks
+
+logger = logging.getLogger(__name__)
+
+
+def high_water_marks(df, columns):
+    """
+    Последняя временная метка с непустым значением для каждого инструмента
+
+    Args:
+        df (pd.DataFrame): Сохранённый датасет с колонкой timestamp
+        columns (dict): instrument_id -> колонка с ценой этого инструмента
+
+    Returns:
+        dict: instrument_id -> последний timestamp (int) или None
+    """
+    marks = {}
+    for instrument_id, column in columns.items():
+        if df is None or column not in df.columns:
+            marks[instrument_id] = None
+            continue
+        stored = df.loc[df[column].notna(), "timestamp"]
+        marks[instrument_id] = int(stored.max()) if len(stored) else None
+    return marks
+
+
+def start_dates(marks, default):
+    """
+    Даты начала загрузки: секунда после последней сохранённой свечи,
+    либо default для инструментов без сохранённых данных
+    """
+    return {
+        instrument_id: default if mark is None else datetime.fromtimestamp(mark + 1, tz=timezone.utc)
+        for instrument_id, mark in marks.items()
+    }
+
+
+def merge_increment(existing, new, required_columns=()):
+    """
+    Объединение сохранённых и новых строк с дедупликацией по timestamp
+
+    Для совпадающих timestamp берётся последнее непустое значение каждой колонки,
+    так что новые данные дополняют уже сохранённые строки. Перегруппировывается
+    только хвост, пересекающийся с новыми данными.
+
+    Args:
+        existing (pd.DataFrame | None): Сохранённые строки
+        new (pd.DataFrame): Новые строки
+        required_columns (tuple): Строки с пропуском в этих колонках отбрасываются
+
+    Returns:
+        pd.DataFrame: Объединённые строки, отсортированные по timestamp
+    """
+    if existing is None or existing.empty:
+        columns = list(new.columns)
+        merged = new.groupby("timestamp", as_index=False, sort=True).last()
+    elif new.empty:
+        return existing
+    else:
+        columns = list(existing.columns) + [c for c in new.columns if c not in existing.columns]
+        cutoff = new["timestamp"].min()
+        head = existing[existing["timestamp"] < cutoff]
+        tail = pd.concat([existing[existing["timestamp"] >= cutoff], new], ignore_index=True)
+        tail = tail.groupby("timestamp", as_index=False, sort=True).last()
+        merged = pd.concat([head, tail], ignore_index=True)
+    merged = merged[columns]
+
+    if required_columns:
+        merged = merged.dropna(subset=list(required_columns)).reset_index(drop=True)
+    return merged
+
+
+def _read_chunks(path, chunk_rows, parse=None):
+    for chunk in read_csv_chunks(path, chunk_rows):
+        yield chunk if parse is None else parse(chunk)
+
+
+def scan_marks(path, columns, chunk_rows=CHUNK_ROWS, parse=None):
+    """
+    high_water_marks по сохранённому CSV без чтения его целиком
+
+    Args:
+        parse (callable, optional): Приведение прочитанного блока к колонке timestamp,
+            если в файле время хранится иначе
+
+    Returns:
+        dict | None: instrument_id -> последний timestamp; None, если файла ещё нет
+    """
+    if csv_columns(path) is None:
+        return None
+    marks = dict.fromkeys(columns)
+    for chunk in _read_chunks(path, chunk_rows, parse):
+        for instrument_id, mark in high_water_marks(chunk, columns).items():
+            if mark is not None:
+                marks[instrument_id] = mark if marks[instrument_id] is None else max(marks[instrument_id], mark)
+    return marks
+
+
+def append_increment(path, new, required_columns=(), chunk_rows=CHUNK_ROWS, parse=None, transform=None):
+    """
+    Сохранение инкремента: новые строки дописываются в конец файла
+
+    Сохранённый файл читается блоками: в памяти оказываются только строки
+    начиная с первой новой метки. Файл отсортирован по времени, поэтому
+    обновлённые строки стоят в его конце - файл обрезается с первой из них
+    и объединённые строки дописываются. Целиком (тоже блоками) файл
+    перезаписывается, только если появились новые колонки или строки
+    в файле не по порядку.
+
+    Args:
+        path (str): Путь к CSV
+        new (pd.DataFrame): Новые строки с колонкой timestamp
+        required_columns (tuple): Строки с пропуском в этих колонках отбрасываются
+        chunk_rows (int): Строк в блоке чтения и записи
+        parse (callable, optional): Приведение прочитанного блока к формату new,
+            если в файле время хранится иначе (например, датой)
+        transform (callable, optional): Обратное к parse преобразование блока перед записью
+
+    Returns:
+        pd.DataFrame: Новые и обновлённые строки (с первой метки инкремента)
+    """
+    header = csv_columns(path)
+    if header is None:
+        merged = merge_increment(None, new, required_columns)
+        write_chunks(path, frame_chunks(merged, chunk_rows), chunk_rows=chunk_rows, transform=transform)
+        logger.info(f"Записано {len(merged)} строк в {path}")
+        return merged
+    if new.empty:
+        return new
+    stored_columns = header if parse is None else list(parse(pd.DataFrame(columns=header)).columns)
+
+    cutoff = new["timestamp"].min()
+    tail = []
+    first = None
+    ordered = True
+    position = 0
+    for chunk in _read_chunks(path, chunk_rows, parse):
+        later = (chunk["timestamp"] >= cutoff).to_numpy()
+        if first is None and later.any():
+            first = position + int(later.argmax())
+        if first is not None and not later[max(first - position, 0):].all():
+            ordered = False
+        if later.any():
+            tail.append(chunk[later])
+        position += len(chunk)
+    stored_tail = pd.concat(tail, ignore_index=True) if tail else None
+
+    merged = merge_increment(stored_tail, new, required_columns)
+    columns = stored_columns + [c for c in merged.columns if c not in stored_columns]
+    merged = merged.reindex(columns=columns)
+
+    if columns == stored_columns and ordered:
+        if stored_tail is not None:
+            with open(path, "r+b") as f:
+                f.truncate(row_offset(path, first))
+        write_chunks(path, frame_chunks(merged, chunk_rows), header, chunk_rows, append=True, transform=transform)
+        replaced = 0 if stored_tail is None else len(stored_tail)
+        logger.info(f"{path}: заменено {replaced} последних строк, дописано {len(merged)}")
+        return merged
+
+    def reorder(chunk):
+        chunk = chunk.reindex(columns=columns)
+        return chunk if transform is None else transform(chunk)
+
+    head = (chunk[chunk["timestamp"] < cutoff] for chunk in _read_chunks(path, chunk_rows, parse))
+    rows = write_chunks(path, itertools.chain(head, frame_chunks(merged, chunk_rows)), None, chunk_rows,
+                        transform=reorder)
+    logger.info(f"Датасет {path} перезаписан: {rows} строк")
+    return merged
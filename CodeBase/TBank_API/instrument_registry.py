@@ -0,0 +1,91 @@
+"""
+Реестр инструментов T-Bank API с локальным кэшем ticker -> FIGI/UID
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENT_METHODS = ["currencies", "shares", "bonds", "etfs", "futures"]
+
+
+class InstrumentRegistry:
+    """
+    Загружает все классы инструментов одним проходом, строит индекс по тикеру
+    и хранит его в JSON-файле. Пока кэш моложе ttl секунд, поиск не обращается к сети.
+    """
+
+    def __init__(self, token, cache_path="instruments_cache.json", ttl=24 * 60 * 60,
+                 methods=INSTRUMENT_METHODS, client_factory=None):
+        self.token = token
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.methods = list(methods)
+        self.client_factory = client_factory
+        self._index = None
+
+    def _read_cache(self):
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать кэш инструментов {self.cache_path}: {str(e)}")
+            return None
+        if time.time() - cache.get("fetched_at", 0) > self.ttl:
+            logger.info("Кэш инструментов устарел")
+            return None
+        return cache["instruments"]
+
+    def _write_cache(self, index):
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "instruments": index}, f, ensure_ascii=False)
+
+    def refresh(self):
+        """Загрузка всех инструментов из API и перезапись кэша"""
+        client_factory = self.client_factory
+        if client_factory is None:
+            from tinkoff.invest import Client
+            client_factory = Client
+
+        index = {}
+        with client_factory(self.token) as client:
+            for method in self.methods:
+                items = getattr(client.instruments, method)().instruments
+                for item in items:
+                    # При совпадении тикеров приоритет у классов из начала списка methods
+                    index.setdefault(item.ticker, {
+                        "figi": item.figi,
+                        "uid": item.uid,
+                        "class_code": item.class_code,
+                        "type": method,
+                    })
+                logger.info(f"Загружено {len(items)} инструментов: {method}")
+
+        self._write_cache(index)
+        self._index = index
+        return index
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self._read_cache()
+        if self._index is None:
+            self.refresh()
+        return self._index
+
+    def get(self, ticker):
+        """Описание инструмента по тикеру или None"""
+        return self.index.get(ticker)
+
+    def figi(self, ticker):
+        item = self.get(ticker)
+        return item["figi"] if item else None
+
+    def uid(self, ticker):
+        item = self.get(ticker)
+        return item["uid"] if item else None
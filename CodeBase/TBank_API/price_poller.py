@@ -0,0 +1,161 @@
+"""
+Периодический опрос последних цен с кольцевым буфером и журналом на диске
+"""
+
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from Metrics.metrics import incr, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TickRingBuffer:
+    """Кольцевой буфер фиксированного размера для тиков (инструмент, цена, время)"""
+
+    def __init__(self, capacity=100_000):
+        self.capacity = int(capacity)
+        self._instrument = np.empty(self.capacity, dtype=np.int32)
+        self._price = np.empty(self.capacity, dtype=np.float64)
+        self._time = np.empty(self.capacity, dtype=np.int64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, instrument, price, timestamp):
+        i = self._next
+        self._instrument[i] = instrument
+        self._price[i] = price
+        self._time[i] = timestamp
+        self._next = (i + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _ordered(self, array):
+        if self._count < self.capacity:
+            return array[:self._count].copy()
+        return np.concatenate((array[self._next:], array[:self._next]))
+
+    def arrays(self):
+        """Содержимое буфера от старых тиков к новым"""
+        return self._ordered(self._instrument), self._ordered(self._price), self._ordered(self._time)
+
+
+class LastPricePoller:
+    """
+    Опрашивает get_last_prices одним запросом на все инструменты за тик
+
+    Тики складываются в кольцевой буфер и дописываются строками в CSV-журнал,
+    поэтому стоимость тика не зависит от длины уже накопленной истории.
+    """
+
+    def __init__(self, client, instrument_ids, capacity=100_000, log_path="last_prices_log.csv"):
+        self.client = client
+        self.instrument_ids = list(instrument_ids)
+        self._index = {instrument_id: i for i, instrument_id in enumerate(self.instrument_ids)}
+        self.buffer = TickRingBuffer(capacity)
+
+        self._log = None
+        if log_path:
+            new_file = not os.path.exists(log_path)
+            self._log = open(log_path, "a", encoding="utf-8")
+            if new_file:
+                self._log.write("instrument_uid,price,timestamp\n")
+
+        self.requests = 0
+        self.ticks = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def poll_once(self):
+        """
+        Один запрос последних цен по всем инструментам
+
+        Returns:
+            list: Кортежи (instrument_uid, price, timestamp)
+        """
+        started = time.perf_counter()
+        response = self.client.market_data.get_last_prices(instrument_id=self.instrument_ids)
+        latency = time.perf_counter() - started
+
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        metrics.observe("tbank.get_last_prices", latency)
+
+        ticks = []
+        for lp in response.last_prices:
+            price = lp.price.units + lp.price.nano / 1e9
+            timestamp = int(lp.time.timestamp())
+            self.buffer.append(self._index.get(lp.instrument_uid, -1), price, timestamp)
+            ticks.append((lp.instrument_uid, price, timestamp))
+
+        if self._log is not None:
+            self._log.writelines(f"{uid},{price},{timestamp}\n" for uid, price, timestamp in ticks)
+            self._log.flush()
+
+        self.ticks += len(ticks)
+        return ticks
+
+    def run(self, interval=5.0, max_polls=None):
+        """
+        Опрос каждые interval секунд до KeyboardInterrupt или max_polls запросов
+        """
+        logger.info(f"Запуск опроса последних цен для {len(self.instrument_ids)} инструментов")
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                started = time.perf_counter()
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    self.errors += 1
+                    incr("tbank.poll_errors")
+                    logger.warning(f"Ошибка при запросе последних цен: {str(e)}")
+                polls += 1
+                if max_polls is None or polls < max_polls:
+                    time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        except KeyboardInterrupt:
+            logger.info("Опрос последних цен остановлен")
+        logger.info(f"Статистика опроса: {self.stats()}")
+
+    def stats(self):
+        """Счётчики задержки и пропускной способности"""
+        elapsed = time.perf_counter() - self._started
+        return {
+            "requests": self.requests,
+            "ticks": self.ticks,
+            "errors": self.errors,
+            "avg_latency_ms": self.total_latency / self.requests * 1000 if self.requests else 0.0,
+            "max_latency_ms": self.max_latency * 1000,
+            "ticks_per_sec": self.ticks / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def to_frame(self):
+        """DataFrame с тиками из кольцевого буфера"""
+        instrument, price, timestamp = self.buffer.arrays()
+        ids = np.array(self.instrument_ids + [None], dtype=object)
+        return pd.DataFrame({
+            "instrument_uid": ids[instrument],
+            "price": price,
+            "timestamp": timestamp,
+        })
@@ -0,0 +1,205 @@
+"""
+Загрузка дневных котировок Yahoo Finance (USD/RUB, золото, USD/CNY, нефть,
+S&P 500) с инкрементальным сохранением в yahoo_finance_dataset.csv
+и колоночное хранилище
+
+Запуск из каталога CodeBase:
+    python -m Yahoo_API.YAHOO_API_script [--full] [--stub]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from Analytics.alignment import align_sources
+from Analytics.quality import check_frame, quality_summary
+from Metrics.metrics import metrics, timed, timer
+from Storage.chunked_writer import frame_chunks, read_csv_chunks, write_chunks
+from Storage.dataset_store import DatasetStore
+from TBank_API.incremental import append_increment, scan_marks
+
+from .chart_client import YahooChartClient
+from .fake_client import FakeChartClient
+from .quote_fetcher import fetch_quotes_concurrently
+
+logger = logging.getLogger()
+
+start_date = datetime(2022, 3, 3, tzinfo=timezone.utc)
+
+symbols = [
+    'RUB=X',  # USD/RUB (RUB=X)
+    'GC=F',  # Gold (GC=F)
+    'CNY=X',  # USD/CNY (CNY=X)
+    'CL=F',  # Crude Oil (CL=F)
+    'ES=F',  # E-Mini S&P 500 (ES=F)
+]
+
+dataset_path = "yahoo_finance_dataset.csv"
+log_path = "logfile1.log"
+# False - полная перезагрузка истории с start_date
+incremental = True
+# Колоночное хранилище (Parquet по тикеру и месяцу) рядом с CSV
+store = DatasetStore("datasets")
+store_name = "yahoo_finance"
+# Куда --stub пишет синтетические котировки, чтобы не смешивать их с настоящими
+stub_dir = "yahoo_stub"
+# Сводка времени этапов и счётчиков запуска (.prom - формат Prometheus, иначе JSON)
+metrics_path = None
+
+
+def setup_logging():
+    """Запись лога в logfile1.log"""
+    logger.setLevel(logging.INFO)
+
+    file_handler = logging.FileHandler(log_path)
+    formatter = logging.Formatter("%(asctime)s %(levelname)s:%(message)s")
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+
+
+def quotes_frame(df):
+    """Блок yahoo_finance_dataset.csv с Unix-временем вместо даты: timestamp (int64) и колонки тикеров"""
+    seconds = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[s]").astype(np.int64)
+    return df.drop(columns=["date"]).assign(timestamp=seconds)[["timestamp", *df.columns.drop("date")]]
+
+
+def dataset_frame(df):
+    """Формат yahoo_finance_dataset.csv: дата и колонки тикеров"""
+    dates = pd.to_datetime(df["timestamp"].to_numpy(), unit="s").strftime("%Y-%m-%d")
+    # Тикер, впервые загруженный позже остальных, встаёт на своё место в порядке symbols
+    tickers = [symbol for symbol in symbols if symbol in df.columns]
+    tickers += [c for c in df.columns if c not in tickers and c != "timestamp"]
+    return df.assign(date=dates)[["date", *tickers]]
+
+
+def long_frame(df):
+    """Длинный формат для колоночного хранилища: instrument, price, timestamp"""
+    tickers = [c for c in df.columns if c != "timestamp"]
+    long = df.melt(id_vars="timestamp", value_vars=tickers, var_name="instrument", value_name="price")
+    return long.dropna(subset=["price"])[["instrument", "price", "timestamp"]]
+
+
+@timed("yahoo.fetch_quotes")
+async def fetch_quotes(client, from_=start_date):
+    """
+    Котировки всех тикеров, объединённые по дню
+
+    Returns:
+        pd.DataFrame: timestamp и колонки тикеров в порядке symbols
+    """
+    frames = await fetch_quotes_concurrently(client, symbols, from_=from_, to=datetime.now(timezone.utc))
+    if not frames:
+        return pd.DataFrame({"timestamp": np.empty(0, dtype=np.int64)})
+    with timer("yahoo.align"):
+        df = align_sources(
+            {symbol: (frame, "timestamp", [symbol]) for symbol, frame in frames.items()},
+            policy="exact",
+        )
+    df, report = check_frame(df, list(frames), cadence="1D", session="weekdays", name="yahoo")
+    logger.info(quality_summary(report))
+    return df[["timestamp", *frames]]
+
+
+async def sync_quotes(client=None, full=None, path=None, target_store=None):
+    """
+    Загрузка новых котировок в dataset_path и колоночное хранилище
+
+    Последний сохранённый день каждого тикера загружается повторно: его котировка
+    могла быть получена до закрытия торгов. Сохранённый датасет читается блоками,
+    в файл дописываются только обновлённые и новые дни (append_increment).
+    Если не получено ни одной строки (например, все тикеры вернули ошибку),
+    датасет не перезаписывается.
+
+    Args:
+        client: YahooChartClient или FakeChartClient; по умолчанию YahooChartClient
+        full (bool, optional): Полная перезагрузка истории с start_date
+        path (str, optional): CSV датасета; по умолчанию dataset_path
+        target_store (DatasetStore, optional): Колоночное хранилище; по умолчанию store
+
+    Returns:
+        pd.DataFrame: Загруженные строки (timestamp и колонки тикеров)
+    """
+    full = not incremental if full is None else full
+    path = path or dataset_path
+    target_store = target_store or store
+    with timer("yahoo.read_dataset"):
+        marks = None if full else scan_marks(path, {symbol: symbol for symbol in symbols}, parse=quotes_frame)
+
+    marks = marks or dict.fromkeys(symbols)
+    logger.info(f"Последние сохранённые котировки: {marks}")
+    starts = {
+        symbol: start_date if mark is None else datetime.fromtimestamp(mark, tz=timezone.utc)
+        for symbol, mark in marks.items()
+    }
+
+    async with client or YahooChartClient() as client:
+        new = await fetch_quotes(client, from_=starts)
+
+    if new.empty:
+        logger.warning(f"Котировки не получены, {path} не изменён")
+        return new
+
+    with timer("yahoo.export"):
+        if full:
+            write_chunks(path, frame_chunks(dataset_frame(new)))
+            updated = new
+        else:
+            updated = append_increment(path, new, parse=quotes_frame, transform=dataset_frame)
+        if full or not target_store.exists(store_name):
+            for i, chunk in enumerate(read_csv_chunks(path)):
+                if i:
+                    target_store.append(store_name, long_frame(quotes_frame(chunk)))
+                else:
+                    target_store.write(store_name, long_frame(quotes_frame(chunk)))
+        elif len(updated):
+            target_store.append(store_name, long_frame(updated))
+    logger.info(f"Датасет {path}: загружено {len(new)} строк, записано {len(updated)}")
+    return new
+
+
+def main(full=None, stub=False, metrics_file=None):
+    """
+    Args:
+        full (bool, optional): Полная перезагрузка истории вместо инкремента
+        stub (bool): Локальный фейковый источник вместо Yahoo Finance (проверка без сети);
+            датасет и хранилище пишутся в stub_dir, а не в dataset_path и store
+        metrics_file (str, optional): Файл для сводки времени этапов (.json или .prom)
+    """
+    metrics_file = metrics_file or metrics_path
+    try:
+        if stub:
+            os.makedirs(stub_dir, exist_ok=True)
+            path = os.path.join(stub_dir, os.path.basename(dataset_path))
+            logger.info(f"Фейковый источник: результат пишется в {path}")
+            asyncio.run(sync_quotes(FakeChartClient(), full, path, DatasetStore(os.path.join(stub_dir, "datasets"))))
+        else:
+            asyncio.run(sync_quotes(full=full))
+    finally:
+        logger.info("Время этапов:\n" + metrics.report())
+        if metrics_file:
+            metrics.save(metrics_file)
+
+
+def cli(argv=None):
+    """Разбор аргументов командной строки и запуск main"""
+    arg_parser = argparse.ArgumentParser(description="Загрузка дневных котировок Yahoo Finance")
+    arg_parser.add_argument("--full", action="store_true", default=not incremental,
+                            help="Полная перезагрузка истории вместо дозагрузки новых дней")
+    arg_parser.add_argument("--stub", action="store_true",
+                            help=f"Локальный фейковый источник вместо Yahoo Finance (без сети); результат в {stub_dir}/")
+    arg_parser.add_argument("--metrics", default=metrics_path,
+                            help="Сохранить время этапов и счётчики: .prom - формат Prometheus, иначе JSON")
+    args = arg_parser.parse_args(argv)
+
+    setup_logging()
+    main(full=args.full, stub=args.stub, metrics_file=args.metrics)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,3 @@
+"""
+Загрузка дневных котировок из Yahoo Finance
+"""
@@ -0,0 +1,79 @@
+"""
+Асинхронный клиент Yahoo Finance chart API (v8/finance/chart)
+
+HTTP-запросы выполняет requests в потоках asyncio.to_thread, по одной сессии
+на поток; requests загружается при первом запросе.
+"""
+
+import asyncio
+import threading
+
+from Metrics.metrics import incr, timer
+
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; WOW64; rv:45.0) Gecko/20100101 Firefox/45.0"
+
+
+class YahooChartClient:
+    """Клиент с тем же асинхронным интерфейсом, что и FakeChartClient"""
+
+    def __init__(self, timeout=15):
+        """
+        Args:
+            timeout (float): Таймаут одного запроса, секунды
+        """
+        self.timeout = timeout
+        self.requests = 0
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        return False
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers.update({"User-Agent": USER_AGENT})
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _get(self, symbol, params):
+        with timer("yahoo.http_fetch"):
+            response = self._session().get(CHART_URL.format(symbol=symbol), params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            incr(f"yahoo.http_status_{response.status_code}")
+        response.raise_for_status()
+        chart = response.json()["chart"]
+        if chart.get("error") or not chart.get("result"):
+            raise ValueError(f"Yahoo Finance не вернул данные по {symbol}: {chart.get('error')}")
+        return chart["result"][0]
+
+    async def get_chart(self, symbol, from_, to, interval="1d"):
+        """
+        Котировки инструмента за период
+
+        Args:
+            symbol (str): Тикер Yahoo Finance (RUB=X, GC=F, ...)
+            from_ (datetime): Начало периода
+            to (datetime): Конец периода
+            interval (str): Интервал свечей ("1d", "1h", ...)
+
+        Returns:
+            dict: Элемент chart.result: timestamp и indicators (quote, adjclose)
+        """
+        self.requests += 1
+        params = {"period1": int(from_.timestamp()), "period2": int(to.timestamp()), "interval": interval}
+        return await asyncio.to_thread(self._get, symbol, params)
@@ -0,0 +1,65 @@
+"""
+Локальный фейковый источник котировок со структурой ответа Yahoo Finance chart API
+
+Используется для проверки загрузчика и бенчмарков без сети.
+"""
+
+import asyncio
+
+DAY = 24 * 60 * 60
+
+
+class FakeChartClient:
+    """
+    Имитация YahooChartClient: дневные котировки по будням, детерминированные
+    для каждого тикера; каждый запрос "ждёт ответ сервера" latency секунд
+
+    Запросы записываются в calls как (symbol, from_, to), чтобы проверять
+    инкрементальную загрузку.
+    """
+
+    def __init__(self, latency=0.0, hour=5, failing=()):
+        """
+        Args:
+            latency (float): Задержка ответа, секунды
+            hour (int): Час UTC метки дневной свечи (у Yahoo она не в полночь)
+            failing (tuple): Тикеры, на которые клиент отвечает ошибкой
+        """
+        self.latency = latency
+        self.hour = hour
+        self.failing = set(failing)
+        self.requests = 0
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def get_chart(self, symbol, from_, to, interval="1d"):
+        self.requests += 1
+        self.calls.append((symbol, from_, to))
+        await asyncio.sleep(self.latency)
+        if symbol in self.failing:
+            raise ValueError(f"Yahoo Finance не вернул данные по {symbol}: Not Found")
+
+        seed = sum(map(ord, symbol))
+        first = int(from_.timestamp()) // DAY * DAY + self.hour * 3600
+        if first < from_.timestamp():
+            first += DAY
+        timestamps = []
+        closes = []
+        moment = first
+        while moment < to.timestamp():
+            day = moment // DAY
+            # 1 января 1970 - четверг
+            if (day + 3) % 7 < 5:
+                timestamps.append(moment)
+                closes.append(None if day % 97 == seed % 97 else 10 + seed % 90 + (day * 7919 % 1000) / 1000)
+            moment += DAY
+        return {
+            "meta": {"symbol": symbol},
+            "timestamp": timestamps,
+            "indicators": {"quote": [{"close": closes}], "adjclose": [{"adjclose": closes}]},
+        }
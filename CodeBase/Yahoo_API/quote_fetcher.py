@@ -0,0 +1,84 @@
+"""
+Параллельная загрузка дневных котировок нескольких тикеров Yahoo Finance
+"""
+
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from Metrics.metrics import incr, timer
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+
+def chart_frame(result, column):
+    """
+    Котировки из ответа chart API
+
+    Метки приводятся к полуночи UTC дня (как normalize в исходном ноутбуке);
+    из нескольких котировок одного дня берётся последняя непустая.
+
+    Args:
+        result (dict): Элемент chart.result
+        column (str): Название колонки цены
+
+    Returns:
+        pd.DataFrame: timestamp (int64) и column (float64, NaN - нет котировки)
+    """
+    timestamps = np.asarray(result.get("timestamp") or [], dtype=np.int64)
+    indicators = result.get("indicators", {})
+    adjclose = indicators.get("adjclose")
+    values = adjclose[0]["adjclose"] if adjclose else indicators["quote"][0]["close"]
+    prices = np.array([np.nan if value is None else value for value in values[:len(timestamps)]],
+                      dtype=np.float64)
+    frame = pd.DataFrame({"timestamp": timestamps // DAY * DAY, column: prices})
+    return frame.groupby("timestamp", as_index=False, sort=True).last()
+
+
+async def _fetch_symbol(client, semaphore, symbol, from_, to, interval):
+    async with semaphore:
+        with timer("yahoo.fetch_symbol"):
+            result = await client.get_chart(symbol, from_, to, interval)
+    frame = chart_frame(result, symbol)
+    incr("yahoo.quotes", len(frame))
+    logger.info(f"{symbol}: {from_:%Y-%m-%d} - {to:%Y-%m-%d}, {len(frame)} котировок")
+    return frame
+
+
+async def fetch_quotes_concurrently(client, symbols, from_, to, interval="1d", max_concurrency=8):
+    """
+    Загрузка котировок списка тикеров, по одному параллельному запросу на тикер
+
+    Ошибка по одному тикеру записывается в лог и не прерывает загрузку остальных.
+
+    Args:
+        client: YahooChartClient или совместимый фейк (FakeChartClient)
+        symbols (list): Тикеры Yahoo Finance
+        from_ (datetime | dict): Начало периода, общее или тикер -> datetime
+        to (datetime): Конец периода
+        interval (str): Интервал свечей
+        max_concurrency (int): Максимум одновременных запросов
+
+    Returns:
+        dict: Тикер -> pd.DataFrame (timestamp, тикер) по возрастанию времени;
+            тикеры с ошибкой отсутствуют
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    starts = from_ if isinstance(from_, dict) else dict.fromkeys(symbols, from_)
+
+    frames = await asyncio.gather(*(
+        _fetch_symbol(client, semaphore, symbol, starts[symbol], to, interval) for symbol in symbols
+    ), return_exceptions=True)
+
+    results = {}
+    for symbol, frame in zip(symbols, frames):
+        if isinstance(frame, Exception):
+            incr("yahoo.errors")
+            logger.error(f"Ошибка при получении данных по {symbol}: {frame}")
+            continue
+        results[symbol] = frame
+    return results
@@ -0,0 +1,48 @@
+"""
+Единая точка входа для сбора и анализа данных
+
+Запуск из каталога CodeBase: python gp2.py <команда> [аргументы команды]
+
+Модуль команды импортируется только при её вызове, поэтому analyze
+(пересчёт по сохранённым CSV) не загружает selenium, matplotlib, pyarrow
+и tinkoff.invest, пока они не нужны.
+"""
+
+import importlib
+import sys
+
+COMMANDS = {
+    "steam": ("Parser.selenium_parser_script", "cli", "Парсинг одного листинга Steam Market"),
+    "batch": ("Parser.batch_scraper", "main", "Пакетный парсинг списка листингов Steam"),
+    "analyze": ("Parser.reanalyze", "main", "Статистика и графики по сохранённым CSV"),
+    "tbank": ("TBank_API.TBANK_API_script", "cli", "Загрузка свечей CNY/RUB и золота из T-Bank API"),
+    "yahoo": ("Yahoo_API.YAHOO_API_script", "cli", "Дневные котировки Yahoo Finance (RUB=X, GC=F, CNY=X, CL=F, ES=F)"),
+    "intraday": ("Analytics.intraday", "main", "Время суток дневных максимумов и минимумов по свечам"),
+    "store-import": ("Storage.dataset_store", "main", "Импорт CSV в колоночное хранилище"),
+}
+
+
+def usage():
+    lines = ["Использование: python gp2.py <команда> [аргументы]", "", "Команды:"]
+    lines += [f"  {name:<14} {description}" for name, (_, _, description) in COMMANDS.items()]
+    lines += ["", "Справка по команде: python gp2.py <команда> --help"]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"Неизвестная команда: {argv[0]}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module_name, function_name, _ = COMMANDS[argv[0]]
+    module = importlib.import_module(module_name)
+    getattr(module, function_name)(argv[1:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
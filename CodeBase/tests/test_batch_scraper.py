@@ -0,0 +1,106 @@
+"""
+Пакетный парсинг: ошибки записи результатов не должны останавливать очередь
+"""
+
+import threading
+
+import pandas as pd
+import pytest
+
+from Parser import batch_scraper
+from Parser.rate_limiter import RetryScheduler
+from Parser.steam_http import cache_listing
+from Storage.response_cache import ResponseCache
+
+URLS = [f"https://steamcommunity.com/market/listings/730/Case%20{i}" for i in range(4)]
+
+
+class FlakyStore:
+    """Хранилище, append которого падает первые failures раз"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.rows = []
+
+    def append(self, name, df):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("No space left on device")
+        self.rows.append(df)
+
+
+@pytest.fixture
+def cached_listings(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    for i, url in enumerate(URLS):
+        price_data = [[f"Feb {day:02d} 2025 01: +0", 1.0 + i + day / 100, "10"] for day in range(1, 11)]
+        cache_listing(cache, url, {'item_name': f"Case {i}", 'price_data': price_data})
+    return cache
+
+
+def run_batch(tmp_path, cache, timeout=30):
+    """scrape_batch в отдельном потоке: зависание превращается в провал теста"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = batch_scraper.scrape_batch(
+                URLS, workers=2, retries=2, output=str(tmp_path / "history.csv"), cache=cache,
+                backoff=0.01, flush_rows=1,
+            )
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "scrape_batch завис"
+    return outcome
+
+
+def test_store_error_retries_item_and_keeps_rows(tmp_path, cached_listings, monkeypatch):
+    store = FlakyStore(failures=1)
+    monkeypatch.setattr(batch_scraper, "store", store)
+
+    outcome = run_batch(tmp_path, cached_listings)
+
+    assert outcome['result']['completed'] == len(URLS)
+    assert outcome['result']['failed'] == 0
+    saved = pd.read_csv(tmp_path / "history.csv")
+    assert sorted(saved['instrument'].unique()) == [f"Case {i}" for i in range(4)]
+    assert len(saved) == 10 * len(URLS)
+    # Строки, не попавшие в хранилище при ошибке, дописываются следующей записью
+    assert len(pd.concat(store.rows)) == 10 * len(URLS)
+
+
+def test_persistent_store_error_does_not_hang(tmp_path, cached_listings, monkeypatch):
+    monkeypatch.setattr(batch_scraper, "store", FlakyStore(failures=10 ** 6))
+
+    outcome = run_batch(tmp_path, cached_listings)
+
+    assert isinstance(outcome.get('error'), OSError)
+
+
+def test_dead_worker_does_not_block_others(tmp_path, cached_listings, monkeypatch):
+    def broken_add(self, frame):
+        raise SystemExit("worker killed")
+
+    monkeypatch.setattr(batch_scraper.HistorySink, "add", broken_add)
+
+    outcome = run_batch(tmp_path, cached_listings)
+
+    assert isinstance(outcome.get('error'), SystemExit)
+
+
+def test_closed_scheduler_releases_waiting_get():
+    scheduler = RetryScheduler(["a"])
+    assert scheduler.get() == ("a", 0)
+
+    released = []
+    waiter = threading.Thread(target=lambda: released.append(scheduler.get()))
+    waiter.start()
+    scheduler.close()
+    waiter.join(5)
+
+    assert not waiter.is_alive()
+    assert released == [None]
@@ -0,0 +1,68 @@
+"""
+Параллельная загрузка свечей по окнам и кэш закрытых окон
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+from Storage.response_cache import ResponseCache
+from TBank_API.candle_fetcher import fetch_candles_concurrently, split_windows
+from TBank_API.fake_client import FakeAsyncClient
+
+WINDOW = timedelta(days=30)
+STEP = timedelta(minutes=30)
+INSTRUMENTS = ["BBG0013HRTL0", "258e2b93-54e8-4f2d-ba3d-a507c47e3ae2"]
+# Граница окон, отсчитанных от начала Unix-времени
+BOUNDARY = datetime(1970, 1, 1, tzinfo=timezone.utc) + 650 * WINDOW
+
+
+def cache_entries(cache):
+    return sum(name.endswith(".bin") for _, _, files in os.walk(cache.root) for name in files)
+
+
+def fetch(client, from_, to, cache):
+    return asyncio.run(fetch_candles_concurrently(client, INSTRUMENTS, from_, to, interval=None,
+                                                  window=WINDOW, cache=cache))
+
+
+def test_split_windows_aligned_to_epoch():
+    windows = split_windows(BOUNDARY + STEP, BOUNDARY + 2 * WINDOW + STEP, WINDOW, align=True)
+
+    assert windows == [
+        (BOUNDARY + STEP, BOUNDARY + WINDOW),
+        (BOUNDARY + WINDOW, BOUNDARY + 2 * WINDOW),
+        (BOUNDARY + 2 * WINDOW, BOUNDARY + 2 * WINDOW + STEP),
+    ]
+
+
+def test_only_full_closed_windows_are_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    # Дозагрузка начинается через секунду после сохранённой свечи
+    from_ = BOUNDARY + timedelta(seconds=1)
+    to = BOUNDARY + 3 * WINDOW
+
+    first = fetch(FakeAsyncClient(step=STEP), from_, to, cache)
+
+    # Первое неполное окно не кэшируется, два полных - да, для каждого инструмента
+    assert cache_entries(cache) == 2 * len(INSTRUMENTS)
+
+    client = FakeAsyncClient(step=STEP)
+    second = fetch(client, from_, to, cache)
+
+    assert cache_entries(cache) == 2 * len(INSTRUMENTS)
+    for instrument_id in INSTRUMENTS:
+        assert len(second[instrument_id]) == len(first[instrument_id])
+        assert second[instrument_id].to_bytes() == first[instrument_id].to_bytes()
+    # Из API заново загружено только неполное окно: 1439 свечей по 48 на страницу
+    assert client.requests == len(INSTRUMENTS) * 30
+
+
+def test_incremental_starts_do_not_grow_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    to = BOUNDARY + 2 * WINDOW
+
+    for hours in range(1, 4):
+        fetch(FakeAsyncClient(step=STEP), BOUNDARY + WINDOW + timedelta(hours=hours, seconds=1), to, cache)
+
+    assert cache_entries(cache) == 0
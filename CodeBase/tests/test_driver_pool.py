@@ -0,0 +1,78 @@
+"""
+Пул WebDriver: закрытие запущенных браузеров при ошибке запуска и замена упавших
+"""
+
+import itertools
+import threading
+
+import pytest
+
+from Parser.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_calls = 0
+        self.crashed = False
+
+    @property
+    def current_window_handle(self):
+        if self.crashed:
+            raise ConnectionError("браузер не отвечает")
+        return "window"
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class Factory:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.created = []
+        self._numbers = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            number = next(self._numbers)
+        if number in self.failing:
+            raise RuntimeError(f"chromedriver {number} не запустился")
+        driver = FakeDriver(number)
+        with self._lock:
+            self.created.append(driver)
+        return driver
+
+
+def test_failed_launch_quits_started_drivers():
+    factory = Factory(failing={1})
+    pool = DriverPool(factory, size=3)
+
+    with pytest.raises(RuntimeError):
+        pool.start()
+
+    assert len(factory.created) == 2
+    assert all(driver.quit_calls == 1 for driver in factory.created)
+    assert not pool._started
+
+
+def test_crashed_driver_is_replaced_on_release():
+    factory = Factory()
+    with DriverPool(factory, size=1) as pool:
+        with pool.lease() as driver:
+            driver.crashed = True
+        with pool.lease() as replacement:
+            assert replacement is not driver
+
+    assert driver.quit_calls == 1
+    assert replacement.quit_calls == 1
+
+
+def test_failed_replacement_keeps_slot():
+    factory = Factory(failing={1})
+    with DriverPool(factory, size=1) as pool:
+        with pool.lease() as driver:
+            driver.crashed = True
+        # Замена не запустилась: слот пуст, драйвер запускается при следующей аренде
+        with pool.lease(timeout=1) as replacement:
+            assert replacement.number == 2
@@ -0,0 +1,135 @@
+"""
+Инкрементальное обновление датасета свечей: объединение с сохранёнными строками и дозапись в CSV
+"""
+
+import numpy as np
+import pandas as pd
+
+from TBank_API.incremental import append_increment, merge_increment
+
+STEP = 1800
+
+
+def candles(timestamps, price_rub=None, gold_price=None):
+    return pd.DataFrame({
+        "currency": "CNY",
+        "price_rub": np.nan if price_rub is None else price_rub,
+        "timestamp": timestamps,
+        "gold_price": np.nan if gold_price is None else gold_price,
+    }).astype({"price_rub": float, "gold_price": float})
+
+
+def test_merge_without_existing_sorts_and_deduplicates():
+    new = candles([2 * STEP, 0, STEP, STEP], [1.2, 1.0, 1.1, 1.15], [7.2, 7.0, 7.1, 7.15])
+
+    merged = merge_increment(None, new)
+
+    assert merged["timestamp"].tolist() == [0, STEP, 2 * STEP]
+    assert merged["price_rub"].tolist() == [1.0, 1.15, 1.2]
+
+
+def test_merge_with_empty_new_returns_existing():
+    existing = candles([0, STEP], [1.0, 1.1], [7.0, 7.1])
+
+    assert merge_increment(existing, existing.iloc[:0]) is existing
+
+
+def test_merge_fills_gaps_of_stored_rows_and_keeps_head():
+    existing = candles([0, STEP, 2 * STEP], [1.0, 1.1, 1.2], [7.0, 7.1, np.nan])
+    # Золото за последнюю сохранённую метку пришло позже CNY, и появилась новая свеча
+    new = candles([2 * STEP, 3 * STEP], [np.nan, 1.3], [7.2, 7.3])
+
+    merged = merge_increment(existing, new)
+
+    assert merged["timestamp"].tolist() == [0, STEP, 2 * STEP, 3 * STEP]
+    assert merged["price_rub"].tolist() == [1.0, 1.1, 1.2, 1.3]
+    assert merged["gold_price"].tolist() == [7.0, 7.1, 7.2, 7.3]
+    assert list(merged.columns) == list(existing.columns)
+
+
+def test_merge_new_values_override_stored():
+    existing = candles([0, STEP], [1.0, 1.1], [7.0, 7.1])
+    new = candles([STEP], [1.15], [7.15])
+
+    merged = merge_increment(existing, new)
+
+    assert merged["price_rub"].tolist() == [1.0, 1.15]
+    assert merged["gold_price"].tolist() == [7.0, 7.15]
+
+
+def test_merge_adds_new_columns_at_the_end():
+    existing = pd.DataFrame({"timestamp": [0, STEP], "RUB=X": [90.0, 91.0]})
+    new = pd.DataFrame({"timestamp": [STEP, 2 * STEP], "RUB=X": [91.0, 92.0], "GC=F": [2000.0, 2001.0]})
+
+    merged = merge_increment(existing, new)
+
+    assert list(merged.columns) == ["timestamp", "RUB=X", "GC=F"]
+    assert merged["RUB=X"].tolist() == [90.0, 91.0, 92.0]
+    assert merged["GC=F"].isna().tolist() == [True, False, False]
+
+
+def test_merge_drops_rows_missing_required_columns():
+    existing = candles([0], [1.0], [7.0])
+    new = candles([STEP, 2 * STEP], [1.1, np.nan], [7.1, 7.2])
+
+    merged = merge_increment(existing, new, required_columns=("price_rub",))
+
+    assert merged["timestamp"].tolist() == [0, STEP]
+
+
+def test_append_increment_appends_and_rewrites_tail(tmp_path):
+    path = str(tmp_path / "cny_rub_dataset.csv")
+    append_increment(path, candles([0, STEP, 2 * STEP], [1.0, 1.1, 1.2], [7.0, 7.1, np.nan]))
+
+    appended = append_increment(path, candles([3 * STEP], [1.3], [7.3]), chunk_rows=2)
+    assert appended["timestamp"].tolist() == [3 * STEP]
+
+    # Обновление уже сохранённой строки: файл обрезается с её метки и дописывается
+    updated = append_increment(path, candles([2 * STEP, 4 * STEP], [np.nan, 1.4], [7.2, 7.4]), chunk_rows=2)
+    assert updated["timestamp"].tolist() == [2 * STEP, 3 * STEP, 4 * STEP]
+
+    saved = pd.read_csv(path)
+    assert saved["timestamp"].tolist() == [0, STEP, 2 * STEP, 3 * STEP, 4 * STEP]
+    assert saved["price_rub"].tolist() == [1.0, 1.1, 1.2, 1.3, 1.4]
+    assert saved["gold_price"].tolist() == [7.0, 7.1, 7.2, 7.3, 7.4]
+
+
+def test_append_increment_keeps_stored_rows_before_update(tmp_path):
+    path = tmp_path / "cny_rub_dataset.csv"
+    append_increment(str(path), candles([0, STEP, 2 * STEP], [1.0, 1.1, 1.2], [7.0, 7.1, np.nan]))
+    head = path.read_bytes()[:-len(b"CNY,1.2,3600,\n")]
+
+    append_increment(str(path), candles([2 * STEP, 3 * STEP], [np.nan, 1.3], [7.2, 7.3]), chunk_rows=2)
+
+    assert path.read_bytes().startswith(head)
+    assert pd.read_csv(path)["gold_price"].tolist() == [7.0, 7.1, 7.2, 7.3]
+
+
+def test_append_increment_rewrites_unsorted_file(tmp_path):
+    path = tmp_path / "cny_rub_dataset.csv"
+    candles([0, 2 * STEP, STEP], [1.0, 1.2, 1.1], [7.0, 7.2, 7.1]).to_csv(path, index=False)
+
+    append_increment(str(path), candles([2 * STEP, 3 * STEP], [1.25, 1.3], [7.25, 7.3]), chunk_rows=2)
+
+    saved = pd.read_csv(path)
+    assert saved["timestamp"].tolist() == [0, STEP, 2 * STEP, 3 * STEP]
+    assert saved["price_rub"].tolist() == [1.0, 1.1, 1.25, 1.3]
+
+
+def test_append_increment_with_stored_format(tmp_path):
+    path = tmp_path / "quotes.csv"
+    path.write_text("date,RUB=X\n1970-01-01,90.0\n1970-01-02,91.0\n")
+
+    def parse(chunk):
+        return pd.DataFrame({"timestamp": pd.to_datetime(chunk["date"]).to_numpy(dtype="datetime64[s]")
+                             .astype(np.int64), "RUB=X": chunk["RUB=X"]})
+
+    def transform(chunk):
+        return pd.DataFrame({"date": pd.to_datetime(chunk["timestamp"], unit="s").dt.strftime("%Y-%m-%d"),
+                             "RUB=X": chunk["RUB=X"]})
+
+    day = 24 * 3600
+    append_increment(str(path), pd.DataFrame({"timestamp": [day, 2 * day], "RUB=X": [91.5, 92.0]}),
+                     parse=parse, transform=transform)
+
+    assert path.read_text() == "date,RUB=X\n1970-01-01,90.0\n1970-01-02,91.5\n1970-01-03,92.0\n"
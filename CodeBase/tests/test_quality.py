@@ -0,0 +1,72 @@
+"""
+Проверка качества рядов: порядок, дубликаты, разрывы с учётом торговых сессий, выбросы
+"""
+
+import numpy as np
+import pandas as pd
+
+from Analytics.alignment import to_seconds
+from Analytics.quality import check_series, quality_summary, session_time
+
+HALF_HOUR = 30 * 60
+
+
+def moex_candles(start, end):
+    """Метки 30-минутных свечей основной сессии (10:00-18:30 МСК) по будням"""
+    days = pd.bdate_range(start, end)
+    local = [day + pd.Timedelta(minutes=30 * i) + pd.Timedelta(hours=10) for day in days for i in range(18)]
+    return to_seconds(pd.DatetimeIndex(local) - pd.Timedelta(hours=3))
+
+
+def test_sorts_and_keeps_last_duplicate():
+    index, report = check_series([30, 10, 20, 20, np.nan], [3.0, 1.0, 2.0, 2.5, 9.0], cadence=10)
+
+    assert index.tolist() == [1, 3, 0]
+    assert (report['invalid'], report['unsorted'], report['duplicates']) == (1, 1, 1)
+    assert report['gaps'] == 0
+
+
+def test_nights_and_weekends_are_not_gaps_within_session():
+    # Две недели: понедельник 2024-06-03 - пятница 2024-06-14
+    timestamps = moex_candles("2024-06-03", "2024-06-14")
+
+    _, plain = check_series(timestamps, np.ones(len(timestamps)), cadence="30min")
+    _, session = check_series(timestamps, np.ones(len(timestamps)), cadence="30min", session="moex")
+
+    assert plain['gaps'] == 9
+    assert session['gaps'] == 0
+    assert session['max_gap'] == HALF_HOUR
+    assert "в сессиях moex: разрывов 0" in quality_summary(session)
+
+
+def test_missing_candles_inside_session_are_gaps():
+    timestamps = moex_candles("2024-06-03", "2024-06-07")
+    # Пропущены четыре свечи среды и весь четверг
+    wednesday = timestamps[36:54]
+    kept = np.concatenate([timestamps[:36], wednesday[:5], wednesday[9:], timestamps[72:]])
+
+    _, report = check_series(kept, np.ones(len(kept)), cadence="30min", session="moex")
+    _, with_holiday = check_series(kept, np.ones(len(kept)), cadence="30min", session="moex",
+                                   holidays=["2024-06-06"])
+
+    assert (report['gaps'], report['missing_points']) == (2, 4 + 18)
+    assert (with_holiday['gaps'], with_holiday['missing_points']) == (1, 4)
+
+
+def test_session_time_stops_outside_session():
+    # 2024-06-07 пятница: 18:30 МСК, закрытие 19:00, суббота, понедельник 10:00 и 10:30
+    moments = to_seconds(["2024-06-07 15:30", "2024-06-07 16:00", "2024-06-08 12:00",
+                          "2024-06-10 07:00", "2024-06-10 07:30"])
+
+    assert np.diff(session_time(moments, "moex")).tolist() == [HALF_HOUR, 0, 0, HALF_HOUR]
+
+
+def test_spike_is_reported_and_kept():
+    values = np.ones(200) + np.sin(np.arange(200)) * 0.001
+    values[100] = 5.0
+
+    index, report = check_series(np.arange(200) * 60, values, cadence=60)
+
+    assert len(index) == 200
+    assert report['outliers'] == 1
+    assert report['outlier_timestamps'].tolist() == [6000]
@@ -0,0 +1,185 @@
+"""
+Дозапись истории Steam: только новые точки, обрезка и перезапись при изменении последней цены
+"""
+
+import pandas as pd
+import pytest
+
+from Parser.steam_history import append_history, last_points, read_history
+from Storage.chunked_writer import row_offset
+
+HOUR = 3600
+
+
+def history(timestamps, prices, instrument=None):
+    df = pd.DataFrame({"timestamp": timestamps, "price_usd": prices})
+    if instrument is not None:
+        df.insert(0, "instrument", instrument)
+    return df
+
+
+def read(path):
+    return pd.read_csv(path, float_precision="round_trip")
+
+
+def test_new_file_gets_whole_export(tmp_path):
+    path = str(tmp_path / "history.csv")
+    new = history([0, HOUR, 2 * HOUR], [1.0, 1.1, 1.2])
+
+    written = append_history(path, new, "price_usd")
+
+    assert len(written) == 3
+    pd.testing.assert_frame_equal(read(path), new)
+
+
+def test_appends_only_points_after_last_stored(tmp_path):
+    path = str(tmp_path / "history.csv")
+    append_history(path, history([0, HOUR, 2 * HOUR], [1.0, 1.1, 1.2]), "price_usd")
+
+    written = append_history(path, history([HOUR, 2 * HOUR, 3 * HOUR, 4 * HOUR], [1.1, 1.2, 1.3, 1.4]),
+                             "price_usd", chunk_rows=2)
+
+    assert written["timestamp"].tolist() == [3 * HOUR, 4 * HOUR]
+    assert read(path)["timestamp"].tolist() == [0, HOUR, 2 * HOUR, 3 * HOUR, 4 * HOUR]
+
+
+def test_unchanged_export_writes_nothing(tmp_path):
+    path = str(tmp_path / "history.csv")
+    new = history([0, HOUR], [1.0, 1.1])
+    append_history(path, new, "price_usd")
+
+    written = append_history(path, new, "price_usd")
+
+    assert written.empty
+    pd.testing.assert_frame_equal(read(path), new)
+
+
+def test_changed_last_price_truncates_and_rewrites_tail(tmp_path):
+    path = str(tmp_path / "history.csv")
+    append_history(path, history([0, HOUR, 2 * HOUR], [1.0, 1.1, 1.2]), "price_usd")
+    size_before = (tmp_path / "history.csv").stat().st_size
+
+    # Последний час ещё не закрыт: его цена изменилась, и появилась новая точка
+    written = append_history(path, history([HOUR, 2 * HOUR, 3 * HOUR], [1.1, 1.25, 1.3]), "price_usd")
+
+    assert written["timestamp"].tolist() == [2 * HOUR, 3 * HOUR]
+    pd.testing.assert_frame_equal(read(path), history([0, HOUR, 2 * HOUR, 3 * HOUR], [1.0, 1.1, 1.25, 1.3]))
+    assert (tmp_path / "history.csv").stat().st_size > size_before
+
+
+def test_changed_point_inside_file_is_appended_as_correction(tmp_path):
+    path = tmp_path / "prices.csv"
+    stored = pd.concat([
+        history([0, HOUR], [1.0, 1.1], "Case A"),
+        history([0, HOUR, 2 * HOUR], [5.0, 5.1, 5.2], "Case B"),
+    ], ignore_index=True)
+    append_history(str(path), stored, "price_usd", key_column="instrument")
+    before = path.read_bytes()
+
+    new = pd.concat([
+        history([HOUR, 2 * HOUR], [1.15, 1.2], "Case A"),
+        history([2 * HOUR, 3 * HOUR], [5.2, 5.3], "Case B"),
+    ], ignore_index=True)
+    written = append_history(str(path), new, "price_usd", key_column="instrument", chunk_rows=2)
+
+    assert written.to_dict("list") == {
+        "instrument": ["Case A", "Case A", "Case B"],
+        "timestamp": [HOUR, 2 * HOUR, 3 * HOUR],
+        "price_usd": [1.15, 1.2, 5.3],
+    }
+    # Сохранённые строки не тронуты, исправление дописано в конец
+    assert path.read_bytes().startswith(before)
+    assert len(read(path)) == len(stored) + len(written)
+
+    saved = read_history(str(path))
+    assert saved.groupby("instrument")["timestamp"].apply(list).to_dict() == {
+        "Case A": [0, HOUR, 2 * HOUR],
+        "Case B": [0, HOUR, 2 * HOUR, 3 * HOUR],
+    }
+    assert saved.groupby("instrument")["price_usd"].apply(list).to_dict() == {
+        "Case A": [1.0, 1.15, 1.2],
+        "Case B": [5.0, 5.1, 5.2, 5.3],
+    }
+    assert last_points(str(path), "price_usd", "instrument") == {
+        "Case A": (6, 2 * HOUR, 1.2),
+        "Case B": (7, 3 * HOUR, 5.3),
+    }
+
+
+def test_changed_points_at_end_of_file_are_rewritten(tmp_path):
+    path = tmp_path / "prices.csv"
+    append_history(str(path), pd.concat([
+        history([0, HOUR], [1.0, 1.1], "Case A"),
+        history([0, HOUR], [5.0, 5.1], "Case B"),
+    ], ignore_index=True), "price_usd", key_column="instrument")
+    # Следующий запуск: у обоих предметов последний час ещё открыт
+    append_history(str(path), pd.concat([
+        history([HOUR, 2 * HOUR], [1.1, 1.2], "Case A"),
+        history([HOUR, 2 * HOUR], [5.1, 5.2], "Case B"),
+    ], ignore_index=True), "price_usd", key_column="instrument")
+
+    written = append_history(str(path), pd.concat([
+        history([2 * HOUR, 3 * HOUR], [1.25, 1.3], "Case A"),
+        history([2 * HOUR], [5.25], "Case B"),
+    ], ignore_index=True), "price_usd", key_column="instrument")
+
+    assert len(written) == 3
+    assert read(path).to_dict("list") == {
+        "instrument": ["Case A", "Case A", "Case B", "Case B", "Case A", "Case A", "Case B"],
+        "timestamp": [0, HOUR, 0, HOUR, 2 * HOUR, 3 * HOUR, 2 * HOUR],
+        "price_usd": [1.0, 1.1, 5.0, 5.1, 1.25, 1.3, 5.25],
+    }
+
+
+def test_transform_columns_written_only_for_new_rows(tmp_path):
+    path = str(tmp_path / "detailed.csv")
+
+    def with_hours(chunk):
+        return chunk.assign(hour=chunk["timestamp"] // HOUR)
+
+    append_history(path, history([0, HOUR], [1.0, 1.1]), "price_usd", transform=with_hours)
+    written = append_history(path, history([HOUR, 2 * HOUR], [1.2, 1.3]), "price_usd", transform=with_hours)
+
+    assert list(written.columns) == ["timestamp", "price_usd"]
+    assert read(path).to_dict("list") == {
+        "timestamp": [0, HOUR, 2 * HOUR],
+        "price_usd": [1.0, 1.2, 1.3],
+        "hour": [0, 1, 2],
+    }
+
+
+def test_changed_columns_rewrite_file(tmp_path):
+    path = str(tmp_path / "history.csv")
+    append_history(path, history([0], [1.0], "Case A"), "price_usd", key_column="instrument")
+
+    new = history([0, HOUR], [1.0, 1.1])
+    append_history(path, new, "price_usd")
+
+    pd.testing.assert_frame_equal(read(path), new)
+
+
+def test_last_points_across_chunks(tmp_path):
+    path = str(tmp_path / "prices.csv")
+    stored = pd.concat([
+        history([0, HOUR, 2 * HOUR], [1.0, 1.1, 1.2], "Case A"),
+        history([0, HOUR], [5.0, 5.1], "Case B"),
+    ], ignore_index=True)
+    stored.to_csv(path, index=False)
+
+    assert last_points(path, "price_usd", "instrument", chunk_rows=2) == {
+        "Case A": (2, 2 * HOUR, 1.2),
+        "Case B": (4, HOUR, 5.1),
+    }
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 2 ** 20])
+def testrow_offset(tmp_path, block_size):
+    path = tmp_path / "rows.csv"
+    content = b"timestamp,price\n0,1.0\n3600,1.1\n7200,1.2\n"
+    path.write_bytes(content)
+
+    assert row_offset(str(path), 0, block_size) == len(b"timestamp,price\n")
+    assert row_offset(str(path), 2, block_size) == len(b"timestamp,price\n0,1.0\n3600,1.1\n")
+    assert row_offset(str(path), 3, block_size) == len(content)
+    with pytest.raises(ValueError):
+        row_offset(str(path), 4, block_size)
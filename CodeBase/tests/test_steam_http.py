@@ -0,0 +1,86 @@
+"""
+HTTP-движок Steam на сохранённой странице листинга, отдаваемой локальным http.server
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Parser.rate_limiter import ERROR, OK, THROTTLED, TIMEOUT
+from Parser.selenium_parser_script import fetch_price_history
+from Parser.steam_http import extract_line1, fetch_listing_http
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LISTING = "/market/listings/730/Chroma%203%20Case"
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    """Листинг из fixtures, страница без line1 и ответы 429 и 503"""
+
+    statuses = {"/throttled": 429, "/unavailable": 503}
+
+    def do_GET(self):
+        if self.path in self.statuses:
+            self.send_error(self.statuses[self.path])
+            return
+        if self.path == LISTING:
+            body = read_fixture("steam_listing_chroma3.html")
+        else:
+            body = "<html><head><title>Steam Community :: Error</title></head><body></body></html>"
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ListingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_extract_line1_from_saved_page():
+    price_data = extract_line1(read_fixture("steam_listing_chroma3.html"))
+    assert len(price_data) == 32
+    assert price_data[0] == ["Jan 20 2025 01: +0", 1.05, "3000"]
+    assert price_data[-1][0] == "Feb 09 2025 11: +0"
+
+
+def test_http_engine_parses_listing(base_url):
+    result, outcome = fetch_listing_http(base_url + LISTING)
+    assert outcome == OK
+    assert result["item_name"] == "Chroma 3 Case"
+    assert len(result["price_data"]) == 32
+
+
+def test_fetch_price_history_http_engine(base_url):
+    result = fetch_price_history(base_url + LISTING, engine="http")
+    assert result["item_name"] == "Chroma 3 Case"
+    assert result["price_data"][0][1] == 1.05
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/throttled", THROTTLED),
+    ("/unavailable", TIMEOUT),
+    ("/market/listings/730/Missing", ERROR),
+])
+def test_http_engine_outcomes(base_url, path, expected):
+    result, outcome = fetch_listing_http(base_url + path)
+    assert result is None
+    assert outcome == expected
@@ -0,0 +1,65 @@
+"""
+Загрузка котировок Yahoo Finance на фейковом источнике: куда пишется результат и когда файл не трогается
+"""
+
+import asyncio
+import os
+
+import pandas as pd
+
+from Storage.dataset_store import DatasetStore
+from Yahoo_API import YAHOO_API_script as script
+from Yahoo_API.fake_client import FakeChartClient
+
+
+def test_stub_run_does_not_touch_real_dataset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    real = tmp_path / script.dataset_path
+    real.write_text("date,RUB=X\n2025-01-01,100.0\n")
+
+    script.main(stub=True, metrics_file=None)
+
+    assert real.read_text() == "date,RUB=X\n2025-01-01,100.0\n"
+    assert not (tmp_path / "datasets").exists()
+    stub = pd.read_csv(tmp_path / script.stub_dir / script.dataset_path)
+    assert list(stub.columns) == ["date", *script.symbols]
+    assert len(stub) > 0
+    assert (tmp_path / script.stub_dir / "datasets").exists()
+
+
+def test_failed_fetch_keeps_dataset(tmp_path):
+    path = str(tmp_path / "quotes.csv")
+    target = DatasetStore(str(tmp_path / "datasets"))
+    asyncio.run(script.sync_quotes(FakeChartClient(latency=0), full=True, path=path, target_store=target))
+    with open(path) as f:
+        saved = f.read()
+
+    new = asyncio.run(script.sync_quotes(FakeChartClient(latency=0, failing=script.symbols), full=True,
+                                         path=path, target_store=target))
+
+    assert new.empty
+    with open(path) as f:
+        assert f.read() == saved
+    assert os.path.getsize(path) > 0
+
+
+def test_incremental_run_appends_only_new_days(tmp_path):
+    path = tmp_path / "quotes.csv"
+    target = DatasetStore(str(tmp_path / "datasets"))
+    asyncio.run(script.sync_quotes(FakeChartClient(latency=0), full=True, path=str(path), target_store=target))
+    full = pd.read_csv(path)
+    stored_rows = len(target.read(script.store_name))
+    # Последние три дня ещё не загружены
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:-3]))
+    kept = "".join(lines[:-4])
+
+    client = FakeChartClient(latency=0)
+    new = asyncio.run(script.sync_quotes(client, full=False, path=str(path), target_store=target))
+
+    assert len(new) == 4
+    # Повторно загружается только последний сохранённый день
+    assert {int(from_.timestamp()) for _, from_, _ in client.calls} == {int(new["timestamp"].min())}
+    assert path.read_text().startswith(kept)
+    pd.testing.assert_frame_equal(pd.read_csv(path), full)
+    assert len(target.read(script.store_name)) == stored_rows